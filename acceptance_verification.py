@@ -106,10 +106,10 @@ class AcceptanceVerifier:
 
     def test_compute_routing(self):
         """Test local vs Yotta routing"""
-        # Test logged in usage_logs.json
+        # Test logged in usage_logs segments
         try:
-            with open("logs/usage_logs.json", "r") as f:
-                logs = json.load(f)
+            from src.data.log_store import get_log_store
+            logs = list(get_log_store("usage_logs").iter_records())
                 
             has_local = any(log.get("provider") == "local" for log in logs)
             has_cost_tracking = any("cost" in log for log in logs)
@@ -0,0 +1,43 @@
+"""add composite indexes for hot query columns
+
+Revision ID: add_hot_query_indexes
+Revises: add_usage_logs_table, fix_iteration_logs
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_hot_query_indexes'
+down_revision: Union[str, Sequence[str], None] = ('add_usage_logs_table', 'fix_iteration_logs')
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (index name, table, columns) - kept in sync with __table_args__ on the models
+INDEXES = [
+    ('ix_iteration_logs_session_id_iteration_number', 'iteration_logs', ['session_id', 'iteration_number']),
+    ('ix_iteration_logs_created_at', 'iteration_logs', ['created_at']),
+    ('ix_evals_spec_id_created_at', 'evals', ['spec_id', 'created_at']),
+    ('ix_evals_created_at', 'evals', ['created_at']),
+    ('ix_feedback_logs_spec_id_created_at', 'feedback_logs', ['spec_id', 'created_at']),
+    ('ix_feedback_logs_created_at', 'feedback_logs', ['created_at']),
+]
+
+
+def upgrade() -> None:
+    # Build indexes without blocking writes on Postgres (CONCURRENTLY cannot run in a transaction)
+    if op.get_bind().dialect.name == 'postgresql':
+        with op.get_context().autocommit_block():
+            for name, table, columns in INDEXES:
+                op.create_index(name, table, columns, if_not_exists=True, postgresql_concurrently=True)
+    else:
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, if_not_exists=True)
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table, if_exists=True)
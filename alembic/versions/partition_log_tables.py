@@ -0,0 +1,86 @@
+"""partition iteration_logs and feedback_logs by month
+
+Revision ID: partition_log_tables
+Revises: add_hot_query_indexes
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'partition_log_tables'
+down_revision: Union[str, None] = 'add_hot_query_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+MONTHS_AHEAD = 2
+
+# table -> (index name, columns) recreated on the partitioned parent
+TABLES = {
+    'iteration_logs': [
+        ('ix_iteration_logs_session_id_iteration_number', ['session_id', 'iteration_number']),
+        ('ix_iteration_logs_created_at', ['created_at']),
+    ],
+    'feedback_logs': [
+        ('ix_feedback_logs_spec_id_created_at', ['spec_id', 'created_at']),
+        ('ix_feedback_logs_created_at', ['created_at']),
+    ],
+}
+
+
+def _add_months(month: datetime, count: int) -> datetime:
+    index = month.year * 12 + month.month - 1 + count
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+
+def upgrade() -> None:
+    # Native partitioning is Postgres-only; SQLite emulates it at runtime (LOG_PARTITIONING=true)
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+
+    for table, indexes in TABLES.items():
+        old = f'{table}_unpartitioned'
+        op.execute(f'ALTER TABLE {table} RENAME TO {old}')
+        op.execute(f'UPDATE {old} SET created_at = now() WHERE created_at IS NULL')
+        op.execute(f'CREATE TABLE {table} (LIKE {old} INCLUDING DEFAULTS) PARTITION BY RANGE (created_at)')
+        op.execute(f'ALTER TABLE {table} ALTER COLUMN created_at SET NOT NULL')
+        op.execute(f'CREATE TABLE {table}_pdefault PARTITION OF {table} DEFAULT')
+
+        first = bind.execute(sa.text(f"SELECT date_trunc('month', MIN(created_at)) FROM {old}")).scalar()
+        current = datetime.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        month = min(first, current) if first else current
+        while month <= _add_months(current, MONTHS_AHEAD):
+            op.execute(
+                f"CREATE TABLE {table}_p{month:%Y%m} PARTITION OF {table} "
+                f"FOR VALUES FROM ('{month:%Y-%m-%d}') TO ('{_add_months(month, 1):%Y-%m-%d}')"
+            )
+            month = _add_months(month, 1)
+
+        op.execute(f'INSERT INTO {table} SELECT * FROM {old}')
+        op.execute(f'DROP TABLE {old}')
+        # The partition key has to be part of the primary key
+        op.execute(f'ALTER TABLE {table} ADD PRIMARY KEY (id, created_at)')
+        for name, columns in indexes:
+            op.create_index(name, table, columns)
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+
+    for table, indexes in TABLES.items():
+        plain = f'{table}_plain'
+        op.execute(f'CREATE TABLE {plain} (LIKE {table} INCLUDING DEFAULTS)')
+        op.execute(f'INSERT INTO {plain} SELECT * FROM {table}')
+        op.execute(f'DROP TABLE {table} CASCADE')
+        op.execute(f'ALTER TABLE {plain} RENAME TO {table}')
+        op.execute(f'ALTER TABLE {table} ADD PRIMARY KEY (id)')
+        for name, columns in indexes:
+            op.create_index(name, table, columns)
@@ -13,8 +13,8 @@ class EvaluatorAgent:
 
         # Save to DB via clean interface
         try:
-            from src.data.database import Database
-            db = Database()
+            from src.data.database import get_database
+            db = get_database()
             spec_id = getattr(spec, 'id', 'unknown')
             eval_id = db.save_eval(spec_id, prompt, evaluation.model_dump(), evaluation.score)
             print(f"Evaluation saved to DB with ID: {eval_id}")
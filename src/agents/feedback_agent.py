@@ -19,9 +19,9 @@ class FeedbackAgent:
         # Save feedback to database if requested
         if save_to_db:
             try:
-                from src.data.database import Database
+                from src.data.database import get_database
                 import uuid
-                db = Database()
+                db = get_database()
                 spec_id = str(uuid.uuid4())  # Generate spec ID if not available
                 feedback_id = db.save_feedback(
                     spec_id=spec_id,
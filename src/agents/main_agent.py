@@ -1,42 +1,98 @@
 import json
 import os
-from typing import Optional
+from typing import List, Optional, Tuple
 from pathlib import Path
-from datetime import datetime
 from src.schemas.legacy_schema import DesignSpec, MaterialSpec, DimensionSpec
 from src.schemas.universal_schema import UniversalDesignSpec
 from src.prompt_agent.extractor import PromptExtractor
 from src.prompt_agent.universal_extractor import UniversalPromptExtractor
+from src.core.keyword_index import KeywordIndex
+from src.services.artifact_sink import ARTIFACT_DIR, artifact_document, artifact_name, get_artifact_sink
+
+# Table order is match priority for design types; the three extractors share one scan per prompt
+KEYWORDS = KeywordIndex({
+    "design_type": {
+        "email": ['email', 'message', 'letter', 'announcement', 'communication'],
+        "task": ['task', 'project', 'plan', 'timeline', 'schedule', 'launch'],
+        "building": ['building', 'house', 'office', 'warehouse', 'hospital', 'construction', 'architect',
+                     'residential', 'apartment'],
+        "software": ['chatbot', 'app', 'software', 'system', 'platform', 'website', 'api'],
+        "product": ['product', 'device', 'gadget', 'thermostat', 'sensor', 'controller'],
+    },
+    "component": {
+        'interface': ['ui', 'interface', 'screen', 'display'],
+        'database': ['database', 'storage', 'data'],
+        'api': ['api', 'endpoint', 'service'],
+        'sensor': ['sensor', 'detector', 'monitor'],
+        'controller': ['controller', 'control', 'processor'],
+        'network': ['network', 'wifi', 'bluetooth', 'connection'],
+    },
+    "feature": {
+        'professional': ['professional', 'business', 'formal'],
+        'concise': ['short', 'brief', 'concise', 'quick'],
+        'announcement': ['announce', 'launch', 'release'],
+        'team_communication': ['team', 'marketing', 'group'],
+        'automation': ['auto', 'automatic', 'smart'],
+        'security': ['secure', 'security', 'auth', 'login'],
+        'mobile': ['mobile', 'phone', 'app'],
+        'cloud': ['cloud', 'online', 'remote'],
+        'analytics': ['analytics', 'reporting', 'data'],
+        'notification': ['notify', 'alert', 'notification'],
+    },
+})
 
 class MainAgent:
     def __init__(self):
         self.extractor = PromptExtractor()  # Keep for backward compatibility
         self.universal_extractor = UniversalPromptExtractor()  # New universal extractor
-        self.spec_outputs_dir = Path("spec_outputs")
-        self.spec_outputs_dir.mkdir(exist_ok=True)
+        self.artifact_sink = get_artifact_sink()
+
+    @property
+    def spec_outputs_dir(self) -> Path:
+        """Directory for spec files written on request (save_spec, RL iterations), created on first use"""
+        directory = Path(ARTIFACT_DIR)
+        directory.mkdir(parents=True, exist_ok=True)
+        return directory
 
     def run(self, prompt: str, use_universal: bool = True) -> UniversalDesignSpec:
         """BHIV Core Hook: Single entry point for orchestration"""
         spec = self.generate_spec(prompt, use_universal=use_universal)
 
-        # Always save spec to file
+        # Hand the spec to the configured artifact sink (ARTIFACT_SINK); it writes in the background
         try:
-            spec_file = self.save_spec(spec, prompt)
-            print(f"Spec saved to file: {spec_file}")
+            self.artifact_sink.save(prompt, spec.model_dump())
         except Exception as e:
-            print(f"Failed to save spec file: {e}")
-
-        # Save to DB via clean interface
-        try:
-            from src.data.database import Database
-            db = Database()
-            spec_id = db.save_spec(prompt, spec.model_dump(), 'MainAgent')
-            print(f"Spec saved to DB with ID: {spec_id}")
-        except Exception as e:
-            print(f"DB save failed, using fallback: {e}")
+            print(f"[WARN] Failed to queue spec artifacts: {e}")
 
         return spec
 
+    def run_batch(self, prompts: List[str], persist: bool = True) -> List[Tuple[Optional[str], UniversalDesignSpec]]:
+        """Batch counterpart of run(): specs for every prompt plus their DB ids (None when not persisted).
+
+        Specs are saved with one multi-row insert instead of a file and a DB
+        write per prompt.
+        """
+        specs = self.generate_specs(prompts)
+        spec_ids: List[Optional[str]] = [None] * len(specs)
+        if persist and specs:
+            try:
+                from src.data.database import get_database
+                # One insert for the whole batch, not a write-behind enqueue per row
+                spec_ids = get_database().save_specs(
+                    [(prompt, spec.model_dump()) for prompt, spec in zip(prompts, specs)], 'MainAgent',
+                    write_behind=False
+                )
+            except Exception as e:
+                print(f"Batch DB save failed: {e}")
+        return list(zip(spec_ids, specs))
+
+    def generate_specs(self, prompts: List[str]) -> List[UniversalDesignSpec]:
+        """Rule-based specs for many prompts at once (one keyword matrix for the batch)"""
+        for i, prompt in enumerate(prompts):
+            if not prompt or len(prompt.strip()) < 3:
+                raise ValueError(f"Prompt {i} must be at least 3 characters long")
+        return self.universal_extractor.extract_specs(prompts)
+
     def generate_spec(self, prompt: str, use_llm: bool = False, use_universal: bool = True) -> UniversalDesignSpec:
         """Generate design specification with LLM integration"""
         if not prompt or len(prompt.strip()) < 3:
@@ -165,22 +221,11 @@ class MainAgent:
 
 
     def save_spec(self, spec: UniversalDesignSpec, prompt: str = "") -> str:
-        """Save specification to file"""
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"design_spec_{timestamp}.json"
-        filepath = self.spec_outputs_dir / filename
-
-        output_data = {
-            "prompt": prompt,
-            "specification": spec.model_dump(),
-            "metadata": {
-                "generated_at": datetime.now().isoformat(),
-                "generator": "MainAgent"
-            }
-        }
+        """Save specification to file now (for callers that need the file itself; run() uses the artifact sink)"""
+        filepath = self.spec_outputs_dir / artifact_name()
 
         with open(filepath, 'w') as f:
-            json.dump(output_data, f, indent=2, default=str)
+            json.dump(artifact_document(prompt, spec.model_dump()), f, indent=2, default=str)
 
         return str(filepath)
 
@@ -247,31 +292,8 @@ class MainAgent:
 
     def _extract_design_type(self, prompt: str) -> str:
         """Extract the type of design from prompt"""
-        prompt_lower = prompt.lower()
-
-        # Email keywords
-        if any(word in prompt_lower for word in ['email', 'message', 'letter', 'announcement', 'communication']):
-            return "email"
-
-        # Task/Project keywords
-        elif any(word in prompt_lower for word in ['task', 'project', 'plan', 'timeline', 'schedule', 'launch']):
-            return "task"
-
-        # Building-related keywords (including residential)
-        elif any(word in prompt_lower for word in ['building', 'house', 'office', 'warehouse', 'hospital', 'construction', 'architect', 'residential', 'apartment']):
-            return "building"
-
-        # Software/App keywords
-        elif any(word in prompt_lower for word in ['chatbot', 'app', 'software', 'system', 'platform', 'website', 'api']):
-            return "software"
-
-        # Product keywords
-        elif any(word in prompt_lower for word in ['product', 'device', 'gadget', 'thermostat', 'sensor', 'controller']):
-            return "product"
-
-        # Default to general design
-        else:
-            return "general"
+        # Email, task, building, software, then product keywords; default to general design
+        return KEYWORDS.match(prompt).first("design_type", "general")
 
     def _generate_general_spec(self, prompt: str, design_type: str) -> DesignSpec:
         """Generate specification for non-building designs"""
@@ -305,47 +327,11 @@ class MainAgent:
 
     def _extract_components(self, prompt: str) -> list:
         """Extract main components from prompt"""
-        components = []
-        prompt_lower = prompt.lower()
-
-        # Common design components
-        component_keywords = {
-            'interface': ['ui', 'interface', 'screen', 'display'],
-            'database': ['database', 'storage', 'data'],
-            'api': ['api', 'endpoint', 'service'],
-            'sensor': ['sensor', 'detector', 'monitor'],
-            'controller': ['controller', 'control', 'processor'],
-            'network': ['network', 'wifi', 'bluetooth', 'connection']
-        }
-
-        for component, keywords in component_keywords.items():
-            if any(keyword in prompt_lower for keyword in keywords):
-                components.append(component)
-
-        return components
+        return KEYWORDS.match(prompt).concepts("component")
 
     def _extract_general_features(self, prompt: str) -> list:
         """Extract features from any design prompt"""
-        features = []
-        prompt_lower = prompt.lower()
-
-        # Common features across designs
-        feature_keywords = {
-            'professional': ['professional', 'business', 'formal'],
-            'concise': ['short', 'brief', 'concise', 'quick'],
-            'announcement': ['announce', 'launch', 'release'],
-            'team_communication': ['team', 'marketing', 'group'],
-            'automation': ['auto', 'automatic', 'smart'],
-            'security': ['secure', 'security', 'auth', 'login'],
-            'mobile': ['mobile', 'phone', 'app'],
-            'cloud': ['cloud', 'online', 'remote'],
-            'analytics': ['analytics', 'reporting', 'data'],
-            'notification': ['notify', 'alert', 'notification']
-        }
-
-        for feature, keywords in feature_keywords.items():
-            if any(keyword in prompt_lower for keyword in keywords):
-                features.append(feature)
+        features = KEYWORDS.match(prompt).concepts("feature")
 
         # Default feature if none found
         if not features:
@@ -151,11 +151,11 @@ class RLLoop:
         """Run RL training loop with DB iteration logging"""
         print(f"Starting RL training loop for prompt: '{prompt}'")
 
-        from src.data.database import Database
+        from src.data.database import get_database
         from src.agents.feedback_agent import FeedbackAgent
         import uuid
 
-        db = Database()
+        db = get_database()
         feedback_agent = FeedbackAgent()
         session_id = str(uuid.uuid4())
 
@@ -261,14 +261,11 @@ class RLLoop:
     def _create_fallback_logs(self, session_id, iteration, prompt, spec_before, spec_after,
                              evaluation_data, feedback_data, score_before, score_after, reward):
         """Create log files when DB fails"""
-        from pathlib import Path
         from datetime import datetime
-        import json
+        from src.data.log_store import get_log_store
 
-        Path("logs").mkdir(exist_ok=True)
-
-        # Create iteration log
-        iteration_entry = {
+        # Save to iteration logs
+        get_log_store("iteration_logs").append({
             "session_id": session_id,
             "iteration": iteration,
             "prompt": prompt,
@@ -280,43 +277,16 @@ class RLLoop:
             "score_after": score_after,
             "reward": reward,
             "timestamp": datetime.now().isoformat()
-        }
-
-        # Save to iteration logs
-        iteration_file = Path("logs/iteration_logs.json")
-        logs = []
-        if iteration_file.exists():
-            with open(iteration_file, 'r') as f:
-                try:
-                    logs = json.load(f)
-                except:
-                    logs = []
-
-        logs.append(iteration_entry)
-        with open(iteration_file, 'w') as f:
-            json.dump(logs, f, indent=2)
+        })
 
         # Save to feedback logs
-        feedback_entry = {
+        get_log_store("feedback_log").append({
             "session_id": session_id,
             "iteration": iteration,
             "prompt": prompt,
             "feedback": feedback_data,
             "timestamp": datetime.now().isoformat()
-        }
-
-        feedback_file = Path("logs/feedback_log.json")
-        feedback_logs = []
-        if feedback_file.exists():
-            with open(feedback_file, 'r') as f:
-                try:
-                    feedback_logs = json.load(f)
-                except:
-                    feedback_logs = []
-
-        feedback_logs.append(feedback_entry)
-        with open(feedback_file, 'w') as f:
-            json.dump(feedback_logs, f, indent=2)
+        })
 
         print(f"Fallback logs created for iteration {iteration}")
 
@@ -1,118 +1,864 @@
 """Redis caching system with in-memory fallback"""
 import redis
+import redis.asyncio as redis_async
 import json
 import hashlib
 import os
 import time
-from typing import Optional, Any, Dict
+import threading
+import asyncio
+import inspect
+import math
+import random
+import uuid
+from collections import OrderedDict
+from typing import Optional, Any, Callable, Dict, List
 from datetime import datetime, timedelta
+from .prompt_normalizer import canonical_prompt, extractor_synonyms
+from .cache_codec import CacheCodec
+
+# Caps for the in-process cache tier
+CACHE_MEMORY_MAX_ENTRIES = int(os.getenv("CACHE_MEMORY_MAX_ENTRIES", "10000"))
+CACHE_MEMORY_MAX_BYTES = int(os.getenv("CACHE_MEMORY_MAX_BYTES", str(64 * 1024 * 1024)))
+
+# L1 entries in front of Redis live briefly so other workers' writes show up quickly
+CACHE_L1_TTL = int(os.getenv("CACHE_L1_TTL", "30"))
+CACHE_PUBSUB_INVALIDATION = os.getenv("CACHE_PUBSUB_INVALIDATION", "true").lower() == "true"
+CACHE_INVALIDATION_CHANNEL = os.getenv("CACHE_INVALIDATION_CHANNEL", "cache:invalidate")
+
+# Cross-worker single-flight: how long a generation lock lives and how long other workers wait on it
+CACHE_LOCK_TTL = float(os.getenv("CACHE_LOCK_TTL", "30"))
+CACHE_LOCK_WAIT = float(os.getenv("CACHE_LOCK_WAIT", "10"))
+CACHE_LOCK_POLL = float(os.getenv("CACHE_LOCK_POLL", "0.05"))
+
+# Cache keys hash the canonical prompt (case/punctuation/stopword-insensitive);
+# synonym folding from the extractor keyword tables is opt-in
+CACHE_KEY_CANONICAL = os.getenv("CACHE_KEY_CANONICAL", "true").lower() == "true"
+CACHE_KEY_SYNONYMS = os.getenv("CACHE_KEY_SYNONYMS", "false").lower() == "true"
+
+# Stale-while-revalidate: how long past its TTL a generated value may still be served while it refreshes,
+# and the XFetch beta (higher refreshes earlier; 0 disables early refresh)
+CACHE_STALE_TTL = int(os.getenv("CACHE_STALE_TTL", "300"))
+CACHE_XFETCH_BETA = float(os.getenv("CACHE_XFETCH_BETA", "1.0"))
+
+# Tag sets (tag:{name} -> cache keys) are refreshed on every write and outlive the entries they index
+CACHE_TAG_TTL = int(os.getenv("CACHE_TAG_TTL", "86400"))
+
+# Keys per SCAN/UNLINK round-trip when clearing the cache
+CACHE_CLEAR_BATCH = int(os.getenv("CACHE_CLEAR_BATCH", "500"))
+
+# Delete the lock only if we still own it
+RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+def spec_tag(spec_id: Any) -> str:
+    """Cache tag for everything derived from one spec; mutations invalidate it"""
+    return f"spec:{spec_id}"
+
+class BoundedTTLCache:
+    """LRU cache with per-entry TTL, bounded by entry count and approximate bytes.
+
+    get/set/evict are O(1). Entry size is the key plus the value's encoded size,
+    which callers pass in from the bytes they already produced for Redis.
+    on_remove(key) is called, under the cache lock, for every key that leaves
+    the cache (evicted, expired, deleted or cleared) and for every value
+    rejected as too large; overwriting a key's value does not call it.
+    """
+
+    def __init__(self, max_entries: int = CACHE_MEMORY_MAX_ENTRIES, max_bytes: int = CACHE_MEMORY_MAX_BYTES,
+                 on_remove: Optional[Callable[[str], None]] = None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.on_remove = on_remove
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (value, expires, size)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.stats = {"evictions": 0, "expirations": 0, "rejected": 0}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key) is not None
+
+    @property
+    def bytes(self) -> int:
+        return self._bytes
+
+    def get(self, key: str) -> Optional[Any]:
+        """Value for key, or None if missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[1] <= time.time():
+                self._remove(key)
+                self.stats["expirations"] += 1
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def set(self, key: str, value: Any, ttl: int, size: Optional[int] = None) -> bool:
+        """Store value, evicting least recently used entries to stay within the caps.
+
+        size is the value's encoded length; without it the value is JSON-encoded to measure it.
+        """
+        size = len(key) + (len(json.dumps(value, default=str)) if size is None else size)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key, replaced=True)  # same key stays cached: keep its tags
+            if size > self.max_bytes or self.max_entries <= 0:
+                self.stats["rejected"] += 1
+                if self.on_remove is not None:
+                    self.on_remove(key)
+                return False
+            self._entries[key] = (value, time.time() + ttl, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.stats["evictions"] += 1
+            return True
+
+    def delete(self, key: str) -> bool:
+        with self._lock:
+            if key not in self._entries:
+                return False
+            self._remove(key)
+            return True
+
+    def purge_expired(self) -> int:
+        """Drop every expired entry; O(n), for maintenance rather than the request path"""
+        now = time.time()
+        with self._lock:
+            expired = [key for key, entry in self._entries.items() if entry[1] <= now]
+            for key in expired:
+                self._remove(key)
+            self.stats["expirations"] += len(expired)
+        return len(expired)
+
+    def clear(self):
+        with self._lock:
+            if self.on_remove is not None:
+                for key in self._entries:
+                    self.on_remove(key)
+            self._entries.clear()
+            self._bytes = 0
+
+    def _remove(self, key: str, replaced: bool = False):
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+        if self.on_remove is not None and not replaced:
+            self.on_remove(key)
+
+class _Flight:
+    """One in-progress generation that concurrent callers in this process wait on"""
 
-class CacheManager:
     def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+
+    def wait(self) -> Any:
+        self.done.wait()
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+class CacheManager:
+    """Two-tier cache: a bounded process-local L1 in front of Redis (L2).
+
+    L2 hits are promoted into L1 for at most CACHE_L1_TTL seconds. Deletes are
+    broadcast over Redis pub/sub so every worker drops its L1 copy. Without
+    Redis, L1 is the only tier and keeps the full TTL.
+
+    cached_generate coalesces concurrent misses for the same prompt: callers in
+    this process share one in-flight computation, and workers elsewhere wait on
+    a Redis lock for the owner to fill the cache. Generated values are stored
+    with their fresh-until time and generation cost: past the TTL they are served
+    stale for up to CACHE_STALE_TTL while a background refresh runs, and hot
+    entries are refreshed early with XFetch probability so they rarely go stale.
+
+    The *_async methods use a redis.asyncio client so handlers never block the
+    event loop on Redis; mget/mset batch many keys into one round-trip.
+
+    Entries can be tagged with what they depend on (e.g. spec:{id});
+    invalidate_tags evicts exactly those entries, in time proportional to
+    the number of tagged keys.
+    """
+
+    def __init__(self, max_entries: int = CACHE_MEMORY_MAX_ENTRIES, max_bytes: int = CACHE_MEMORY_MAX_BYTES,
+                 redis_client=None, l1_ttl: int = CACHE_L1_TTL, pubsub_invalidation: bool = CACHE_PUBSUB_INVALIDATION,
+                 stale_ttl: int = CACHE_STALE_TTL, xfetch_beta: float = CACHE_XFETCH_BETA,
+                 codec: Optional[CacheCodec] = None, async_redis_client=None):
         self.redis_client = None
-        self._memory_cache: Dict[str, Dict[str, Any]] = {}
-        self._cache_stats = {"hits": 0, "misses": 0, "sets": 0}
+        self._redis_url = None
+        self._async_redis = async_redis_client
+        self._async_clients: Dict[asyncio.AbstractEventLoop, tuple] = {}  # loop -> (client, closer), from _redis_url
+        self.codec = codec or CacheCodec()
+        self._memory_cache = BoundedTTLCache(max_entries, max_bytes, on_remove=self._untag)
+        self._cache_stats = {"hits": 0, "misses": 0, "sets": 0, "l1_hits": 0, "l2_hits": 0, "l2_misses": 0,
+                             "invalidations_received": 0, "generations": 0, "coalesced_local": 0,
+                             "coalesced_remote": 0, "lock_fallbacks": 0, "stale_served": 0, "early_refreshes": 0,
+                             "background_refreshes": 0, "refresh_errors": 0, "tag_invalidations": 0,
+                             "invalidated_keys": 0}
+        self.l1_ttl = l1_ttl
+        self.stale_ttl = stale_ttl
+        self.xfetch_beta = xfetch_beta
+        self._pubsub_thread = None
+        self._inflight: Dict[str, _Flight] = {}
+        self._inflight_async: Dict[str, asyncio.Future] = {}
+        self._inflight_lock = threading.Lock()
+        self._refreshing = set()
+        self._refresh_tasks = set()
+        # Without Redis: tag -> keys and key -> tags, pruned as keys leave L1 so both stay bounded by it
+        self._tags: Dict[str, set] = {}
+        self._key_tags: Dict[str, set] = {}
+        self._tags_lock = threading.Lock()
 
-        try:
-            redis_url = os.getenv("REDIS_URL", "redis://localhost:6379/0")
-            self.redis_client = redis.from_url(
-                redis_url,
-                socket_connect_timeout=2,
-                socket_timeout=2,
-                decode_responses=True
-            )
-            # Test connection
-            self.redis_client.ping()
-            print("[OK] Redis connected successfully")
-        except Exception as e:
-            print(f"[WARN] Redis not available: {e}")
-            print("[INFO] Using in-memory cache fallback")
-            self.redis_client = None
+        if redis_client is not None:
+            self.redis_client = redis_client
+        else:
+            try:
+                redis_url = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+                self._redis_url = redis_url
+                self.redis_client = redis.from_url(
+                    redis_url,
+                    socket_connect_timeout=2,
+                    socket_timeout=2,
+                    decode_responses=False  # values are binary, see cache_codec
+                )
+                # Test connection
+                self.redis_client.ping()
+                print("[OK] Redis connected successfully")
+            except Exception as e:
+                print(f"[WARN] Redis not available: {e}")
+                print("[INFO] Using in-memory cache fallback")
+                self.redis_client = None
+
+        if self.redis_client and pubsub_invalidation:
+            self._start_invalidation_listener()
 
     def get_cache_key(self, prompt: str, operation: str = "generate") -> str:
-        """Generate cache key from prompt"""
+        """Generate cache key from the canonical form of the prompt"""
+        if CACHE_KEY_CANONICAL:
+            prompt = canonical_prompt(prompt, extractor_synonyms() if CACHE_KEY_SYNONYMS else None)
         key_data = f"{operation}:{prompt}"
         return hashlib.sha256(key_data.encode()).hexdigest()[:16]
 
     def get(self, key: str) -> Optional[Any]:
-        """Get cached result"""
+        """Get cached result from L1, then Redis (promoting hits into L1)"""
+        value = self._l1_get(key)
+        if value is not None:
+            return value
+
         if self.redis_client:
             try:
-                cached = self.redis_client.get(f"prompt:{key}")
-                if cached:
-                    self._cache_stats["hits"] += 1
-                    return json.loads(cached)
+                return self._l2_reply(key, self.redis_client.get(f"prompt:{key}"))
             except Exception:
                 pass
 
-        # Check memory cache with TTL
-        if key in self._memory_cache:
-            cache_entry = self._memory_cache[key]
-            if cache_entry["expires"] > time.time():
-                self._cache_stats["hits"] += 1
-                return cache_entry["value"]
-            else:
-                # Expired, remove it
-                del self._memory_cache[key]
+        self._cache_stats["misses"] += 1
+        return None
+
+    async def get_async(self, key: str) -> Optional[Any]:
+        """get() without blocking the event loop on Redis"""
+        value = self._l1_get(key)
+        if value is not None:
+            return value
+
+        if self.redis_client:
+            try:
+                return self._l2_reply(key, await self._redis_call("get", f"prompt:{key}"))
+            except Exception:
+                pass
 
         self._cache_stats["misses"] += 1
         return None
 
+    def mget(self, keys: List[str]) -> Dict[str, Any]:
+        """Cached values for the keys that are present; L1 misses cost one Redis round-trip in total"""
+        found, remote = self._l1_get_many(keys)
+        if remote:
+            try:
+                replies = self.redis_client.mget([f"prompt:{key}" for key in remote])
+            except Exception:
+                replies = [None] * len(remote)
+            found.update(self._l2_replies(remote, replies))
+        return found
+
+    async def mget_async(self, keys: List[str]) -> Dict[str, Any]:
+        found, remote = self._l1_get_many(keys)
+        if remote:
+            try:
+                replies = await self._redis_call("mget", [f"prompt:{key}" for key in remote])
+            except Exception:
+                replies = [None] * len(remote)
+            found.update(self._l2_replies(remote, replies))
+        return found
+
     def set(self, key: str, value: Any, ttl: int = 3600) -> bool:
         """Cache result with TTL (default 1 hour)"""
         self._cache_stats["sets"] += 1
 
+        encoded = self.codec.encode(value)
         if self.redis_client:
             try:
-                self.redis_client.setex(
-                    f"prompt:{key}",
-                    ttl,
-                    json.dumps(value, default=str)
-                )
+                self.redis_client.setex(f"prompt:{key}", ttl, encoded)
+                self._memory_cache.set(key, value, min(ttl, self.l1_ttl), len(encoded))
                 return True
             except Exception:
                 pass
 
-        # Memory cache with TTL
-        self._memory_cache[key] = {
-            "value": value,
-            "expires": time.time() + ttl
-        }
+        # Memory cache with TTL, bounded by entry count and bytes
+        return self._memory_cache.set(key, value, ttl, len(encoded))
 
-        # Clean up expired entries periodically
-        if len(self._memory_cache) % 100 == 0:
-            self._cleanup_expired()
+    async def set_async(self, key: str, value: Any, ttl: int = 3600) -> bool:
+        self._cache_stats["sets"] += 1
 
-        return True
+        encoded = self.codec.encode(value)
+        if self.redis_client:
+            try:
+                await self._redis_call("setex", f"prompt:{key}", ttl, encoded)
+                self._memory_cache.set(key, value, min(ttl, self.l1_ttl), len(encoded))
+                return True
+            except Exception:
+                pass
 
-    def cached_generate(self, prompt: str, generator_func):
-        """Cache wrapper for generate operations"""
-        cache_key = self.get_cache_key(prompt, "generate")
+        return self._memory_cache.set(key, value, ttl, len(encoded))
 
-        # Try cache first
-        cached_result = self.get(cache_key)
-        if cached_result:
-            return cached_result
+    def mset(self, items: Dict[str, Any], ttl: int = 3600) -> bool:
+        """Cache several values with one pipelined Redis round-trip"""
+        self._cache_stats["sets"] += len(items)
+        encoded = {key: self.codec.encode(value) for key, value in items.items()}
+        if self.redis_client:
+            try:
+                self._pipeline_setex(encoded, ttl)
+                ttl = min(ttl, self.l1_ttl)
+            except Exception:
+                pass
+        return all([self._memory_cache.set(key, value, ttl, len(encoded[key])) for key, value in items.items()])
+
+    async def mset_async(self, items: Dict[str, Any], ttl: int = 3600) -> bool:
+        self._cache_stats["sets"] += len(items)
+        encoded = {key: self.codec.encode(value) for key, value in items.items()}
+        if self.redis_client:
+            try:
+                client = self._async_client()
+                if client is None:
+                    await asyncio.to_thread(self._pipeline_setex, encoded, ttl)
+                else:
+                    pipe = client.pipeline(transaction=False)
+                    for key, data in encoded.items():
+                        pipe.setex(f"prompt:{key}", ttl, data)
+                    await pipe.execute()
+                ttl = min(ttl, self.l1_ttl)
+            except Exception:
+                pass
+        return all([self._memory_cache.set(key, value, ttl, len(encoded[key])) for key, value in items.items()])
+
+    def _pipeline_setex(self, encoded: Dict[str, bytes], ttl: int):
+        pipe = self.redis_client.pipeline(transaction=False)
+        for key, data in encoded.items():
+            pipe.setex(f"prompt:{key}", ttl, data)
+        pipe.execute()
+
+    def _l1_get(self, key: str) -> Optional[Any]:
+        value = self._memory_cache.get(key)
+        if value is not None:
+            self._cache_stats["hits"] += 1
+            self._cache_stats["l1_hits"] += 1
+        return value
+
+    def _l1_get_many(self, keys: List[str]):
+        """(values found in L1, keys still to look up in Redis); without Redis the rest are misses"""
+        found, remote = {}, []
+        for key in dict.fromkeys(keys):
+            value = self._l1_get(key)
+            if value is not None:
+                found[key] = value
+            elif self.redis_client:
+                remote.append(key)
+            else:
+                self._cache_stats["misses"] += 1
+        return found, remote
 
-        # Generate and cache
-        result = generator_func(prompt)
-        self.set(cache_key, result)
-        return result
+    def _l2_reply(self, key: str, cached) -> Optional[Any]:
+        """Decode a Redis reply, promoting a hit into L1"""
+        if not cached:
+            self._cache_stats["l2_misses"] += 1
+            self._cache_stats["misses"] += 1
+            return None
+        value = self.codec.decode(cached)
+        self._memory_cache.set(key, value, self.l1_ttl, len(cached))
+        self._cache_stats["hits"] += 1
+        self._cache_stats["l2_hits"] += 1
+        return value
+
+    def _l2_replies(self, keys: List[str], replies) -> Dict[str, Any]:
+        found = {}
+        for key, cached in zip(keys, replies):
+            try:
+                value = self._l2_reply(key, cached)
+            except Exception:
+                self._cache_stats["misses"] += 1
+                continue
+            if value is not None:
+                found[key] = value
+        return found
+
+    def _async_client(self):
+        """redis.asyncio client for the running loop; None when a sync client was injected without one.
+
+        Each loop gets its own client (connections are bound to the loop that opened them), and
+        the client is closed when its loop shuts down.
+        """
+        if self._redis_url is None:
+            return self._async_redis
+        loop = asyncio.get_running_loop()
+        entry = self._async_clients.get(loop)
+        if entry is None:
+            # Loops closed without shutting down their async generators leave their entry behind
+            for stale in [other for other in self._async_clients if other.is_closed()]:
+                del self._async_clients[stale]
+            client = redis_async.from_url(
+                self._redis_url,
+                socket_connect_timeout=2,
+                socket_timeout=2,
+                decode_responses=False
+            )
+            closer = self._close_with_loop(loop, client)
+            entry = self._async_clients[loop] = (client, closer)
+            loop.create_task(closer.__anext__())  # registers closer with the loop
+        return entry[0]
+
+    async def _close_with_loop(self, loop: asyncio.AbstractEventLoop, client):
+        """Held open until the loop finalizes its async generators (asyncio.run and uvicorn do on
+        shutdown), then closes client while the loop can still run its disconnects"""
+        try:
+            yield
+        finally:
+            if self._async_clients.get(loop, (None,))[0] is client:
+                del self._async_clients[loop]
+            try:
+                await client.aclose()
+            except Exception as e:
+                print(f"[WARN] Could not close async Redis client: {e}")
 
-    def _cleanup_expired(self):
-        """Remove expired entries from memory cache"""
-        current_time = time.time()
-        expired_keys = [
-            key for key, entry in self._memory_cache.items()
-            if entry["expires"] <= current_time
-        ]
-        for key in expired_keys:
-            del self._memory_cache[key]
+    async def _redis_call(self, command: str, *args, **kwargs):
+        """Run a Redis command on the async client, or on the sync client in a worker thread"""
+        client = self._async_client()
+        if client is None:
+            return await asyncio.to_thread(getattr(self.redis_client, command), *args, **kwargs)
+        return await getattr(client, command)(*args, **kwargs)
+
+    def delete(self, key: str) -> bool:
+        """Remove a key from both tiers and tell other workers to drop their L1 copy"""
+        removed = self._memory_cache.delete(key)
+        if self.redis_client:
+            try:
+                removed = bool(self.redis_client.delete(f"prompt:{key}")) or removed
+                self._publish_invalidation(key)
+            except Exception:
+                pass
+        return removed
+
+    def _publish_invalidation(self, key: str):
+        if self._pubsub_thread is not None:
+            self.redis_client.publish(CACHE_INVALIDATION_CHANNEL, key)
+
+    def _start_invalidation_listener(self):
+        """Subscribe to invalidation messages on a background thread"""
+        try:
+            pubsub = self.redis_client.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(**{CACHE_INVALIDATION_CHANNEL: self._on_invalidation})
+            self._pubsub_thread = pubsub.run_in_thread(sleep_time=1.0, daemon=True)
+        except Exception as e:
+            print(f"[WARN] Cache invalidation listener not started: {e}")
+            self._pubsub_thread = None
+
+    def _on_invalidation(self, message: Dict[str, Any]):
+        data = message.get("data")
+        if isinstance(data, bytes):
+            data = data.decode()
+        self._cache_stats["invalidations_received"] += 1
+        if data == "*":
+            self._memory_cache.clear()
+        else:
+            for key in data.split("\n"):  # tag invalidations send every evicted key at once
+                self._memory_cache.delete(key)
+
+    def tag(self, key: str, tags: List[str]):
+        """Record that key depends on each tag, so invalidate_tags can evict it"""
+        if not tags:
+            return
+        if self.redis_client:
+            try:
+                self._run_pipeline(self._tag_commands(key, tags))
+                return
+            except Exception:
+                pass
+        self._tag_locally(key, tags)
+
+    async def tag_async(self, key: str, tags: List[str]):
+        if not tags:
+            return
+        if self.redis_client:
+            try:
+                await self._run_pipeline_async(self._tag_commands(key, tags))
+                return
+            except Exception:
+                pass
+        self._tag_locally(key, tags)
+
+    def _tag_locally(self, key: str, tags: List[str]):
+        with self._tags_lock:
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            self._key_tags.setdefault(key, set()).update(tags)
+
+    def _untag(self, key: str):
+        """L1 on_remove hook: drop key from every tag it was recorded under"""
+        if key not in self._key_tags:
+            return
+        with self._tags_lock:
+            for tag in self._key_tags.pop(key, ()):
+                keys = self._tags.get(tag)
+                if keys is not None:
+                    keys.discard(key)
+                    if not keys:
+                        del self._tags[tag]
+
+    def invalidate_tags(self, *tags: str) -> int:
+        """Evict every entry tagged with any of tags, here and (via pub/sub) in other workers' L1"""
+        with self._tags_lock:
+            keys = set().union(*[self._tags.pop(tag, set()) for tag in tags])
+
+        if self.redis_client:
+            try:
+                members = self._run_pipeline([("smembers", (f"tag:{tag}",)) for tag in tags])
+                keys.update(k.decode() if isinstance(k, bytes) else k for found in members for k in found)
+                stale = [f"prompt:{key}" for key in keys] + [f"tag:{tag}" for tag in tags]
+                self._unlink(stale)
+                if keys:
+                    self._publish_invalidation("\n".join(sorted(keys)))
+            except Exception as e:
+                print(f"[WARN] Tag invalidation failed for {', '.join(tags)}: {e}")
+
+        for key in keys:
+            self._memory_cache.delete(key)
+        self._cache_stats["tag_invalidations"] += len(tags)
+        self._cache_stats["invalidated_keys"] += len(keys)
+        return len(keys)
+
+    async def invalidate_tags_async(self, *tags: str) -> int:
+        """invalidate_tags() off the event loop; mutations are rare, so a worker thread is enough"""
+        return await asyncio.to_thread(self.invalidate_tags, *tags)
+
+    @staticmethod
+    def _tag_commands(key: str, tags: List[str]):
+        commands = []
+        for tag in tags:
+            commands.append(("sadd", (f"tag:{tag}", key)))
+            commands.append(("expire", (f"tag:{tag}", CACHE_TAG_TTL)))
+        return commands
+
+    def _run_pipeline(self, commands) -> List[Any]:
+        pipe = self.redis_client.pipeline(transaction=False)
+        for command, args in commands:
+            getattr(pipe, command)(*args)
+        return pipe.execute()
+
+    async def _run_pipeline_async(self, commands) -> List[Any]:
+        client = self._async_client()
+        if client is None:
+            return await asyncio.to_thread(self._run_pipeline, commands)
+        pipe = client.pipeline(transaction=False)
+        for command, args in commands:
+            getattr(pipe, command)(*args)
+        return await pipe.execute()
+
+    def cached_generate(self, prompt: str, generator_func, ttl: int = 3600, operation: str = "generate",
+                        cache_key: Optional[str] = None):
+        """Cache wrapper for generate operations; concurrent misses share one generator call"""
+        cache_key = cache_key or self.get_cache_key(prompt, operation)
+
+        # Try cache first; stale or soon-to-expire entries are refreshed in the background
+        entry = self.get(cache_key)
+        if entry is not None:
+            if self._needs_refresh(entry) and self._claim_refresh(cache_key):
+                threading.Thread(target=self._refresh, args=(cache_key, prompt, generator_func, ttl), daemon=True).start()
+            return self._unwrap(entry)
+
+        with self._inflight_lock:
+            flight = self._inflight.get(cache_key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[cache_key] = _Flight()
+        if not leader:
+            self._cache_stats["coalesced_local"] += 1
+            return flight.wait()
+
+        try:
+            flight.result = self._generate_once(cache_key, prompt, generator_func, ttl)
+            return flight.result
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._inflight_lock:
+                self._inflight.pop(cache_key, None)
+            flight.done.set()
+
+    async def cached_generate_async(self, prompt: str, generator_func, ttl: int = 3600, operation: str = "generate",
+                                    cache_key: Optional[str] = None, with_source: bool = False):
+        """Async cached_generate; generator_func may be a coroutine function or a blocking callable.
+
+        With with_source, returns (value, source): "hit" when served from the cache, "coalesced"
+        when another caller's computation was awaited, "computed" when generator_func ran for it.
+        """
+        cache_key = cache_key or self.get_cache_key(prompt, operation)
+        loop = asyncio.get_running_loop()
+
+        def answer(value, source):
+            return (value, source) if with_source else value
+
+        entry = await self.get_async(cache_key)
+        if entry is not None:
+            if self._needs_refresh(entry) and self._claim_refresh(cache_key):
+                task = loop.create_task(self._refresh_async(cache_key, prompt, generator_func, ttl))
+                self._refresh_tasks.add(task)
+                task.add_done_callback(self._refresh_tasks.discard)
+            return answer(self._unwrap(entry), "hit")
+
+        future = self._inflight_async.get(cache_key)
+        if future is not None and future.get_loop() is loop:
+            self._cache_stats["coalesced_local"] += 1
+            return answer(await asyncio.shield(future), "coalesced")
+
+        future = self._inflight_async[cache_key] = loop.create_future()
+        try:
+            result, source = await self._generate_once_async(cache_key, prompt, generator_func, ttl)
+            future.set_result(result)
+            return answer(result, source)
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # mark retrieved when nobody was waiting
+            raise
+        finally:
+            if self._inflight_async.get(cache_key) is future:
+                del self._inflight_async[cache_key]
+
+    def _generate_once(self, key: str, prompt: str, generator_func, ttl: int):
+        """Run the generator unless another worker holds the lock and fills the cache meanwhile"""
+        token = self._acquire_lock(key)
+        if token is None:
+            deadline = time.monotonic() + CACHE_LOCK_WAIT
+            while True:
+                value, locked = self._peek_remote(key)
+                if value is not None:
+                    return self._unwrap(value)
+                if not locked or time.monotonic() >= deadline:
+                    break
+                time.sleep(CACHE_LOCK_POLL)
+            token = self._after_wait(key)
+
+        try:
+            start = time.perf_counter()
+            result = generator_func(prompt)
+            self._store(key, result, ttl, time.perf_counter() - start)
+            return result
+        finally:
+            self._release_lock(key, token)
+
+    async def _generate_once_async(self, key: str, prompt: str, generator_func, ttl: int):
+        token = await self._acquire_lock_async(key)
+        if token is None:
+            deadline = time.monotonic() + CACHE_LOCK_WAIT
+            while True:
+                value, locked = await self._peek_remote_async(key)
+                if value is not None:
+                    return self._unwrap(value), "coalesced"
+                if not locked or time.monotonic() >= deadline:
+                    break
+                await asyncio.sleep(CACHE_LOCK_POLL)
+            self._cache_stats["lock_fallbacks"] += 1
+            token = await self._acquire_lock_async(key)
+
+        try:
+            start = time.perf_counter()
+            result = await self._call_async(generator_func, prompt)
+            await self._store_async(key, result, ttl, time.perf_counter() - start)
+            return result, "computed"
+        finally:
+            await self._release_lock_async(key, token)
+
+    @staticmethod
+    async def _call_async(generator_func, prompt: str):
+        if inspect.iscoroutinefunction(generator_func):
+            return await generator_func(prompt)
+        return await asyncio.to_thread(generator_func, prompt)
+
+    def _store(self, key: str, result: Any, ttl: int, delta: float):
+        """Cache a generated value with its freshness deadline and cost, kept stale_ttl past expiry"""
+        self.set(key, self._entry(result, ttl, delta), ttl + self.stale_ttl)
+
+    async def _store_async(self, key: str, result: Any, ttl: int, delta: float):
+        await self.set_async(key, self._entry(result, ttl, delta), ttl + self.stale_ttl)
+
+    def _entry(self, result: Any, ttl: int, delta: float) -> Dict[str, Any]:
+        self._cache_stats["generations"] += 1
+        return {"_swr": 1, "value": result, "fresh_until": time.time() + ttl, "delta": round(delta, 4)}
+
+    @staticmethod
+    def _unwrap(entry: Any) -> Any:
+        # Values cached before stale-while-revalidate (or set directly) are returned as-is
+        if isinstance(entry, dict) and entry.get("_swr"):
+            return entry["value"]
+        return entry
+
+    def _needs_refresh(self, entry: Any) -> bool:
+        """True once the entry is stale, or earlier with XFetch probability beta * delta * -ln(rand)"""
+        if not (isinstance(entry, dict) and entry.get("_swr")):
+            return False
+        now = time.time()
+        if now >= entry["fresh_until"]:
+            self._cache_stats["stale_served"] += 1
+            return True
+        if self.xfetch_beta > 0 and entry["delta"] > 0:
+            if now - entry["delta"] * self.xfetch_beta * math.log(1.0 - random.random()) >= entry["fresh_until"]:
+                self._cache_stats["early_refreshes"] += 1
+                return True
+        return False
+
+    def _claim_refresh(self, key: str) -> bool:
+        """Only one background refresh per key at a time, and none while a miss is generating it"""
+        with self._inflight_lock:
+            if key in self._refreshing or key in self._inflight or key in self._inflight_async:
+                return False
+            self._refreshing.add(key)
+            return True
+
+    def _refresh(self, key: str, prompt: str, generator_func, ttl: int):
+        """Regenerate in the background; on failure the stale value keeps being served"""
+        token = self._acquire_lock(key)
+        try:
+            if token is None:
+                return  # another worker is already refreshing this key
+            start = time.perf_counter()
+            result = generator_func(prompt)
+            self._store(key, result, ttl, time.perf_counter() - start)
+            self._cache_stats["background_refreshes"] += 1
+        except Exception as e:
+            self._cache_stats["refresh_errors"] += 1
+            print(f"[WARN] Background cache refresh failed for {key}: {e}")
+        finally:
+            self._release_lock(key, token)
+            with self._inflight_lock:
+                self._refreshing.discard(key)
+
+    async def _refresh_async(self, key: str, prompt: str, generator_func, ttl: int):
+        token = await self._acquire_lock_async(key)
+        try:
+            if token is None:
+                return
+            start = time.perf_counter()
+            result = await self._call_async(generator_func, prompt)
+            await self._store_async(key, result, ttl, time.perf_counter() - start)
+            self._cache_stats["background_refreshes"] += 1
+        except Exception as e:
+            self._cache_stats["refresh_errors"] += 1
+            print(f"[WARN] Background cache refresh failed for {key}: {e}")
+        finally:
+            await self._release_lock_async(key, token)
+            with self._inflight_lock:
+                self._refreshing.discard(key)
+
+    def _acquire_lock(self, key: str) -> Optional[str]:
+        """Token if this worker may generate (always, without Redis); None if another worker holds the lock"""
+        token = uuid.uuid4().hex
+        if not self.redis_client:
+            return token
+        try:
+            if self.redis_client.set(f"lock:prompt:{key}", token, nx=True, px=int(CACHE_LOCK_TTL * 1000)):
+                return token
+            return None
+        except Exception:
+            return token
+
+    async def _acquire_lock_async(self, key: str) -> Optional[str]:
+        token = uuid.uuid4().hex
+        if not self.redis_client:
+            return token
+        try:
+            if await self._redis_call("set", f"lock:prompt:{key}", token, nx=True, px=int(CACHE_LOCK_TTL * 1000)):
+                return token
+            return None
+        except Exception:
+            return token
+
+    def _peek_remote(self, key: str):
+        """(cached value, lock still held) straight from Redis, without touching hit/miss stats"""
+        try:
+            cached = self.redis_client.get(f"prompt:{key}")
+            if cached:
+                return self._coalesced(key, cached), True
+            return None, bool(self.redis_client.exists(f"lock:prompt:{key}"))
+        except Exception:
+            return None, False
+
+    async def _peek_remote_async(self, key: str):
+        try:
+            cached = await self._redis_call("get", f"prompt:{key}")
+            if cached:
+                return self._coalesced(key, cached), True
+            return None, bool(await self._redis_call("exists", f"lock:prompt:{key}"))
+        except Exception:
+            return None, False
+
+    def _coalesced(self, key: str, cached) -> Any:
+        value = self.codec.decode(cached)
+        self._memory_cache.set(key, value, self.l1_ttl, len(cached))
+        self._cache_stats["coalesced_remote"] += 1
+        return value
+
+    def _after_wait(self, key: str) -> Optional[str]:
+        """The lock owner failed or outlasted CACHE_LOCK_WAIT without a result, so generate here"""
+        self._cache_stats["lock_fallbacks"] += 1
+        return self._acquire_lock(key)
+
+    def _release_lock(self, key: str, token: Optional[str]):
+        if not self.redis_client or token is None:
+            return
+        try:
+            self.redis_client.eval(RELEASE_LOCK_SCRIPT, 1, f"lock:prompt:{key}", token)
+        except Exception:
+            pass
+
+    async def _release_lock_async(self, key: str, token: Optional[str]):
+        if not self.redis_client or token is None:
+            return
+        try:
+            await self._redis_call("eval", RELEASE_LOCK_SCRIPT, 1, f"lock:prompt:{key}", token)
+        except Exception:
+            pass
+
+    def _unlink(self, keys: List[Any]):
+        try:
+            self.redis_client.unlink(*keys)
+        except redis.ResponseError:
+            self.redis_client.delete(*keys)  # UNLINK needs Redis 4+
 
     def get_stats(self) -> Dict[str, Any]:
         """Get cache statistics"""
         total_requests = self._cache_stats["hits"] + self._cache_stats["misses"]
         hit_rate = (self._cache_stats["hits"] / total_requests * 100) if total_requests > 0 else 0
+        l1_hit_rate = (self._cache_stats["l1_hits"] / total_requests * 100) if total_requests > 0 else 0
+        l2_lookups = self._cache_stats["l2_hits"] + self._cache_stats["l2_misses"]
+        l2_hit_rate = (self._cache_stats["l2_hits"] / l2_lookups * 100) if l2_lookups > 0 else 0
 
         return {
             "cache_type": "Redis" if self.redis_client else "Memory",
@@ -120,23 +866,64 @@ class CacheManager:
             "misses": self._cache_stats["misses"],
             "sets": self._cache_stats["sets"],
             "hit_rate_percent": round(hit_rate, 2),
+            "l1_hits": self._cache_stats["l1_hits"],
+            "l2_hits": self._cache_stats["l2_hits"],
+            "l2_misses": self._cache_stats["l2_misses"],
+            "l1_hit_rate_percent": round(l1_hit_rate, 2),
+            "l2_hit_rate_percent": round(l2_hit_rate, 2),
+            "l1_ttl_seconds": self.l1_ttl if self.redis_client else None,
+            "invalidation_listener": self._pubsub_thread is not None,
+            "invalidations_received": self._cache_stats["invalidations_received"],
+            "generations": self._cache_stats["generations"],
+            "coalesced_local": self._cache_stats["coalesced_local"],
+            "coalesced_remote": self._cache_stats["coalesced_remote"],
+            "lock_fallbacks": self._cache_stats["lock_fallbacks"],
+            "inflight": len(self._inflight) + len(self._inflight_async),
+            "stale_served": self._cache_stats["stale_served"],
+            "early_refreshes": self._cache_stats["early_refreshes"],
+            "background_refreshes": self._cache_stats["background_refreshes"],
+            "refresh_errors": self._cache_stats["refresh_errors"],
+            "stale_ttl_seconds": self.stale_ttl,
+            "tag_invalidations": self._cache_stats["tag_invalidations"],
+            "invalidated_keys": self._cache_stats["invalidated_keys"],
             "memory_cache_size": len(self._memory_cache),
-            "redis_connected": self.redis_client is not None
+            "memory_cache_bytes": self._memory_cache.bytes,
+            "memory_cache_max_entries": self._memory_cache.max_entries,
+            "memory_cache_max_bytes": self._memory_cache.max_bytes,
+            "memory_evictions": self._memory_cache.stats["evictions"],
+            "memory_expirations": self._memory_cache.stats["expirations"],
+            "memory_rejected": self._memory_cache.stats["rejected"],
+            "redis_connected": self.redis_client is not None,
+            "async_redis": self.redis_client is not None and (self._redis_url is not None or self._async_redis is not None),
+            "codec": f"{self.codec.serializer}+{self.codec.compression}",
+            "codec_min_size": self.codec.min_size
         }
 
     def clear_cache(self) -> bool:
         """Clear all cached data"""
         try:
             if self.redis_client:
-                # Clear Redis cache
-                for key in self.redis_client.scan_iter(match="prompt:*"):
-                    self.redis_client.delete(key)
+                # Clear Redis cache, unlinking (non-blocking delete) a batch of keys per round-trip
+                for pattern in ("prompt:*", "tag:*"):
+                    batch = []
+                    for key in self.redis_client.scan_iter(match=pattern, count=CACHE_CLEAR_BATCH):
+                        batch.append(key)
+                        if len(batch) >= CACHE_CLEAR_BATCH:
+                            self._unlink(batch)
+                            batch = []
+                    if batch:
+                        self._unlink(batch)
+
+                self._publish_invalidation("*")
 
             # Clear memory cache
             self._memory_cache.clear()
+            with self._tags_lock:
+                self._tags.clear()
+                self._key_tags.clear()
 
             # Reset stats
-            self._cache_stats = {"hits": 0, "misses": 0, "sets": 0}
+            self._cache_stats = {key: 0 for key in self._cache_stats}
 
             return True
         except Exception:
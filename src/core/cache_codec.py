@@ -0,0 +1,124 @@
+"""Tagged binary encoding for cached values: a serializer plus optional compression"""
+
+import json
+import os
+import zlib
+from typing import Any, Optional, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:
+    lz4_frame = None
+
+CACHE_CODEC_SERIALIZER = os.getenv("CACHE_CODEC_SERIALIZER", "auto")    # auto, orjson, msgpack, json
+CACHE_CODEC_COMPRESSION = os.getenv("CACHE_CODEC_COMPRESSION", "auto")  # auto, zstd, lz4, zlib, none
+CACHE_CODEC_MIN_SIZE = int(os.getenv("CACHE_CODEC_MIN_SIZE", "1024"))   # compress payloads at least this big
+CACHE_CODEC_LEVEL = int(os.getenv("CACHE_CODEC_LEVEL", "3"))
+
+# Encoded values start with MAGIC and one format byte (serializer << 4 | compressor).
+# 0xC1 is never the first byte of JSON text or of UTF-8, so untagged legacy JSON still decodes.
+MAGIC = b"\xc1"
+
+SERIALIZERS = {"json": 0, "orjson": 1, "msgpack": 2}
+COMPRESSORS = {"none": 0, "zlib": 1, "zstd": 2, "lz4": 3}
+SERIALIZER_NAMES = {tag: name for name, tag in SERIALIZERS.items()}
+
+def available_serializers():
+    return [name for name, module in (("orjson", orjson), ("msgpack", msgpack)) if module] + ["json"]
+
+def available_compressors():
+    return [name for name, module in (("zstd", zstandard), ("lz4", lz4_frame)) if module] + ["zlib", "none"]
+
+def _serialize(serializer: str, value: Any) -> bytes:
+    if serializer == "orjson":
+        return orjson.dumps(value, default=str, option=orjson.OPT_NON_STR_KEYS)
+    if serializer == "msgpack":
+        return msgpack.packb(value, default=str, use_bin_type=True)
+    return json.dumps(value, default=str, separators=(",", ":")).encode()
+
+def _deserialize(serializer: str, data: bytes) -> Any:
+    if serializer == "orjson":
+        return orjson.loads(data)
+    if serializer == "msgpack":
+        return msgpack.unpackb(data, raw=False, strict_map_key=False)
+    return json.loads(data)
+
+class CacheCodec:
+    """Encodes values for Redis and decodes anything previously written, whatever the codec.
+
+    The format byte records how each value was written, so codecs can change
+    between deploys without flushing the cache. Payloads under min_size are
+    stored uncompressed, where compression costs more than it saves.
+    """
+
+    def __init__(self, serializer: str = CACHE_CODEC_SERIALIZER, compression: str = CACHE_CODEC_COMPRESSION,
+                 min_size: int = CACHE_CODEC_MIN_SIZE, level: int = CACHE_CODEC_LEVEL):
+        if serializer == "auto":
+            serializer = available_serializers()[0]
+        if compression == "auto":
+            compression = available_compressors()[0]
+        if serializer not in available_serializers():
+            print(f"[WARN] Cache serializer {serializer} not available, using json")
+            serializer = "json"
+        if compression not in available_compressors():
+            print(f"[WARN] Cache compression {compression} not available, using zlib")
+            compression = "zlib"
+        self.serializer = serializer
+        self.compression = compression
+        self.min_size = min_size
+        self.level = level
+        self._zstd_compressor = zstandard.ZstdCompressor(level=level) if compression == "zstd" else None
+
+    def encode(self, value: Any) -> bytes:
+        payload = _serialize(self.serializer, value)
+        compression = self.compression if len(payload) >= self.min_size else "none"
+        if compression == "zstd":
+            payload = self._zstd_compressor.compress(payload)
+        elif compression == "lz4":
+            payload = lz4_frame.compress(payload, compression_level=self.level)
+        elif compression == "zlib":
+            payload = zlib.compress(payload, self.level)
+        return MAGIC + bytes([SERIALIZERS[self.serializer] << 4 | COMPRESSORS[compression]]) + payload
+
+    def decode(self, data: Optional[Union[bytes, str]]) -> Any:
+        if data is None:
+            return None
+        if isinstance(data, str):
+            return json.loads(data)
+        if not data.startswith(MAGIC):
+            return json.loads(data)  # written before tagging
+
+        serializer_id, compressor_id = data[1] >> 4, data[1] & 0x0F
+        payload = data[2:]
+        if compressor_id == COMPRESSORS["zstd"]:
+            if zstandard is None:
+                raise ValueError("zstandard is required to decode this cache entry")
+            payload = zstandard.ZstdDecompressor().decompress(payload)
+        elif compressor_id == COMPRESSORS["lz4"]:
+            if lz4_frame is None:
+                raise ValueError("lz4 is required to decode this cache entry")
+            payload = lz4_frame.decompress(payload)
+        elif compressor_id == COMPRESSORS["zlib"]:
+            payload = zlib.decompress(payload)
+
+        serializer = SERIALIZER_NAMES[serializer_id]
+        if serializer == "orjson" and orjson is None:
+            serializer = "json"  # orjson output is plain JSON
+        elif serializer == "msgpack" and msgpack is None:
+            raise ValueError("msgpack is required to decode this cache entry")
+        return _deserialize(serializer, payload)
@@ -0,0 +1,207 @@
+"""Declarative extraction rules: a JSON rule table compiled into keyword lookups, reloadable in place
+
+Each profile lists its design types in priority order and, per design type, a
+template of output fields ("*" supplies fields a template leaves out). A field is
+{"value": constant}, {"first": rules, "default": x} for the first matching rule, or
+{"all": rules, "always": [...], "default": [...]} for every matching rule, where a
+rule is {"keywords": [...], "value": ...}.
+"""
+
+import copy
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, List, Optional, Sequence
+
+from .keyword_index import KeywordIndex, KeywordMatches
+
+EXTRACTION_RULES_PATH = os.getenv("EXTRACTION_RULES_PATH") or str(Path(__file__).with_name("extraction_rules.json"))
+EXTRACTION_RULES_RELOAD_INTERVAL = float(os.getenv("EXTRACTION_RULES_RELOAD_INTERVAL", "5"))  # seconds; 0 = never
+
+RESOLVED_LIMIT = 4096  # distinct rule combinations remembered per field
+
+class RuleField:
+    """One template field, resolved from the set of its rules that matched"""
+
+    def __init__(self, table: str, spec: Dict[str, Any]):
+        self.table = table
+        if "value" in spec:
+            self.mode, rules = "value", []
+        elif "first" in spec:
+            self.mode, rules = "first", spec["first"]
+        elif "all" in spec:
+            self.mode, rules = "all", spec["all"]
+        else:
+            raise ValueError(f"Rule field {table} needs 'value', 'first' or 'all'")
+        self.constant = spec.get("value")
+        self.always = list(spec.get("always", []))
+        self.default = spec.get("default", [] if self.mode == "all" else None)
+        self.rules = [(str(i), rule["value"]) for i, rule in enumerate(rules)]
+        self.keywords = {str(i): list(rule["keywords"]) for i, rule in enumerate(rules)}
+        self._resolved: Dict[FrozenSet[str], Any] = {}
+
+    def resolve(self, matches: KeywordMatches) -> Any:
+        if self.mode == "value":
+            return self.constant
+        found = matches.found(self.table)
+        try:
+            return self._resolved[found]
+        except KeyError:
+            pass
+        if self.mode == "first":
+            result = next((value for rule_id, value in self.rules if rule_id in found), self.default)
+        else:
+            result = self.always + [value for rule_id, value in self.rules if rule_id in found] or self.default
+        if len(self._resolved) >= RESOLVED_LIMIT:
+            self._resolved.clear()
+        self._resolved[found] = result
+        return result
+
+class RuleProfile:
+    """Design type detection plus one compiled template per design type, over a single keyword index"""
+
+    def __init__(self, name: str, spec: Dict[str, Any]):
+        self.name = name
+        self.default_design_type = spec.get("default_design_type", "general")
+        design_types = {entry["name"]: list(entry["keywords"]) for entry in spec["design_types"]}
+        templates = spec.get("templates", {})
+        base = templates.get("*", {})
+
+        tables = {"design_type": design_types}
+        self.templates: Dict[str, Dict[str, RuleField]] = {}
+        for design_type in [*design_types, self.default_design_type, *templates]:
+            if design_type == "*" or design_type in self.templates:
+                continue
+            fields = {}
+            for field, field_spec in {**base, **templates.get(design_type, {})}.items():
+                fields[field] = RuleField(f"{design_type}.{field}", field_spec)
+                if fields[field].keywords:
+                    tables[fields[field].table] = fields[field].keywords
+            self.templates[design_type] = fields
+        self.index = KeywordIndex(tables)
+
+    def evaluate(self, prompt: str) -> Dict[str, Any]:
+        matches = self.index.match(prompt)
+        return copy.deepcopy(self._resolve(matches, matches.first("design_type", self.default_design_type)))
+
+    def evaluate_batch(self, prompts: Sequence[str], copy_results: bool = True) -> List[Dict[str, Any]]:
+        """evaluate() for many prompts: design types come from one vectorized pass over the batch's
+        keyword matrix, and templates are resolved once per distinct keyword set, not per prompt.
+        With copy_results=False, prompts in the same group share one (read-only) result."""
+        batch = self.index.match_batch(prompts)
+        design_types = batch.first("design_type", self.default_design_type)
+        matches, first_rows, inverse = batch.groups()
+        resolved = [self._resolve(m, design_types[row]) for m, row in zip(matches, first_rows)]
+        if not copy_results:
+            return [resolved[group] for group in inverse]
+        return [copy.deepcopy(resolved[group]) for group in inverse]
+
+    def _resolve(self, matches: KeywordMatches, design_type: str) -> Dict[str, Any]:
+        result = {field: rule.resolve(matches) for field, rule in self.templates[design_type].items()}
+        result["design_type"] = design_type
+        return result
+
+class ExtractionRules:
+    """A fully compiled rule table; never modified after construction, so it can be swapped in atomically"""
+
+    def __init__(self, data: Dict[str, Any], source: str = "<memory>"):
+        self.version = data.get("version")
+        self.source = source
+        self.profiles = {name: RuleProfile(name, spec) for name, spec in data["profiles"].items()}
+
+    @classmethod
+    def from_file(cls, path) -> "ExtractionRules":
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f), source=str(path))
+
+    def evaluate(self, profile: str, prompt: str) -> Dict[str, Any]:
+        """design_type plus every template field for the prompt, as fresh objects the caller may modify"""
+        return self.profiles[profile].evaluate(prompt)
+
+    def evaluate_batch(self, profile: str, prompts: Sequence[str], copy_results: bool = True) -> List[Dict[str, Any]]:
+        return self.profiles[profile].evaluate_batch(prompts, copy_results)
+
+class RuleStore:
+    """Holds the current ExtractionRules and recompiles them when the rule file changes.
+
+    Every worker polls the file's mtime at most once per reload_interval, so
+    editing the file (write a temp file, then rename it over the original)
+    updates all workers without a restart. A file that fails to load keeps the
+    previous rules in service.
+    """
+
+    def __init__(self, path=EXTRACTION_RULES_PATH, reload_interval: float = EXTRACTION_RULES_RELOAD_INTERVAL):
+        self.path = Path(path)
+        self.reload_interval = reload_interval
+        self._rules: Optional[ExtractionRules] = None
+        self._signature = None
+        self._failed_signature = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self.reloads = 0
+        self.reload_errors = 0
+
+    def get(self) -> ExtractionRules:
+        rules = self._rules
+        if rules is None:
+            with self._lock:
+                if self._rules is None:
+                    self._load(force=True, initial=True)
+            return self._rules
+        if self.reload_interval > 0 and time.monotonic() - self._checked_at >= self.reload_interval:
+            # Only one thread checks; the others keep using the current rules meanwhile
+            if self._lock.acquire(blocking=False):
+                try:
+                    self._load()
+                finally:
+                    self._lock.release()
+        return self._rules
+
+    def reload(self, force: bool = False) -> bool:
+        """Recompile now if the file changed (or always, with force); True if new rules were swapped in"""
+        with self._lock:
+            return self._load(force=force, initial=self._rules is None)
+
+    def _load(self, force: bool = False, initial: bool = False) -> bool:
+        self._checked_at = time.monotonic()
+        signature = None
+        try:
+            stat = self.path.stat()
+            signature = (stat.st_mtime_ns, stat.st_size)
+            if not force and (signature == self._signature or signature == self._failed_signature):
+                return False
+            rules = ExtractionRules.from_file(self.path)
+        except Exception as e:
+            if initial:
+                raise
+            self.reload_errors += 1
+            self._failed_signature = signature
+            print(f"[WARN] Keeping previous extraction rules, {self.path} failed to load: {e}")
+            return False
+
+        self._rules, self._signature, self._failed_signature = rules, signature, None
+        if not initial:
+            self.reloads += 1
+            print(f"[INFO] Reloaded extraction rules v{rules.version} from {self.path}")
+        return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        rules = self._rules
+        return {
+            "path": str(self.path),
+            "version": rules.version if rules else None,
+            "profiles": sorted(rules.profiles) if rules else [],
+            "reloads": self.reloads,
+            "reload_errors": self.reload_errors,
+        }
+
+# Global rule store
+rule_store = RuleStore()
+
+def evaluate_rules(profile: str, prompt: str) -> Dict[str, Any]:
+    return rule_store.get().evaluate(profile, prompt)
+
+def evaluate_rules_batch(profile: str, prompts: Sequence[str], copy_results: bool = True) -> List[Dict[str, Any]]:
+    return rule_store.get().evaluate_batch(profile, prompts, copy_results)
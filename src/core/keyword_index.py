@@ -0,0 +1,200 @@
+"""Compiled keyword index shared by the rule-based extractors"""
+
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, List, Mapping, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .prompt_normalizer import normalize_text
+
+# {table: {concept: [keywords]}}; a bare string stands for a single keyword
+KeywordTables = Mapping[str, Mapping[str, Union[str, Iterable[str]]]]
+
+KEYWORD_INDEX_MEMO = 512       # recently matched prompts, so one prompt is scanned once per index
+KEYWORD_INDEX_TOKENS = 100_000  # distinct prompt tokens remembered before the token map resets
+
+class KeywordMatches:
+    """Concepts found in one prompt, reported per table in the table's own order"""
+
+    __slots__ = ("keywords", "_found", "_order")
+
+    def __init__(self, keywords: FrozenSet[str], found: Dict[str, FrozenSet[str]], order: Dict[str, Tuple[str, ...]]):
+        self.keywords = keywords
+        self._found = found
+        self._order = order
+
+    def __contains__(self, keyword: str) -> bool:
+        return keyword in self.keywords
+
+    def found(self, table: str) -> FrozenSet[str]:
+        return self._found.get(table, frozenset())
+
+    def has(self, table: str, concept: str) -> bool:
+        return concept in self._found.get(table, ())
+
+    def concepts(self, table: str) -> List[str]:
+        found = self._found.get(table, ())
+        return [concept for concept in self._order[table] if concept in found]
+
+    def first(self, table: str, default: Optional[str] = None) -> Optional[str]:
+        """First matching concept, so table order encodes if/elif priority"""
+        found = self._found.get(table, ())
+        return next((concept for concept in self._order[table] if concept in found), default)
+
+class KeywordBatch:
+    """Matches for a batch of prompts: a sparse prompt x keyword matrix and the dense prompt x concept
+    matrix derived from it, so per-table answers come out for every prompt at once"""
+
+    def __init__(self, index: "KeywordIndex", indptr: np.ndarray, indices: np.ndarray):
+        self.index = index
+        self.indptr = indptr    # CSR: keyword ids of prompt i are indices[indptr[i]:indptr[i + 1]]
+        self.indices = indices
+        rows = np.repeat(np.arange(len(indptr) - 1), np.diff(indptr))
+        self.keywords = np.zeros((len(indptr) - 1, len(index.keyword_list)), dtype=bool)
+        self.keywords[rows, indices] = True
+        self.hits = (self.keywords.astype(np.int32) @ index.incidence) > 0
+
+    def __len__(self) -> int:
+        return len(self.indptr) - 1
+
+    def table(self, table: str) -> np.ndarray:
+        """Prompt x concept hits for one table, columns in table order"""
+        return self.hits[:, self.index.table_columns[table]]
+
+    def has(self, table: str, concept: str) -> np.ndarray:
+        return self.hits[:, self.index.column_ids[(table, concept)]]
+
+    def first(self, table: str, default: Optional[str] = None) -> np.ndarray:
+        """Per prompt, the first matching concept of table (or default), like KeywordMatches.first"""
+        hits = self.table(table)
+        choices = np.array(list(self.index.order[table]) + [default], dtype=object)
+        position = np.where(hits.any(axis=1), hits.argmax(axis=1), len(choices) - 1)
+        return choices[position]
+
+    def groups(self) -> Tuple[List[KeywordMatches], np.ndarray, np.ndarray]:
+        """Prompts grouped by identical concept hits: one KeywordMatches per group (built from the
+        group's first prompt, so its keywords are that prompt's), each group's first row, and each
+        prompt's group number. Anything derived from concepts alone is the same for a whole group."""
+        packed = np.ascontiguousarray(np.packbits(self.hits, axis=1))
+        if packed.shape[1] == 0:
+            packed = np.zeros((len(self), 1), dtype=np.uint8)
+        rows = packed.view(np.dtype((np.void, packed.shape[1]))).ravel()
+        _, first_rows, inverse = np.unique(rows, return_index=True, return_inverse=True)
+        keyword_list = self.index.keyword_list
+        matches = [
+            self.index._matches_for(keyword_list[k] for k in self.indices[self.indptr[row]:self.indptr[row + 1]])
+            for row in first_rows
+        ]
+        return matches, first_rows, inverse.ravel()
+
+class KeywordIndex:
+    """Every keyword of several {concept: keywords} tables, compiled into one matcher.
+
+    Keywords match anywhere in the normalized prompt, exactly like the
+    `keyword in prompt_lower` checks they replace, but the prompt is tokenized
+    once for all tables. A single-word keyword occurs in the prompt iff it occurs
+    in one of its tokens, so each distinct token is resolved to the keywords it
+    contains once and then served from a token -> keywords hash map; only
+    multi-word keywords are still searched for in the whole text.
+    """
+
+    def __init__(self, tables: KeywordTables):
+        self.tables: Dict[str, Dict[str, List[str]]] = {}
+        concepts_by_keyword: Dict[str, set] = {}
+        for table, entries in tables.items():
+            self.tables[table] = {}
+            for concept, keywords in entries.items():
+                keywords = [normalize_text(k) for k in ([keywords] if isinstance(keywords, str) else keywords)]
+                self.tables[table][concept] = [k for k in keywords if k]
+                for keyword in self.tables[table][concept]:
+                    concepts_by_keyword.setdefault(keyword, set()).add((table, concept))
+        self.order: Dict[str, Tuple[str, ...]] = {table: tuple(entries) for table, entries in self.tables.items()}
+
+        self._concepts = {keyword: tuple(hits) for keyword, hits in concepts_by_keyword.items()}
+
+        # Batch matching: keyword and (table, concept) column numbers, and the keyword x concept incidence
+        self.keyword_list = tuple(self._concepts)
+        self.keyword_ids = {keyword: i for i, keyword in enumerate(self.keyword_list)}
+        self.columns = tuple((table, concept) for table, concepts in self.order.items() for concept in concepts)
+        self.column_ids = {column: i for i, column in enumerate(self.columns)}
+        self.table_columns = {
+            table: np.array([self.column_ids[(table, concept)] for concept in concepts], dtype=np.intp)
+            for table, concepts in self.order.items()
+        }
+        self.incidence = np.zeros((len(self.keyword_list), len(self.columns)), dtype=np.int32)
+        for keyword, hits in self._concepts.items():
+            for column in hits:
+                self.incidence[self.keyword_ids[keyword], self.column_ids[column]] = 1
+        self._words = tuple(k for k in self._concepts if " " not in k)
+        self._phrases = tuple(k for k in self._concepts if " " in k)
+        self._tokens: Dict[str, Tuple[str, ...]] = {}
+        self.match = lru_cache(maxsize=KEYWORD_INDEX_MEMO)(self._match)
+
+    def _token_keywords(self, token: str) -> Tuple[str, ...]:
+        keywords = self._tokens.get(token)
+        if keywords is None:
+            if len(self._tokens) >= KEYWORD_INDEX_TOKENS:
+                self._tokens = {}
+            keywords = self._tokens[token] = tuple(k for k in self._words if k in token)
+        return keywords
+
+    def _match(self, prompt: str) -> KeywordMatches:
+        text = normalize_text(prompt)
+        keywords = set()
+        for token in set(text.split()):
+            keywords.update(self._token_keywords(token))
+        keywords.update(k for k in self._phrases if k in text)
+        return self._matches_for(keywords)
+
+    def _matches_for(self, keywords: Iterable[str]) -> KeywordMatches:
+        keywords = frozenset(keywords)
+        found: Dict[str, set] = {}
+        for keyword in keywords:
+            for table, concept in self._concepts[keyword]:
+                found.setdefault(table, set()).add(concept)
+        return KeywordMatches(keywords, {t: frozenset(c) for t, c in found.items()}, self.order)
+
+    def match_batch(self, prompts: Sequence[str]) -> KeywordBatch:
+        """Match many prompts at once.
+
+        Tokens are deduplicated across the batch, so each distinct token is
+        resolved to keywords once; the (prompt, token) pairs are then expanded
+        to (prompt, keyword) pairs with NumPy and packed into a CSR matrix.
+        """
+        texts = [normalize_text(prompt) for prompt in prompts]
+        vocabulary: Dict[str, int] = {}
+        pair_tokens: List[int] = []
+        tokens_per_prompt = np.zeros(len(texts), dtype=np.int64)
+        phrase_pairs: List[Tuple[int, int]] = []
+        for row, text in enumerate(texts):
+            tokens = set(text.split())
+            tokens_per_prompt[row] = len(tokens)
+            pair_tokens.extend(vocabulary.setdefault(token, len(vocabulary)) for token in tokens)
+            phrase_pairs.extend((row, self.keyword_ids[k]) for k in self._phrases if k in text)
+
+        # token id -> keyword ids, as flat CSR arrays
+        token_keywords = [self._token_keywords(token) for token in vocabulary]
+        counts = np.array([len(keywords) for keywords in token_keywords], dtype=np.int64)
+        flat = np.array([self.keyword_ids[k] for keywords in token_keywords for k in keywords], dtype=np.int64)
+        starts = np.cumsum(counts) - counts
+
+        pair_tokens = np.array(pair_tokens, dtype=np.int64)
+        pair_rows = np.repeat(np.arange(len(texts), dtype=np.int64), tokens_per_prompt)
+        if len(pair_tokens):
+            per_pair = counts[pair_tokens]
+            offsets = np.arange(per_pair.sum()) - np.repeat(np.cumsum(per_pair) - per_pair, per_pair)
+            rows = np.repeat(pair_rows, per_pair)
+            cols = flat[np.repeat(starts[pair_tokens], per_pair) + offsets]
+        else:
+            rows = cols = np.zeros(0, dtype=np.int64)
+        if phrase_pairs:
+            extra = np.array(phrase_pairs, dtype=np.int64)
+            rows, cols = np.concatenate([rows, extra[:, 0]]), np.concatenate([cols, extra[:, 1]])
+
+        width = max(len(self.keyword_list), 1)
+        rows, cols = np.divmod(np.unique(rows * width + cols), width)
+        indptr = np.searchsorted(rows, np.arange(len(texts) + 1))
+        return KeywordBatch(self, indptr, cols)
+
+    def __len__(self) -> int:
+        return len(self._concepts)
@@ -2,6 +2,7 @@ from abc import ABC, abstractmethod
 from typing import Dict, Any, Optional
 import json
 import logging
+from .extraction_rules import evaluate_rules
 
 class LMAdapter(ABC):
     @abstractmethod
@@ -22,17 +23,18 @@ class LocalLMAdapter(LMAdapter):
         try:
             # For now, return a structured response based on prompt analysis
             # This would be replaced with actual RTX-3060 inference
-            design_type = self._detect_design_type(prompt)
+            # Keyword rules live in the "local_lm" profile of src/core/extraction_rules.json
+            extracted = evaluate_rules("local_lm", prompt)
             
             spec_data = {
-                "design_type": design_type,
-                "category": self._extract_category(prompt, design_type),
-                "materials": self._extract_materials(prompt),
+                "design_type": extracted["design_type"],
+                "category": extracted["category"],
+                "materials": extracted["materials"],
                 "dimensions": self._extract_dimensions(prompt),
-                "performance": self._extract_performance(prompt),
-                "features": self._extract_features(prompt),
-                "components": self._extract_components(prompt),
-                "requirements": self._extract_requirements(prompt),
+                "performance": self._extract_performance(extracted),
+                "features": extracted["features"],
+                "components": extracted["components"],
+                "requirements": extracted["requirements"],
                 "constraints": [],
                 "use_cases": [prompt.split('.')[0]],
                 "target_audience": "general",
@@ -46,37 +48,6 @@ class LocalLMAdapter(LMAdapter):
             self.logger.error(f"LM inference failed: {e}")
             return self._fallback_response(prompt)
     
-    def _detect_design_type(self, prompt: str) -> str:
-        prompt_lower = prompt.lower()
-        if any(word in prompt_lower for word in ['building', 'house', 'office', 'structure']):
-            return 'building'
-        elif any(word in prompt_lower for word in ['car', 'vehicle', 'truck', 'bike']):
-            return 'vehicle'
-        elif any(word in prompt_lower for word in ['phone', 'computer', 'device', 'electronic']):
-            return 'electronics'
-        elif any(word in prompt_lower for word in ['chair', 'table', 'furniture', 'desk']):
-            return 'furniture'
-        elif any(word in prompt_lower for word in ['appliance', 'refrigerator', 'washer']):
-            return 'appliance'
-        return 'general'
-    
-    def _extract_category(self, prompt: str, design_type: str) -> str:
-        if design_type == 'building':
-            return 'residential' if 'house' in prompt.lower() else 'commercial'
-        elif design_type == 'vehicle':
-            return 'electric' if 'electric' in prompt.lower() else 'standard'
-        return 'standard'
-    
-    def _extract_materials(self, prompt: str) -> list:
-        materials = []
-        if 'steel' in prompt.lower():
-            materials.append({"type": "steel", "grade": "standard", "properties": {}})
-        if 'wood' in prompt.lower():
-            materials.append({"type": "wood", "grade": "hardwood", "properties": {}})
-        if not materials:
-            materials.append({"type": "standard", "grade": None, "properties": {}})
-        return materials
-    
     def _extract_dimensions(self, prompt: str) -> dict:
         return {
             "length": None,
@@ -85,36 +56,15 @@ class LocalLMAdapter(LMAdapter):
             "units": "metric"
         }
     
-    def _extract_performance(self, prompt: str) -> dict:
+    def _extract_performance(self, extracted: dict) -> dict:
         return {
             "power": None,
-            "efficiency": "high" if 'efficient' in prompt.lower() else None,
+            "efficiency": extracted["efficiency"],
             "capacity": None,
             "speed": None,
             "other_specs": {}
         }
     
-    def _extract_features(self, prompt: str) -> list:
-        features = []
-        if 'smart' in prompt.lower():
-            features.append('smart technology')
-        if 'sustainable' in prompt.lower():
-            features.append('sustainable design')
-        if 'modern' in prompt.lower():
-            features.append('modern aesthetics')
-        return features
-    
-    def _extract_components(self, prompt: str) -> list:
-        return ['main structure', 'control system', 'interface']
-    
-    def _extract_requirements(self, prompt: str) -> list:
-        requirements = []
-        if 'durable' in prompt.lower():
-            requirements.append('high durability')
-        if 'efficient' in prompt.lower():
-            requirements.append('energy efficiency')
-        return requirements
-    
     def _fallback_response(self, prompt: str) -> dict:
         return {
             "design_type": "general",
@@ -1,48 +1,62 @@
 from typing import Dict, Any, Optional, List
+from .keyword_index import KeywordIndex
+from .prompt_normalizer import normalize_text
+
+OBJECT_KEYWORDS = {
+    'floor': ['floor', 'flooring', 'ground'],
+    'wall': ['wall', 'walls'],
+    'door': ['door', 'doors'],
+    'window': ['window', 'windows'],
+    'cushion': ['cushion', 'cushions', 'pillow', 'pillows'],
+    'table': ['table', 'desk'],
+    'chair': ['chair', 'seat'],
+    'roof': ['roof', 'ceiling'],
+    'main_structure': ['structure', 'frame', 'body']
+}
+
+MATERIAL_KEYWORDS = {
+    'marble': 'marble',
+    'wood': 'wood',
+    'steel': 'steel',
+    'concrete': 'concrete',
+    'glass': 'glass',
+    'plastic': 'plastic',
+    'fabric': 'fabric',
+    'leather': 'leather',
+    'metal': 'metal',
+    'stone': 'stone'
+}
+
+COLOR_KEYWORDS = {
+    'orange': 'orange',
+    'red': 'red',
+    'blue': 'blue',
+    'green': 'green',
+    'yellow': 'yellow',
+    'black': 'black',
+    'white': 'white',
+    'brown': 'brown',
+    'gray': 'gray',
+    'grey': 'gray'
+}
+
+# Materials and colors map keyword -> value; the index wants value -> keywords, in first-seen order
+KEYWORDS = KeywordIndex({
+    "object": OBJECT_KEYWORDS,
+    "material": {value: [k for k, v in MATERIAL_KEYWORDS.items() if v == value] for value in MATERIAL_KEYWORDS.values()},
+    "color": {value: [k for k, v in COLOR_KEYWORDS.items() if v == value] for value in COLOR_KEYWORDS.values()},
+})
 
 class ObjectTargeter:
     def __init__(self):
-        self.object_keywords = {
-            'floor': ['floor', 'flooring', 'ground'],
-            'wall': ['wall', 'walls'],
-            'door': ['door', 'doors'],
-            'window': ['window', 'windows'],
-            'cushion': ['cushion', 'cushions', 'pillow', 'pillows'],
-            'table': ['table', 'desk'],
-            'chair': ['chair', 'seat'],
-            'roof': ['roof', 'ceiling'],
-            'main_structure': ['structure', 'frame', 'body']
-        }
-        
-        self.material_keywords = {
-            'marble': 'marble',
-            'wood': 'wood',
-            'steel': 'steel',
-            'concrete': 'concrete',
-            'glass': 'glass',
-            'plastic': 'plastic',
-            'fabric': 'fabric',
-            'leather': 'leather',
-            'metal': 'metal',
-            'stone': 'stone'
-        }
-        
-        self.color_keywords = {
-            'orange': 'orange',
-            'red': 'red',
-            'blue': 'blue',
-            'green': 'green',
-            'yellow': 'yellow',
-            'black': 'black',
-            'white': 'white',
-            'brown': 'brown',
-            'gray': 'gray',
-            'grey': 'gray'
-        }
+        self.object_keywords = OBJECT_KEYWORDS
+        self.material_keywords = MATERIAL_KEYWORDS
+        self.color_keywords = COLOR_KEYWORDS
 
     def parse_target(self, text: str, spec: Dict[str, Any]) -> Optional[str]:
         """Return correct object_id given 'change floor to marble'"""
-        text_lower = text.lower()
+        text_lower = normalize_text(text)
+        targets = KEYWORDS.match(text).concepts("object")
         
         # Get objects from spec
         objects = spec.get('objects', [])
@@ -58,10 +72,9 @@ class ObjectTargeter:
                 return obj.get('id')
             
             # Check keyword matches
-            for target_type, keywords in self.object_keywords.items():
-                if any(keyword in text_lower for keyword in keywords):
-                    if target_type in obj_type or obj_type in target_type:
-                        return obj.get('id')
+            for target_type in targets:
+                if target_type in obj_type or obj_type in target_type:
+                    return obj.get('id')
         
         # Fallback: return first editable object
         for obj in objects:
@@ -72,22 +85,18 @@ class ObjectTargeter:
 
     def parse_material(self, text: str) -> Dict[str, Any]:
         """Return new material from text"""
-        text_lower = text.lower()
+        matches = KEYWORDS.match(text)
         result = {}
         
         # Extract material
-        for material, value in self.material_keywords.items():
-            if material in text_lower:
-                result['material'] = value
-                break
+        material = matches.first("material")
+        if material:
+            result['material'] = material
         
         # Extract color
-        for color, value in self.color_keywords.items():
-            if color in text_lower:
-                if 'properties' not in result:
-                    result['properties'] = {}
-                result['properties']['color'] = value
-                break
+        color = matches.first("color")
+        if color:
+            result['properties'] = {'color': color}
         
         # If no material found but color found, use fabric as default
         if 'properties' in result and 'material' not in result:
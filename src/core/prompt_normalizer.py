@@ -0,0 +1,71 @@
+"""Prompt canonicalization shared by the cache key and the rule-based extractors"""
+
+import re
+import unicodedata
+from functools import lru_cache
+from typing import Dict, Iterable, Mapping, Optional
+
+# Filler words that never change what the extractors produce; negations and quantities are kept
+STOPWORDS = frozenset({
+    "a", "an", "the", "and", "of", "for", "with", "to", "in", "on", "at", "by", "from",
+    "please", "some", "that", "this", "which", "is", "are", "be", "it", "its", "me", "my", "i", "we", "our"
+})
+
+# Punctuation becomes a space, except a decimal point between digits ("3.5m")
+_PUNCTUATION = re.compile(r"[^\w\s.]|(?<!\d)\.|\.(?!\d)")
+_STRAY_DOT = re.compile(r"\.(?:(?!\d)|(?<!\d\.))")  # starts with a literal, so re can skip ahead to dots
+_WHITESPACE = re.compile(r"\s+")
+# ASCII fast path: str.translate blanks everything _PUNCTUATION would except the dots
+_ASCII_PUNCTUATION = {
+    code: " " for code in range(128)
+    if not (chr(code).isalnum() or chr(code).isspace() or chr(code) in "_.")
+}
+
+def normalize_text(prompt: str) -> str:
+    """Case-folded prompt with punctuation and runs of whitespace collapsed to single spaces.
+
+    Word order is preserved, so substring keyword checks work on the result
+    exactly as they did on prompt.lower().
+    """
+    text = unicodedata.normalize("NFKC", prompt or "").casefold()
+    if not text.isascii():
+        return _WHITESPACE.sub(" ", _PUNCTUATION.sub(" ", text)).strip()
+    text = text.translate(_ASCII_PUNCTUATION)
+    if "." in text:
+        text = _STRAY_DOT.sub(" ", text)
+    return " ".join(text.split())
+
+def synonyms_from_tables(*tables: Mapping[str, object]) -> Dict[str, str]:
+    """Map keyword variants to their table key: {"cushion": ["pillow"]} gives pillow -> cushion
+    and {"grey": "gray"} gives grey -> gray. Multi-word variants are skipped."""
+    synonyms = {}
+    for table in tables:
+        for canonical, variants in table.items():
+            if isinstance(variants, str):
+                canonical, variants = variants, [canonical]
+            for variant in variants:
+                if " " not in variant and variant != canonical:
+                    synonyms.setdefault(variant, canonical)
+    return synonyms
+
+@lru_cache(maxsize=1)
+def extractor_synonyms() -> Dict[str, str]:
+    """Synonyms taken from the ObjectTargeter keyword tables"""
+    from .nlp_parser import ObjectTargeter
+
+    targeter = ObjectTargeter()
+    return synonyms_from_tables(targeter.object_keywords, targeter.color_keywords)
+
+def canonical_prompt(prompt: str, synonyms: Optional[Mapping[str, str]] = None) -> str:
+    """Case-, punctuation- and stopword-insensitive form of a prompt, for cache keys.
+
+    "Modern office building.", "modern  office building " and "The modern
+    office building" all give "modern office building". Word order and repeats
+    are kept: "2 bedroom house with 3 bathrooms" and "3 bedroom house with 2
+    bathrooms" are different requests. Pass synonyms (e.g. extractor_synonyms())
+    to also fold keyword variants together.
+    """
+    tokens: Iterable[str] = (t for t in normalize_text(prompt).split() if t not in STOPWORDS)
+    if synonyms:
+        tokens = (synonyms.get(t, t) for t in tokens)
+    return " ".join(tokens) or normalize_text(prompt)
@@ -0,0 +1,104 @@
+"""Declarative response caching for deterministic API routes"""
+
+import functools
+import hashlib
+import json
+import os
+from typing import Any, Dict, List, Optional
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from .cache import cache, spec_tag
+from .prompt_normalizer import canonical_prompt
+
+ROUTE_CACHE_ENABLED = os.getenv("ROUTE_CACHE_ENABLED", "true").lower() == "true"
+
+# Seconds each route's responses stay fresh
+ROUTE_CACHE_TTLS = {
+    "generate": int(os.getenv("ROUTE_CACHE_TTL_GENERATE", "3600")),
+    "generate_v2": int(os.getenv("ROUTE_CACHE_TTL_GENERATE", "3600")),
+    "mobile_generate": int(os.getenv("ROUTE_CACHE_TTL_GENERATE", "3600")),
+    "evaluate": int(os.getenv("ROUTE_CACHE_TTL_EVALUATE", "1800")),
+    "batch_evaluate": int(os.getenv("ROUTE_CACHE_TTL_EVALUATE", "1800")),
+    "pipeline_run": int(os.getenv("ROUTE_CACHE_TTL_PIPELINE", "900")),
+    "three_js": int(os.getenv("ROUTE_CACHE_TTL_SPEC_VIEWS", "3600")),
+    "preview_viewer": int(os.getenv("ROUTE_CACHE_TTL_SPEC_VIEWS", "3600")),
+}
+
+# X-Cache value for each cached_generate_async source
+X_CACHE_STATUS = {"hit": "HIT", "coalesced": "COALESCED", "computed": "MISS"}
+
+# Free-text fields folded to their canonical form before hashing
+PROMPT_FIELDS = frozenset({"prompt", "instruction"})
+
+def normalize_body(body: Any, field: Optional[str] = None) -> Any:
+    """Request body with prompt fields canonicalized, so equivalent requests compare equal"""
+    if isinstance(body, BaseModel):
+        body = body.model_dump()
+    if isinstance(body, dict):
+        return {key: normalize_body(value, key) for key, value in body.items()}
+    if isinstance(body, list):
+        return [normalize_body(item, field) for item in body]
+    if isinstance(body, str) and field in PROMPT_FIELDS:
+        return canonical_prompt(body)
+    return body
+
+def request_cache_key(operation: str, body: Any) -> str:
+    canonical = json.dumps(normalize_body(body), sort_keys=True, separators=(",", ":"), default=str)
+    return f"route:{operation}:" + hashlib.sha256(canonical.encode()).hexdigest()[:32]
+
+def spec_tags(body_param: str, body: Any, content: Any) -> List[str]:
+    """Tag an entry with every spec it was built from: a spec_id path parameter, or spec_id in the body or response"""
+    spec_ids = []
+    if body_param == "spec_id":
+        spec_ids.append(body)
+    for payload in (body, content):
+        if isinstance(payload, BaseModel):
+            payload = payload.model_dump()
+        if isinstance(payload, dict) and payload.get("spec_id"):
+            spec_ids.append(payload["spec_id"])
+    return [spec_tag(spec_id) for spec_id in dict.fromkeys(spec_ids)]
+
+def _bypass(request) -> bool:
+    directives = (request.headers.get("cache-control") or "").lower() if request is not None else ""
+    return "no-cache" in directives or "no-store" in directives
+
+def cached_route(operation: str, body_param: str, ttl: Optional[int] = None):
+    """Serve the route from the cache, keyed on its normalized request body.
+
+    Place below @app.post/@limiter.limit. Concurrent identical requests share
+    one computation and stale entries are refreshed in the background (see
+    CacheManager.cached_generate_async). Entries are tagged spec:{id} for any
+    spec they mention (see spec_tags). Errors are never cached. Responses
+    carry X-Cache (HIT, MISS, COALESCED for a wait on an identical in-flight
+    request, or BYPASS) and Cache-Control; a request sending Cache-Control:
+    no-cache skips the cache.
+    """
+    route_ttl = ttl if ttl is not None else ROUTE_CACHE_TTLS[operation]
+
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            request = kwargs.get("request")
+            if not ROUTE_CACHE_ENABLED or _bypass(request):
+                return _response(jsonable_encoder(await func(*args, **kwargs)), "BYPASS", route_ttl)
+
+            body = kwargs.get(body_param)
+            cache_key = request_cache_key(operation, body)
+
+            async def compute(_body):
+                content = jsonable_encoder(await func(*args, **kwargs))
+                await cache.tag_async(cache_key, spec_tags(body_param, body, content))
+                return content
+
+            content, source = await cache.cached_generate_async(body, compute, route_ttl, operation,
+                                                                cache_key=cache_key, with_source=True)
+            return _response(content, X_CACHE_STATUS[source], route_ttl)
+        return wrapper
+    return decorator
+
+def _response(content: Dict[str, Any], status: str, ttl: int) -> JSONResponse:
+    return JSONResponse(content=content, headers={
+        "X-Cache": status,
+        "Cache-Control": f"private, max-age={ttl}"
+    })
@@ -2,6 +2,6 @@
 
 from .models import Base, Spec, Eval, FeedbackLog, HidgLog
 from .iteration_models import IterationLog
-from .database import Database
+from .database import Database, get_database
 
-__all__ = ['Database', 'Base', 'Spec', 'Eval', 'FeedbackLog', 'HidgLog', 'IterationLog']
+__all__ = ['Database', 'get_database', 'Base', 'Spec', 'Eval', 'FeedbackLog', 'HidgLog', 'IterationLog']
@@ -0,0 +1,161 @@
+"""Bulk export/import of specs, evals and iteration logs as chunked columnar NDJSON"""
+
+import argparse
+import gzip
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+from sqlalchemy import DateTime, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from .models import Spec, Eval
+from .iteration_models import IterationLog
+from .database import Database, get_database
+
+BULK_CHUNK_SIZE = int(os.getenv("BULK_CHUNK_SIZE", "5000"))
+BULK_COMPRESS_LEVEL = int(os.getenv("BULK_COMPRESS_LEVEL", "6"))
+FORMAT_VERSION = 1
+
+TABLES = {
+    "specs": Spec,
+    "evals": Eval,
+    "iteration_logs": IterationLog
+}
+
+def _columns(model) -> List[str]:
+    return [column.name for column in model.__table__.columns]
+
+def _encode(value: Any) -> Any:
+    return value.isoformat() if isinstance(value, datetime) else value
+
+def _iter_chunks(db: Database, model, chunk_size: int, since: Optional[datetime]) -> Iterator[Dict[str, List[Any]]]:
+    """Stream a table in primary-key order through a server-side cursor, one column dict per chunk"""
+    names = _columns(model)
+    statement = select(*[getattr(model, name) for name in names]).order_by(*model.__table__.primary_key.columns)
+    if since is not None:
+        statement = statement.where(model.created_at >= since)
+
+    with db.get_session() as session:
+        result = session.execute(statement.execution_options(yield_per=chunk_size))
+        for rows in result.partitions(chunk_size):
+            yield {name: [_encode(row[i]) for row in rows] for i, name in enumerate(names)}
+
+def export_table(table: str, path: str, db: Database = None, chunk_size: int = BULK_CHUNK_SIZE,
+                 since: Optional[datetime] = None) -> Dict[str, Any]:
+    """Export one table to a gzip file of columnar chunks: a header line, then one JSON object per chunk"""
+    model = TABLES[table]
+    db = db or get_database()
+    db.flush_writes()
+    start = time.perf_counter()
+    rows = chunks = 0
+
+    with gzip.open(path, "wt", encoding="utf-8", compresslevel=BULK_COMPRESS_LEVEL) as f:
+        f.write(json.dumps({"table": table, "columns": _columns(model), "format_version": FORMAT_VERSION}) + "\n")
+        for chunk in _iter_chunks(db, model, chunk_size, since):
+            count = len(next(iter(chunk.values()), []))
+            f.write(json.dumps({"rows": count, "columns": chunk}, default=str, separators=(",", ":")) + "\n")
+            rows += count
+            chunks += 1
+
+    return _stats(table, rows, chunks, path, start)
+
+def _insert_statement(db: Database, model, skip_existing: bool):
+    """Multi-row insert, optionally ignoring rows whose primary key already exists"""
+    dialect = db.engine.dialect.name
+    if skip_existing and dialect == "postgresql":
+        return postgresql.insert(model).on_conflict_do_nothing()
+    if skip_existing and dialect == "sqlite":
+        return sqlite.insert(model).on_conflict_do_nothing()
+    return insert(model)
+
+def import_table(path: str, db: Database = None, skip_existing: bool = True) -> Dict[str, Any]:
+    """Load a file written by export_table with one executemany and commit per chunk"""
+    db = db or get_database()
+    start = time.perf_counter()
+    rows = chunks = 0
+
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        header = json.loads(f.readline())
+        if header.get("format_version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported bulk format version: {header.get('format_version')}")
+        table = header["table"]
+        model = TABLES[table]
+        known = set(_columns(model))
+        datetime_columns = {c.name for c in model.__table__.columns if isinstance(c.type, DateTime)}
+        statement = _insert_statement(db, model, skip_existing)
+
+        for line in f:
+            chunk = json.loads(line)
+            columns = {name: values for name, values in chunk["columns"].items() if name in known}
+            for name in datetime_columns & columns.keys():
+                columns[name] = [datetime.fromisoformat(v) if v else None for v in columns[name]]
+            batch = [dict(zip(columns.keys(), values)) for values in zip(*columns.values())]
+            if not batch:
+                continue
+            with db.get_session() as session:
+                session.execute(statement, batch)
+                session.commit()
+            rows += len(batch)
+            chunks += 1
+
+    return _stats(table, rows, chunks, path, start)
+
+def _stats(table: str, rows: int, chunks: int, path: str, start: float) -> Dict[str, Any]:
+    seconds = time.perf_counter() - start
+    return {
+        "table": table,
+        "rows": rows,
+        "chunks": chunks,
+        "bytes": Path(path).stat().st_size,
+        "seconds": round(seconds, 3),
+        "rows_per_sec": round(rows / seconds, 1) if seconds > 0 else 0.0
+    }
+
+def export_tables(out_dir: str, tables: List[str] = None, db: Database = None, **kwargs) -> List[Dict[str, Any]]:
+    """Export each table to <out_dir>/<table>.ndjson.gz"""
+    Path(out_dir).mkdir(parents=True, exist_ok=True)
+    return [export_table(table, str(Path(out_dir) / f"{table}.ndjson.gz"), db, **kwargs) for table in (tables or list(TABLES))]
+
+def import_tables(in_dir: str, tables: List[str] = None, db: Database = None, **kwargs) -> List[Dict[str, Any]]:
+    """Import <in_dir>/<table>.ndjson.gz for each table that was exported"""
+    results = []
+    for table in tables or list(TABLES):
+        path = Path(in_dir) / f"{table}.ndjson.gz"
+        if path.exists():
+            results.append(import_table(str(path), db, **kwargs))
+    return results
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Bulk export/import of specs, evals and iteration logs")
+    parser.add_argument("--database-url", help="Database URL (defaults to DATABASE_URL)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = commands.add_parser("export", help="Export tables to <dir>/<table>.ndjson.gz")
+    export_parser.add_argument("directory")
+    export_parser.add_argument("--tables", nargs="+", choices=list(TABLES))
+    export_parser.add_argument("--chunk-size", type=int, default=BULK_CHUNK_SIZE)
+    export_parser.add_argument("--since", type=datetime.fromisoformat, help="Only rows created at or after this ISO time")
+
+    import_parser = commands.add_parser("import", help="Import tables from <dir>/<table>.ndjson.gz")
+    import_parser.add_argument("directory")
+    import_parser.add_argument("--tables", nargs="+", choices=list(TABLES))
+    import_parser.add_argument("--fail-on-conflict", action="store_true", help="Error on existing ids instead of skipping them")
+
+    args = parser.parse_args(argv)
+    db = Database(args.database_url) if args.database_url else get_database()
+
+    if args.command == "export":
+        results = export_tables(args.directory, args.tables, db, chunk_size=args.chunk_size, since=args.since)
+    else:
+        results = import_tables(args.directory, args.tables, db, skip_existing=not args.fail_on_conflict)
+
+    for result in results:
+        print(f"[INFO] {args.command} {result['table']}: {result['rows']} rows in {result['chunks']} chunks, "
+              f"{result['bytes']} bytes, {result['seconds']}s ({result['rows_per_sec']} rows/s)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,14 +1,20 @@
 """Database connection and operations for BHIV Bucket"""
 
 import os
+import asyncio
+import threading
 from dotenv import load_dotenv
-from sqlalchemy import create_engine
+from sqlalchemy import and_, create_engine, func, insert, or_, select, text
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 from sqlalchemy.exc import SQLAlchemyError
 from .models import Base, Spec, Eval, FeedbackLog, HidgLog
 from .iteration_models import IterationLog
+from .write_queue import WriteBehindQueue
+from .log_store import get_log_store
 import json
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Iterable, Iterator, Optional, List
 import uuid
 
 # Load environment variables from config directory
@@ -31,8 +37,82 @@ except ImportError:
     supabase = None
     print("[WARN] Supabase library not installed, using PostgreSQL only")
 
+# Connection pool configuration (shared by every Database user in the process)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+
+# Write-behind batching for spec/eval/feedback/iteration inserts
+DB_WRITE_BEHIND = os.getenv("DB_WRITE_BEHIND", "false").lower() == "true"
+DB_WRITE_BATCH_SIZE = int(os.getenv("DB_WRITE_BATCH_SIZE", "100"))
+DB_WRITE_FLUSH_INTERVAL = float(os.getenv("DB_WRITE_FLUSH_INTERVAL", "0.5"))
+DB_WRITE_QUEUE_MAX = int(os.getenv("DB_WRITE_QUEUE_MAX", "10000"))
+DB_WRITE_ENQUEUE_TIMEOUT = float(os.getenv("DB_WRITE_ENQUEUE_TIMEOUT", "0.05"))  # seconds a full queue blocks
+
+# Iteration log retrieval: projectable fields, page size cap and streaming batch size
+ITERATION_LOG_FIELDS = (
+    'id', 'session_id', 'iteration_number', 'prompt', 'spec_before', 'spec_after',
+    'evaluation_data', 'feedback_data', 'score_before', 'score_after', 'reward', 'created_at'
+)
+ITERATION_PAGE_MAX = int(os.getenv("ITERATION_PAGE_MAX", "1000"))
+ITERATION_STREAM_BATCH = int(os.getenv("ITERATION_STREAM_BATCH", "500"))
+
+# URLs whose schema has already been checked in this process
+_schema_checked = set()
+_schema_lock = threading.Lock()
+
+def _pool_options(database_url: str) -> Dict[str, Any]:
+    """Engine pool options for the given URL"""
+    if database_url.startswith('sqlite') and (':memory:' in database_url or database_url.rstrip('/') == 'sqlite:'):
+        # In-memory SQLite lives in a single connection, no queue pool to size
+        return {}
+    return {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING
+    }
+
+# Sync and async drivers per backend; the URL scheme picks the backend
+SYNC_DRIVERS = {"postgresql": "postgresql+psycopg2", "sqlite": "sqlite+pysqlite"}
+ASYNC_DRIVERS = {"postgresql": "postgresql+asyncpg", "sqlite": "sqlite+aiosqlite"}
+
+def _driver_url(database_url: str, drivers: Dict[str, str]) -> str:
+    """Rewrite a database URL to the driver registered for its backend"""
+    url = make_url(database_url)
+    drivername = drivers.get(url.get_backend_name())
+    if not drivername:
+        return database_url
+    return url.set(drivername=drivername).render_as_string(hide_password=False)
+
+def _create_async_engine(database_url: str):
+    """Create the async engine for a URL, or None if its async driver is not installed"""
+    try:
+        from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+        async_url = _driver_url(database_url, ASYNC_DRIVERS)
+        if async_url.startswith('sqlite'):
+            # aiosqlite connections are cheap and bound to the loop that opened them
+            engine = create_async_engine(async_url, poolclass=NullPool)
+        else:
+            engine = create_async_engine(async_url, **_pool_options(async_url))
+        return engine, async_sessionmaker(engine, expire_on_commit=False)
+    except Exception as e:
+        print(f"[WARN] Async database driver not available ({e}), async calls use a worker thread")
+        return None, None
+
+def _invalidate_spec_cache(spec_id: str):
+    """Evict cached responses derived from a spec after it changes"""
+    try:
+        from src.core.cache import cache, spec_tag
+        cache.invalidate_tags(spec_tag(spec_id))
+    except Exception as e:
+        print(f"[WARN] Cache invalidation for spec {spec_id} failed: {e}")
+
 class Database:
-    def __init__(self, database_url: str = None):
+    def __init__(self, database_url: str = None, write_behind: bool = None):
         self.database_url = database_url or os.getenv('DATABASE_URL')
         if not self.database_url or self.database_url.strip() == '':
             print("[WARN] No DATABASE_URL found, using SQLite fallback")
@@ -41,9 +121,30 @@ class Database:
             print("[INFO] Using Supabase PostgreSQL database")
         else:
             print("[INFO] Using SQLite database")
-        self.engine = create_engine(self.database_url)
+        sync_url = _driver_url(self.database_url, SYNC_DRIVERS)
+        self.engine = create_engine(sync_url, **_pool_options(sync_url))
         self.SessionLocal = sessionmaker(bind=self.engine)
-        self.create_tables()
+        self.async_engine, self.AsyncSessionLocal = _create_async_engine(self.database_url)
+        self.ensure_schema()
+        if DB_WRITE_BEHIND if write_behind is None else write_behind:
+            self.write_queue = WriteBehindQueue(self.SessionLocal, DB_WRITE_BATCH_SIZE,
+                                                DB_WRITE_FLUSH_INTERVAL, DB_WRITE_QUEUE_MAX, DB_WRITE_ENQUEUE_TIMEOUT)
+        else:
+            self.write_queue = None
+
+    def ensure_schema(self):
+        """Create tables once per database URL per process"""
+        with _schema_lock:
+            if self.database_url in _schema_checked:
+                return
+            self.create_tables()
+            from .partitioning import LOG_PARTITIONING, LogPartitionManager
+            if LOG_PARTITIONING:
+                try:
+                    LogPartitionManager(self).enable()
+                except Exception as e:
+                    print(f"[WARN] Log partitioning setup failed: {e}")
+            _schema_checked.add(self.database_url)
 
     def create_tables(self):
         """Create all tables"""
@@ -56,8 +157,59 @@ class Database:
         """Get database session"""
         return self.SessionLocal()
 
+    def get_pool_stats(self) -> Dict[str, Any]:
+        """Get connection pool utilization"""
+        pool = self.engine.pool
+        stats = {"pool_class": type(pool).__name__}
+        if hasattr(pool, 'checkedout'):
+            size = pool.size()
+            checked_out = pool.checkedout()
+            capacity = size + max(getattr(pool, '_max_overflow', 0), 0)
+            stats.update({
+                "size": size,
+                "checked_in": pool.checkedin(),
+                "checked_out": checked_out,
+                "overflow": pool.overflow(),
+                "capacity": capacity,
+                "utilization_percent": round(checked_out / capacity * 100, 2) if capacity else 0.0
+            })
+        return stats
+
+    def flush_writes(self):
+        """Write out queued inserts so reads see them"""
+        if self.write_queue is not None and self.write_queue.pending():
+            self.write_queue.flush()
+
+    def get_write_queue_stats(self) -> Dict[str, Any]:
+        """Get write-behind queue depth and flush latency"""
+        if self.write_queue is None:
+            return {"enabled": False}
+        return {"enabled": True, **self.write_queue.get_stats()}
+
+    def get_async_session(self):
+        """Get async database session"""
+        if self.AsyncSessionLocal is None:
+            raise RuntimeError("Async database engine unavailable")
+        return self.AsyncSessionLocal()
+
+    def dispose(self):
+        """Close all pooled connections"""
+        if self.write_queue is not None:
+            self.write_queue.close()
+        self.engine.dispose()
+        if self.async_engine is not None:
+            self.async_engine.sync_engine.dispose()
+
     def save_spec(self, prompt: str, spec_data: Dict[Any, Any], agent_type: str = 'MainAgent') -> str:
         """Save specification to database"""
+        if self.write_queue is not None:
+            spec_id = str(uuid.uuid4())
+            self.write_queue.enqueue(
+                Spec,
+                {'id': spec_id, 'prompt': prompt, 'spec_data': spec_data, 'agent_type': agent_type},
+                lambda: self._fallback_save_spec(prompt, spec_data, spec_id)
+            )
+            return spec_id
         try:
             with self.get_session() as session:
                 spec = Spec(
@@ -72,8 +224,44 @@ class Database:
             print(f"DB save failed, using fallback: {e}")
             return self._fallback_save_spec(prompt, spec_data)
 
+    def save_specs(self, items: List[tuple], agent_type: str = 'MainAgent', spec_ids: Optional[List[str]] = None,
+                   write_behind: bool = True) -> List[str]:
+        """Save many (prompt, spec_data) pairs with one multi-row insert and commit.
+
+        write_behind=False inserts right away even when the write-behind queue is on,
+        for callers that already batch off the request path.
+        """
+        spec_ids = spec_ids or [str(uuid.uuid4()) for _ in items]
+        rows = [{'id': spec_id, 'prompt': prompt, 'spec_data': spec_data, 'agent_type': agent_type}
+                for spec_id, (prompt, spec_data) in zip(spec_ids, items)]
+        if self.write_queue is not None and write_behind:
+            for row in rows:
+                self.write_queue.enqueue(
+                    Spec, row,
+                    lambda row=row: self._fallback_save_spec(row['prompt'], row['spec_data'], row['id'])
+                )
+            return [row['id'] for row in rows]
+        try:
+            with self.get_session() as session:
+                if rows:
+                    session.execute(insert(Spec), rows)
+                session.commit()
+        except Exception as e:
+            print(f"DB batch save failed, using fallback: {e}")
+            for row in rows:
+                self._fallback_save_spec(row['prompt'], row['spec_data'], row['id'])
+        return [row['id'] for row in rows]
+
     def save_eval(self, spec_id: str, prompt: str, eval_data: Dict[Any, Any], score: float) -> str:
         """Save evaluation to database"""
+        if self.write_queue is not None:
+            eval_id = str(uuid.uuid4())
+            self.write_queue.enqueue(
+                Eval,
+                {'id': eval_id, 'spec_id': spec_id, 'prompt': prompt, 'eval_data': eval_data, 'score': score},
+                lambda: self._fallback_save_eval(spec_id, prompt, eval_data, score, eval_id)
+            )
+            return eval_id
         try:
             with self.get_session() as session:
                 eval_record = Eval(
@@ -91,6 +279,15 @@ class Database:
 
     def save_feedback(self, spec_id: str, iteration: int, feedback_data: Dict[Any, Any], reward: float = None) -> str:
         """Save feedback to database"""
+        if self.write_queue is not None:
+            feedback_id = str(uuid.uuid4())
+            self.write_queue.enqueue(
+                FeedbackLog,
+                {'id': feedback_id, 'spec_id': spec_id, 'iteration': iteration,
+                 'feedback_data': feedback_data, 'reward': reward},
+                lambda: self._fallback_save_feedback(spec_id, iteration, feedback_data, reward, feedback_id)
+            )
+            return feedback_id
         try:
             with self.get_session() as session:
                 feedback = FeedbackLog(
@@ -129,25 +326,9 @@ class Database:
             print(f"DB save failed, using fallback: {e}")
             return self._fallback_save_hidg(date, day, task, values_reflection, achievements, technical_notes)
 
-    def get_spec(self, spec_id: str) -> Optional[Dict[Any, Any]]:
-        """Get specification by ID"""
-        try:
-            with self.get_session() as session:
-                spec = session.query(Spec).filter(Spec.id == spec_id).first()
-                if spec:
-                    return {
-                        'id': spec.id,
-                        'prompt': spec.prompt,
-                        'spec_data': spec.spec_data,
-                        'agent_type': spec.agent_type,
-                        'created_at': spec.created_at.isoformat()
-                    }
-        except Exception as e:
-            print(f"DB query failed: {e}")
-        return None
-
     def get_eval(self, eval_id: str) -> Optional[Dict[Any, Any]]:
         """Get evaluation by ID"""
+        self.flush_writes()
         try:
             with self.get_session() as session:
                 eval_record = session.query(Eval).filter(Eval.id == eval_id).first()
@@ -164,88 +345,129 @@ class Database:
             print(f"DB query failed: {e}")
         return None
 
-    def get_report(self, report_id: str) -> Optional[Dict[Any, Any]]:
-        """Get full report (spec + eval) by ID"""
+    def get_report(self, report_id: str, include_data: bool = True) -> Optional[Dict[Any, Any]]:
+        """Get full report (spec + eval) by ID in one joined query"""
+        self.flush_writes()
         try:
             with self.get_session() as session:
-                eval_record = session.query(Eval).filter(Eval.id == report_id).first()
-                if eval_record:
-                    spec = session.query(Spec).filter(Spec.id == eval_record.spec_id).first()
-                    return {
-                        'report_id': report_id,
-                        'spec': {
-                            'id': spec.id,
-                            'prompt': spec.prompt,
-                            'spec_data': spec.spec_data,
-                            'created_at': spec.created_at.isoformat()
-                        } if spec else None,
-                        'evaluation': {
-                            'id': eval_record.id,
-                            'eval_data': eval_record.eval_data,
-                            'score': eval_record.score,
-                            'created_at': eval_record.created_at.isoformat()
-                        }
-                    }
+                row = session.execute(self._report_query(report_id, include_data)).first()
+                if row:
+                    return self._report_from_row(row, include_data)
         except Exception as e:
             print(f"DB query failed: {e}")
-        return None
-
-    def _fallback_save_spec(self, prompt: str, spec_data: Dict[Any, Any]) -> str:
+        return self._fallback_get_report(report_id, include_data)
+
+    async def get_report_async(self, report_id: str, include_data: bool = True) -> Optional[Dict[Any, Any]]:
+        """Async version of get_report"""
+        if self.AsyncSessionLocal is None:
+            return await asyncio.to_thread(self.get_report, report_id, include_data)
+        if self.write_queue is not None and self.write_queue.pending():
+            await asyncio.to_thread(self.write_queue.flush)
+        try:
+            async with self.get_async_session() as session:
+                row = (await session.execute(self._report_query(report_id, include_data))).first()
+                if row:
+                    return self._report_from_row(row, include_data)
+        except Exception as e:
+            print(f"DB query failed: {e}")
+        return await asyncio.to_thread(self._fallback_get_report, report_id, include_data)
+
+    def _report_query(self, report_id: str, include_data: bool):
+        """Eval joined to its spec; the JSON payload columns are only selected when include_data is set"""
+        columns = [
+            Eval.id, Eval.score, Eval.created_at,
+            Spec.id.label('spec_id'), Spec.prompt.label('spec_prompt'), Spec.created_at.label('spec_created_at')
+        ]
+        if include_data:
+            columns += [Eval.eval_data, Spec.spec_data]
+        return select(*columns).outerjoin(Spec, Spec.id == Eval.spec_id).where(Eval.id == report_id)
+
+    def _report_from_row(self, row, include_data: bool) -> Dict[Any, Any]:
+        spec = None
+        if row.spec_id is not None:
+            spec = {
+                'id': row.spec_id,
+                'prompt': row.spec_prompt,
+                'created_at': row.spec_created_at.isoformat() if row.spec_created_at else None
+            }
+            if include_data:
+                spec['spec_data'] = row.spec_data
+        evaluation = {
+            'id': row.id,
+            'score': row.score,
+            'created_at': row.created_at.isoformat() if row.created_at else None
+        }
+        if include_data:
+            evaluation['eval_data'] = row.eval_data
+        return {'report_id': row.id, 'spec': spec, 'evaluation': evaluation}
+
+    def _fallback_get_report(self, report_id: str, include_data: bool = True) -> Optional[Dict[Any, Any]]:
+        """Get a report saved to file storage by eval ID"""
+        try:
+            eval_record = get_log_store("evals").get("id", report_id)
+        except Exception as e:
+            print(f"Fallback lookup failed: {e}")
+            return None
+        if not eval_record:
+            return None
+
+        spec_record = self._fallback_get_spec(eval_record.get('spec_id'))
+        spec = None
+        if spec_record:
+            spec = {
+                'id': spec_record['id'],
+                'prompt': spec_record.get('prompt'),
+                'created_at': spec_record.get('created_at')
+            }
+            if include_data:
+                spec['spec_data'] = spec_record.get('spec_data')
+        evaluation = {
+            'id': eval_record['id'],
+            'score': eval_record.get('score'),
+            'created_at': eval_record.get('created_at')
+        }
+        if include_data:
+            evaluation['eval_data'] = eval_record.get('eval_data')
+        return {'report_id': report_id, 'spec': spec, 'evaluation': evaluation}
+
+    def _fallback_save_spec(self, prompt: str, spec_data: Dict[Any, Any], spec_id: str = None) -> str:
         """Fallback to file storage"""
-        import uuid
-        from pathlib import Path
         from datetime import datetime
 
-        spec_id = str(uuid.uuid4())
-        Path("spec_outputs").mkdir(exist_ok=True)
-
-        with open(f"spec_outputs/spec_{spec_id}.json", 'w') as f:
-            json.dump({
-                'id': spec_id,
-                'prompt': prompt,
-                'spec_data': spec_data,
-                'created_at': datetime.now().isoformat()
-            }, f, indent=2)
+        spec_id = spec_id or str(uuid.uuid4())
+        get_log_store("specs").append({
+            'id': spec_id,
+            'prompt': prompt,
+            'spec_data': spec_data,
+            'created_at': datetime.now().isoformat()
+        })
 
         return spec_id
 
-    def _fallback_save_eval(self, spec_id: str, prompt: str, eval_data: Dict[Any, Any], score: float) -> str:
+    def _fallback_save_eval(self, spec_id: str, prompt: str, eval_data: Dict[Any, Any], score: float,
+                            eval_id: str = None) -> str:
         """Fallback to file storage"""
-        import uuid
-        from pathlib import Path
         from datetime import datetime
 
-        eval_id = str(uuid.uuid4())
-        Path("reports").mkdir(exist_ok=True)
-
-        with open(f"reports/eval_{eval_id}.json", 'w') as f:
-            json.dump({
-                'id': eval_id,
-                'spec_id': spec_id,
-                'prompt': prompt,
-                'eval_data': eval_data,
-                'score': score,
-                'created_at': datetime.now().isoformat()
-            }, f, indent=2)
+        eval_id = eval_id or str(uuid.uuid4())
+        get_log_store("evals").append({
+            'id': eval_id,
+            'spec_id': spec_id,
+            'prompt': prompt,
+            'eval_data': eval_data,
+            'score': score,
+            'created_at': datetime.now().isoformat()
+        })
 
         return eval_id
 
-    def _fallback_save_feedback(self, spec_id: str, iteration: int, feedback_data: Dict[Any, Any], reward: float) -> str:
+    def _fallback_save_feedback(self, spec_id: str, iteration: int, feedback_data: Dict[Any, Any], reward: float,
+                                feedback_id: str = None) -> str:
         """Fallback to file storage"""
-        import uuid
-        from pathlib import Path
         from datetime import datetime
 
-        feedback_id = str(uuid.uuid4())
-        Path("logs").mkdir(exist_ok=True)
-
-        existing_logs = []
-        feedback_file = Path("logs/feedback_log.json")
-        if feedback_file.exists():
-            with open(feedback_file, 'r') as f:
-                existing_logs = json.load(f)
-
-        existing_logs.append({
+        feedback_id = feedback_id or str(uuid.uuid4())
+        get_log_store("feedback_log").append({
             'id': feedback_id,
             'spec_id': spec_id,
             'iteration': iteration,
@@ -254,28 +476,15 @@ class Database:
             'created_at': datetime.now().isoformat()
         })
 
-        with open(feedback_file, 'w') as f:
-            json.dump(existing_logs, f, indent=2)
-
         return feedback_id
 
     def _fallback_save_hidg(self, date: str, day: str, task: str, values_reflection: Dict[Any, Any],
                            achievements: Dict[Any, Any], technical_notes: Dict[Any, Any]) -> str:
         """Fallback to file storage"""
-        import uuid
-        from pathlib import Path
         from datetime import datetime
 
         hidg_id = str(uuid.uuid4())
-        Path("logs").mkdir(exist_ok=True)
-
-        existing_logs = []
-        values_file = Path("logs/values_log.json")
-        if values_file.exists():
-            with open(values_file, 'r') as f:
-                existing_logs = json.load(f)
-
-        existing_logs.append({
+        get_log_store("values_log").append({
             'id': hidg_id,
             'date': date,
             'day': day,
@@ -286,9 +495,6 @@ class Database:
             'created_at': datetime.now().isoformat()
         })
 
-        with open(values_file, 'w') as f:
-            json.dump(existing_logs, f, indent=2)
-
         return hidg_id
 
     def save_iteration_log(self, **kwargs) -> str:
@@ -310,6 +516,21 @@ class Database:
         score_after = kwargs.get('score_after', 0.0)
         reward = kwargs.get('reward', 0.0)
         
+        if self.write_queue is not None:
+            iteration_id = str(uuid.uuid4())
+            self.write_queue.enqueue(
+                IterationLog,
+                {'id': iteration_id, 'session_id': session_id, 'iteration_number': iteration_number,
+                 'prompt': prompt, 'spec_before': spec_before, 'spec_after': spec_after,
+                 'evaluation_data': evaluation_data, 'feedback_data': feedback_data,
+                 'score_before': score_before, 'score_after': score_after, 'reward': reward},
+                lambda: self._fallback_save_iteration(session_id, iteration_number, prompt,
+                                                      spec_before, spec_after, evaluation_data,
+                                                      feedback_data, score_before, score_after, reward,
+                                                      iteration_id)
+            )
+            return iteration_id
+
         try:
             with self.get_session() as session:
                 iteration_log = IterationLog(
@@ -333,50 +554,143 @@ class Database:
                                                spec_before, spec_after, evaluation_data,
                                                feedback_data, score_before, score_after, reward)
 
-    def get_iteration_logs(self, session_id: str) -> List[Dict[Any, Any]]:
+    def get_iteration_logs(self, session_id: str, fields: Optional[Iterable[str]] = None) -> List[Dict[Any, Any]]:
         """Get all iteration logs for a session"""
+        self.flush_writes()
+        try:
+            with self.get_session() as session:
+                rows = session.execute(self._iteration_logs_query(session_id, fields)).all()
+                if rows:
+                    return [self._iteration_log_from_row(row) for row in rows]
+        except ValueError:
+            raise
+        except Exception as e:
+            print(f"DB query failed: {e}")
+        return self._project_iteration_logs(self._fallback_get_iteration_logs(session_id), fields)
+
+    def get_iteration_logs_page(self, session_id: str, limit: int = 100, cursor: Optional[str] = None,
+                                fields: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """Get one keyset-paginated page of iteration logs; pass next_cursor back to continue.
+
+        total is the number of logs in the whole session, not in the page.
+        """
+        limit = max(1, min(limit, ITERATION_PAGE_MAX))
+        after = self._decode_iteration_cursor(cursor) if cursor else None
+        self.flush_writes()
+        try:
+            with self.get_session() as session:
+                rows = session.execute(self._iteration_logs_query(session_id, fields, after).limit(limit + 1)).all()
+                if rows:
+                    total = session.scalar(
+                        select(func.count()).select_from(IterationLog).where(IterationLog.session_id == session_id)
+                    )
+                    items = [self._iteration_log_from_row(row) for row in rows[:limit]]
+                    return self._iteration_page(items, len(rows) > limit, total)
+        except ValueError:
+            raise
+        except Exception as e:
+            print(f"DB query failed: {e}")
+
+        logs = self._fallback_get_iteration_logs(session_id)
+        total = len(logs)
+        if after is not None:
+            logs = [log for log in logs if (log.get('iteration_number') or 0, log.get('id') or '') > after]
+        return self._iteration_page(self._project_iteration_logs(logs[:limit], fields), len(logs) > limit, total)
+
+    def stream_iteration_logs(self, session_id: str, fields: Optional[Iterable[str]] = None,
+                              batch_size: int = ITERATION_STREAM_BATCH) -> Iterator[Dict[Any, Any]]:
+        """Yield a session's iteration logs through a server-side cursor without loading them all"""
+        statement = self._iteration_logs_query(session_id, fields).execution_options(yield_per=batch_size)
+        self.flush_writes()
+        return self._stream_iteration_logs(session_id, statement, fields)
+
+    def _stream_iteration_logs(self, session_id: str, statement, fields: Optional[Iterable[str]]) -> Iterator[Dict[Any, Any]]:
+        found = False
         try:
             with self.get_session() as session:
-                logs = session.query(IterationLog).filter(
-                    IterationLog.session_id == session_id
-                ).order_by(IterationLog.iteration_number).all()
-
-                return [{
-                    'id': log.id,
-                    'session_id': log.session_id,
-                    'iteration_number': log.iteration_number,
-                    'prompt': log.prompt,
-                    'spec_before': log.spec_before,
-                    'spec_after': log.spec_after,
-                    'evaluation_data': log.evaluation_data,
-                    'feedback_data': log.feedback_data,
-                    'score_before': log.score_before,
-                    'score_after': log.score_after,
-                    'reward': log.reward,
-                    'created_at': log.created_at.isoformat()
-                } for log in logs]
+                for row in session.execute(statement):
+                    found = True
+                    yield self._iteration_log_from_row(row)
         except Exception as e:
+            if found:
+                raise
             print(f"DB query failed: {e}")
+        if not found:
+            yield from self._project_iteration_logs(self._fallback_get_iteration_logs(session_id), fields)
+
+    def _iteration_log_columns(self, fields: Optional[Iterable[str]]) -> List[str]:
+        """Requested columns in table order; id and iteration_number are always kept for the cursor"""
+        if fields is None:
+            return list(ITERATION_LOG_FIELDS)
+        requested = set(fields)
+        unknown = requested - set(ITERATION_LOG_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown iteration log fields: {', '.join(sorted(unknown))}")
+        requested.update(('id', 'iteration_number'))
+        return [name for name in ITERATION_LOG_FIELDS if name in requested]
+
+    def _iteration_logs_query(self, session_id: str, fields: Optional[Iterable[str]] = None, after=None):
+        """Session logs ordered by (iteration_number, id), served by the (session_id, iteration_number) index"""
+        columns = [getattr(IterationLog, name) for name in self._iteration_log_columns(fields)]
+        statement = select(*columns).where(IterationLog.session_id == session_id)
+        if after is not None:
+            iteration_number, log_id = after
+            statement = statement.where(or_(
+                IterationLog.iteration_number > iteration_number,
+                and_(IterationLog.iteration_number == iteration_number, IterationLog.id > log_id)
+            ))
+        return statement.order_by(IterationLog.iteration_number, IterationLog.id)
+
+    def _iteration_log_from_row(self, row) -> Dict[Any, Any]:
+        log = dict(row._mapping)
+        if log.get('created_at') is not None:
+            log['created_at'] = log['created_at'].isoformat()
+        return log
+
+    def _project_iteration_logs(self, logs: List[Dict[Any, Any]], fields: Optional[Iterable[str]]) -> List[Dict[Any, Any]]:
+        columns = self._iteration_log_columns(fields)
+        return [{name: log.get(name) for name in columns} for log in logs]
+
+    def _iteration_page(self, items: List[Dict[Any, Any]], has_more: bool, total: int) -> Dict[str, Any]:
+        next_cursor = None
+        if has_more and items:
+            next_cursor = f"{items[-1]['iteration_number']}:{items[-1]['id']}"
+        return {'items': items, 'next_cursor': next_cursor, 'total': total}
+
+    def _decode_iteration_cursor(self, cursor: str):
+        try:
+            iteration_number, log_id = cursor.split(":", 1)
+            return int(iteration_number), log_id
+        except ValueError:
+            raise ValueError(f"Invalid iteration cursor: {cursor}")
+
+    def _fallback_get_spec(self, spec_id: str) -> Optional[Dict[Any, Any]]:
+        """Get a spec saved to file storage by ID"""
+        try:
+            return get_log_store("specs").get("id", spec_id)
+        except Exception as e:
+            print(f"Fallback lookup failed: {e}")
+            return None
+
+    def _fallback_get_iteration_logs(self, session_id: str) -> List[Dict[Any, Any]]:
+        """Get iteration logs saved to file storage for a session"""
+        try:
+            logs = get_log_store("iteration_logs").lookup("session_id", session_id)
+        except Exception as e:
+            print(f"Fallback lookup failed: {e}")
             return []
+        return sorted(logs, key=lambda log: (log.get('iteration_number') or 0, log.get('id') or ''))
 
     def _fallback_save_iteration(self, session_id: str, iteration_number: int, prompt: str,
                                spec_before: Dict[Any, Any], spec_after: Dict[Any, Any],
                                evaluation_data: Dict[Any, Any], feedback_data: Dict[Any, Any],
-                               score_before: float, score_after: float, reward: float) -> str:
+                               score_before: float, score_after: float, reward: float,
+                               iteration_id: str = None) -> str:
         """Fallback to file storage for iteration logs"""
-        from pathlib import Path
         from datetime import datetime
 
-        iteration_id = str(uuid.uuid4())
-        Path("logs").mkdir(exist_ok=True)
-
-        existing_logs = []
-        iteration_file = Path("logs/iteration_logs.json")
-        if iteration_file.exists():
-            with open(iteration_file, 'r') as f:
-                existing_logs = json.load(f)
-
-        existing_logs.append({
+        iteration_id = iteration_id or str(uuid.uuid4())
+        get_log_store("iteration_logs").append({
             'id': iteration_id,
             'session_id': session_id,
             'iteration_number': iteration_number,
@@ -391,33 +705,43 @@ class Database:
             'created_at': datetime.now().isoformat()
         })
 
-        with open(iteration_file, 'w') as f:
-            json.dump(existing_logs, f, indent=2)
-
         return iteration_id
     
     async def save_iteration(self, spec_id: str, before_spec: Dict[Any, Any], after_spec: Dict[Any, Any], feedback: str) -> str:
         """Save iteration for switch operations"""
         try:
-            with self.get_session() as session:
+            async with self.get_async_session() as session:
                 # Use raw SQL for iterations table
-                result = session.execute(
-                    "INSERT INTO iterations (spec_id, before_spec, after_spec, feedback) VALUES (:spec_id, :before_spec, :after_spec, :feedback) RETURNING iter_id",
+                result = await session.execute(
+                    text("INSERT INTO iterations (spec_id, before_spec, after_spec, feedback) VALUES (:spec_id, :before_spec, :after_spec, :feedback) RETURNING iter_id"),
                     {"spec_id": spec_id, "before_spec": json.dumps(before_spec), "after_spec": json.dumps(after_spec), "feedback": feedback}
                 )
                 iter_id = result.fetchone()[0]
-                session.commit()
+                await session.commit()
                 return str(iter_id)
         except Exception as e:
             print(f"DB iteration save failed: {e}")
-            return self._fallback_save_iteration_simple(spec_id, before_spec, after_spec, feedback)
+            return await asyncio.to_thread(self._fallback_save_iteration_simple, spec_id, before_spec, after_spec, feedback)
     
     async def get_spec(self, spec_id: str) -> Optional[Dict[Any, Any]]:
         """Get specification by ID (async version)"""
-        return self.get_spec_sync(spec_id)
+        if self.AsyncSessionLocal is None:
+            return await asyncio.to_thread(self.get_spec_sync, spec_id)
+        if self.write_queue is not None and self.write_queue.pending():
+            await asyncio.to_thread(self.write_queue.flush)
+        try:
+            async with self.get_async_session() as session:
+                spec = await session.get(Spec, spec_id)
+                if spec:
+                    return spec.spec_data
+        except Exception as e:
+            print(f"DB query failed: {e}")
+        record = await asyncio.to_thread(self._fallback_get_spec, spec_id)
+        return record['spec_data'] if record else None
     
     def get_spec_sync(self, spec_id: str) -> Optional[Dict[Any, Any]]:
         """Get specification by ID (sync version)"""
+        self.flush_writes()
         try:
             with self.get_session() as session:
                 spec = session.query(Spec).filter(Spec.id == spec_id).first()
@@ -425,16 +749,37 @@ class Database:
                     return spec.spec_data
         except Exception as e:
             print(f"DB query failed: {e}")
-        return None
+        record = self._fallback_get_spec(spec_id)
+        return record['spec_data'] if record else None
     
     async def update_spec(self, spec_id: str, spec_data: Dict[Any, Any]) -> bool:
         """Update specification in database"""
+        if self.AsyncSessionLocal is None:
+            return await asyncio.to_thread(self.update_spec_sync, spec_id, spec_data)
+        if self.write_queue is not None and self.write_queue.pending():
+            await asyncio.to_thread(self.write_queue.flush)
+        try:
+            async with self.get_async_session() as session:
+                spec = await session.get(Spec, spec_id)
+                if spec:
+                    spec.spec_data = spec_data
+                    await session.commit()
+                    await asyncio.to_thread(_invalidate_spec_cache, spec_id)
+                    return True
+        except Exception as e:
+            print(f"DB update failed: {e}")
+        return False
+    
+    def update_spec_sync(self, spec_id: str, spec_data: Dict[Any, Any]) -> bool:
+        """Update specification in database (sync version)"""
+        self.flush_writes()
         try:
             with self.get_session() as session:
                 spec = session.query(Spec).filter(Spec.id == spec_id).first()
                 if spec:
                     spec.spec_data = spec_data
                     session.commit()
+                    _invalidate_spec_cache(spec_id)
                     return True
         except Exception as e:
             print(f"DB update failed: {e}")
@@ -442,19 +787,10 @@ class Database:
     
     def _fallback_save_iteration_simple(self, spec_id: str, before_spec: Dict[Any, Any], after_spec: Dict[Any, Any], feedback: str) -> str:
         """Fallback storage for simple iterations"""
-        from pathlib import Path
         from datetime import datetime
         
         iter_id = str(uuid.uuid4())
-        Path("logs").mkdir(exist_ok=True)
-        
-        existing_logs = []
-        iteration_file = Path("logs/iterations.json")
-        if iteration_file.exists():
-            with open(iteration_file, 'r') as f:
-                existing_logs = json.load(f)
-        
-        existing_logs.append({
+        get_log_store("iterations").append({
             'iter_id': iter_id,
             'spec_id': spec_id,
             'before_spec': before_spec,
@@ -463,37 +799,20 @@ class Database:
             'ts': datetime.now().isoformat()
         })
         
-        with open(iteration_file, 'w') as f:
-            json.dump(existing_logs, f, indent=2)
-        
         return iter_id
-
-
     
     def _fallback_save_simple_iteration(self, spec_id: str, iteration_data: Dict[Any, Any]) -> str:
         """Fallback to file storage for simple iteration logs"""
-        from pathlib import Path
         from datetime import datetime
         
         iteration_id = iteration_data.get('iteration_id', str(uuid.uuid4()))
-        Path("logs").mkdir(exist_ok=True)
-        
-        existing_logs = []
-        iteration_file = Path("logs/switch_iterations.json")
-        if iteration_file.exists():
-            with open(iteration_file, 'r') as f:
-                existing_logs = json.load(f)
-        
-        existing_logs.append({
+        get_log_store("switch_iterations").append({
             'id': iteration_id,
             'spec_id': spec_id,
             **iteration_data,
             'saved_at': datetime.now().isoformat()
         })
         
-        with open(iteration_file, 'w') as f:
-            json.dump(existing_logs, f, indent=2)
-        
         return iteration_id
     
     def save_compliance_case(self, case_id: str, project_id: str, case_data: Dict[Any, Any], result: Dict[Any, Any]) -> str:
@@ -522,18 +841,9 @@ class Database:
     
     def _fallback_save_compliance(self, case_id: str, project_id: str, case_data: Dict[Any, Any], result: Dict[Any, Any]) -> str:
         """Fallback storage for compliance cases"""
-        from pathlib import Path
         from datetime import datetime
         
-        Path("logs").mkdir(exist_ok=True)
-        
-        existing_logs = []
-        compliance_file = Path("logs/compliance_cases.json")
-        if compliance_file.exists():
-            with open(compliance_file, 'r') as f:
-                existing_logs = json.load(f)
-        
-        existing_logs.append({
+        get_log_store("compliance_cases").append({
             'case_id': case_id,
             'project_id': project_id,
             'case_data': case_data,
@@ -541,26 +851,14 @@ class Database:
             'timestamp': datetime.now().isoformat()
         })
         
-        with open(compliance_file, 'w') as f:
-            json.dump(existing_logs, f, indent=2)
-        
         return case_id
     
     def _fallback_save_compliance_feedback(self, case_id: str, feedback_data: Dict[Any, Any], result: Dict[Any, Any]) -> str:
         """Fallback storage for compliance feedback"""
-        from pathlib import Path
         from datetime import datetime
         
         feedback_id = str(uuid.uuid4())
-        Path("logs").mkdir(exist_ok=True)
-        
-        existing_logs = []
-        feedback_file = Path("logs/compliance_feedback.json")
-        if feedback_file.exists():
-            with open(feedback_file, 'r') as f:
-                existing_logs = json.load(f)
-        
-        existing_logs.append({
+        get_log_store("compliance_feedback").append({
             'feedback_id': feedback_id,
             'case_id': case_id,
             'feedback_data': feedback_data,
@@ -568,47 +866,96 @@ class Database:
             'timestamp': datetime.now().isoformat()
         })
         
-        with open(feedback_file, 'w') as f:
-            json.dump(existing_logs, f, indent=2)
-        
         return feedback_id
     
     def _fallback_save_pipeline(self, pipeline_id: str, result: Dict[Any, Any]) -> str:
         """Fallback storage for pipeline results"""
-        from pathlib import Path
         from datetime import datetime
         
-        Path("logs").mkdir(exist_ok=True)
-        
-        existing_logs = []
-        pipeline_file = Path("logs/pipeline_results.json")
-        if pipeline_file.exists():
-            with open(pipeline_file, 'r') as f:
-                existing_logs = json.load(f)
-        
-        existing_logs.append({
+        get_log_store("pipeline_results").append({
             'pipeline_id': pipeline_id,
             'result': result,
             'timestamp': datetime.now().isoformat()
         })
         
-        with open(pipeline_file, 'w') as f:
-            json.dump(existing_logs, f, indent=2)
-        
         return pipeline_id
     
     async def save_spec_async(self, prompt: str, spec_data: Dict[Any, Any], agent_type: str = 'CorePipeline') -> str:
         """Async version of save_spec"""
-        return self.save_spec(prompt, spec_data, agent_type)
+        if self.write_queue is not None:
+            # enqueue may wait on a full queue and then run the file fallback: keep both off the loop
+            return await asyncio.to_thread(self.save_spec, prompt, spec_data, agent_type)
+        if self.AsyncSessionLocal is None:
+            return await asyncio.to_thread(self.save_spec, prompt, spec_data, agent_type)
+        try:
+            async with self.get_async_session() as session:
+                spec = Spec(
+                    prompt=prompt,
+                    spec_data=spec_data,
+                    agent_type=agent_type
+                )
+                session.add(spec)
+                await session.commit()
+                return spec.id
+        except Exception as e:
+            print(f"DB save failed, using fallback: {e}")
+            return await asyncio.to_thread(self._fallback_save_spec, prompt, spec_data)
     
     async def save_eval_async(self, spec_id: str, prompt: str, eval_data: Dict[Any, Any], score: float) -> str:
         """Async version of save_eval"""
-        return self.save_eval(spec_id, prompt, eval_data, score)
+        if self.write_queue is not None:
+            return await asyncio.to_thread(self.save_eval, spec_id, prompt, eval_data, score)
+        if self.AsyncSessionLocal is None:
+            return await asyncio.to_thread(self.save_eval, spec_id, prompt, eval_data, score)
+        try:
+            async with self.get_async_session() as session:
+                eval_record = Eval(
+                    spec_id=spec_id,
+                    prompt=prompt,
+                    eval_data=eval_data,
+                    score=score
+                )
+                session.add(eval_record)
+                await session.commit()
+                return eval_record.id
+        except Exception as e:
+            print(f"DB save failed, using fallback: {e}")
+            return await asyncio.to_thread(self._fallback_save_eval, spec_id, prompt, eval_data, score)
+    
+    async def save_hidg_log_async(self, date: str, day: str, task: str, values_reflection: Dict[Any, Any],
+                                  achievements: Dict[Any, Any] = None, technical_notes: Dict[Any, Any] = None) -> str:
+        """Async version of save_hidg_log"""
+        if self.AsyncSessionLocal is None:
+            return await asyncio.to_thread(self.save_hidg_log, date, day, task, values_reflection, achievements, technical_notes)
+        try:
+            async with self.get_async_session() as session:
+                hidg_log = HidgLog(
+                    date=date,
+                    day=day,
+                    task=task,
+                    values_reflection=values_reflection,
+                    achievements=achievements,
+                    technical_notes=technical_notes
+                )
+                session.add(hidg_log)
+                await session.commit()
+                return hidg_log.id
+        except Exception as e:
+            print(f"DB save failed, using fallback: {e}")
+            return await asyncio.to_thread(self._fallback_save_hidg, date, day, task, values_reflection, achievements, technical_notes)
+    
+    async def save_compliance_case_async(self, case_id: str, project_id: str, case_data: Dict[Any, Any], result: Dict[Any, Any]) -> str:
+        """Async version of save_compliance_case"""
+        return await asyncio.to_thread(self.save_compliance_case, case_id, project_id, case_data, result)
+    
+    async def save_compliance_feedback_async(self, case_id: str, feedback_data: Dict[Any, Any], result: Dict[Any, Any]) -> str:
+        """Async version of save_compliance_feedback"""
+        return await asyncio.to_thread(self.save_compliance_feedback, case_id, feedback_data, result)
     
     async def save_iteration_results(self, pipeline_id: str, iteration_results: Dict[Any, Any]) -> str:
         """Save iteration results from core pipeline"""
         try:
-            return self._fallback_save_pipeline(f"iter_{pipeline_id}", iteration_results)
+            return await asyncio.to_thread(self._fallback_save_pipeline, f"iter_{pipeline_id}", iteration_results)
         except Exception as e:
             print(f"Failed to save iteration results: {e}")
             return str(uuid.uuid4())
@@ -616,32 +963,51 @@ class Database:
     async def store_geometry_reference(self, case_id: str, original_url: str, local_url: str) -> str:
         """Store geometry file reference in compliance_cases"""
         try:
-            from pathlib import Path
-            from datetime import datetime
-            
-            Path("logs").mkdir(exist_ok=True)
-            
-            existing_logs = []
-            geometry_file = Path("logs/geometry_storage.json")
-            if geometry_file.exists():
-                with open(geometry_file, 'r') as f:
-                    existing_logs = json.load(f)
-            
-            existing_logs.append({
-                'case_id': case_id,
-                'original_url': original_url,
-                'local_url': local_url,
-                'timestamp': datetime.now().isoformat()
-            })
-            
-            with open(geometry_file, 'w') as f:
-                json.dump(existing_logs, f, indent=2)
-            
-            return case_id
-            
+            return await asyncio.to_thread(self._fallback_save_geometry, case_id, original_url, local_url)
         except Exception as e:
             print(f"Failed to store geometry reference: {e}")
             return case_id
 
+    async def get_geometry_reference(self, case_id: str) -> Optional[Dict[Any, Any]]:
+        """Get the latest stored geometry reference for a compliance case"""
+        try:
+            return await asyncio.to_thread(get_log_store("geometry_storage").get, "case_id", case_id)
+        except Exception as e:
+            print(f"Failed to read geometry reference: {e}")
+            return None
+
+    def _fallback_save_geometry(self, case_id: str, original_url: str, local_url: str) -> str:
+        """Fallback storage for geometry references"""
+        from datetime import datetime
+        
+        get_log_store("geometry_storage").append({
+            'case_id': case_id,
+            'original_url': original_url,
+            'local_url': local_url,
+            'timestamp': datetime.now().isoformat()
+        })
+        
+        return case_id
+
+_database: Optional[Database] = None
+_database_lock = threading.Lock()
+
+def get_database() -> Database:
+    """Get the process-wide Database, creating its engine and pool on first use"""
+    global _database
+    if _database is None:
+        with _database_lock:
+            if _database is None:
+                _database = Database()
+    return _database
+
+def reset_database():
+    """Dispose the shared Database so the next get_database() builds a new one"""
+    global _database
+    with _database_lock:
+        if _database is not None:
+            _database.dispose()
+        _database = None
+
 # Global database instance
-db = Database()
+db = get_database()
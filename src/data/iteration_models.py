@@ -1,6 +1,6 @@
 """Additional models for RL iteration tracking"""
 
-from sqlalchemy import Column, Integer, String, Text, DateTime, Float, JSON
+from sqlalchemy import Column, Integer, String, Text, DateTime, Float, JSON, Index
 from .models import Base
 from sqlalchemy.sql import func
 import uuid
@@ -27,3 +27,8 @@ class IterationLog(Base):
     reward = Column(Float, nullable=False)
 
     created_at = Column(DateTime, server_default=func.now())
+
+    __table_args__ = (
+        Index('ix_iteration_logs_session_id_iteration_number', 'session_id', 'iteration_number'),
+        Index('ix_iteration_logs_created_at', 'created_at'),
+    )
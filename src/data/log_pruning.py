@@ -1,85 +1,124 @@
 """Log pruning system for production scalability"""
 
-import json
-from pathlib import Path
+import os
+import time
 from datetime import datetime, timedelta
-from typing import Dict, Any, List
+from typing import Any, Callable, Dict, Optional
+from sqlalchemy import delete, select
+from .models import FeedbackLog
+from .iteration_models import IterationLog
+from .log_store import FALLBACK_LOG_DIR, get_log_store, list_stores
+
+LOG_PRUNE_BATCH_SIZE = int(os.getenv("LOG_PRUNE_BATCH_SIZE", "1000"))
+LOG_PRUNE_THROTTLE = float(os.getenv("LOG_PRUNE_THROTTLE", "0.05"))
+
+# Fields fallback records carry their write time in (iterations use ts, switch_iterations saved_at)
+TIMESTAMP_FIELDS = ("created_at", "timestamp", "ts", "saved_at")
+
+# DB log tables pruned by created_at
+PRUNED_TABLES = {
+    "iteration_logs": IterationLog,
+    "feedback_logs": FeedbackLog
+}
 
 class LogPruner:
-    def __init__(self, retention_days: int = 30):
+    """Removes logs older than the retention window from fallback files and DB log tables.
+
+    Files are rewritten one segment at a time and DB rows are deleted in
+    batches of batch_size, sleeping throttle seconds between batches so
+    pruning can run alongside live traffic. progress, if given, is called
+    with {"target", "pruned"} after each batch.
+    """
+
+    def __init__(self, retention_days: int = 30, db=None, batch_size: int = LOG_PRUNE_BATCH_SIZE,
+                 throttle: float = LOG_PRUNE_THROTTLE, progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+                 log_dir: str = FALLBACK_LOG_DIR):
         self.retention_days = retention_days
         self.cutoff_date = datetime.now() - timedelta(days=retention_days)
+        self.db = db
+        self.batch_size = batch_size
+        self.throttle = throttle
+        self.progress = progress
+        self.log_dir = log_dir
+
+    def _keep(self, record: Dict[str, Any]) -> bool:
+        """Keep records inside the window, and any without a readable timestamp"""
+        stamp = next((record[field] for field in TIMESTAMP_FIELDS if record.get(field)), None)
+        try:
+            return datetime.fromisoformat(stamp) > self.cutoff_date
+        except (TypeError, ValueError):
+            return True
+
+    def _report(self, target: str, pruned: int):
+        if self.progress:
+            self.progress({"target": target, "pruned": pruned})
+
+    def prune_store(self, name: str) -> Dict[str, Any]:
+        """Prune one fallback log"""
+        result = get_log_store(name, self.log_dir).prune(self._keep, throttle=self.throttle)
+        self._report(name, result["pruned"])
+        result["message"] = f"Pruned {result['pruned']} old {name} entries"
+        return result
 
     def prune_feedback_logs(self) -> Dict[str, Any]:
         """Prune old feedback logs"""
-        feedback_file = Path("logs/feedback_log.json")
-        if not feedback_file.exists():
-            return {"pruned": 0, "message": "No feedback log file found"}
-
-        with open(feedback_file, 'r') as f:
-            logs = json.load(f)
-
-        original_count = len(logs)
-        pruned_logs = []
-
-        for log in logs:
-            try:
-                log_date = datetime.fromisoformat(log.get('timestamp', ''))
-                if log_date > self.cutoff_date:
-                    pruned_logs.append(log)
-            except:
-                # Keep logs with invalid timestamps
-                pruned_logs.append(log)
-
-        with open(feedback_file, 'w') as f:
-            json.dump(pruned_logs, f, indent=2)
-
-        return {
-            "pruned": original_count - len(pruned_logs),
-            "remaining": len(pruned_logs),
-            "message": f"Pruned {original_count - len(pruned_logs)} old feedback logs"
-        }
+        return self.prune_store("feedback_log")
 
     def prune_iteration_logs(self) -> Dict[str, Any]:
         """Prune old iteration logs"""
-        iteration_file = Path("logs/iteration_logs.json")
-        if not iteration_file.exists():
-            return {"pruned": 0, "message": "No iteration log file found"}
-
-        with open(iteration_file, 'r') as f:
-            logs = json.load(f)
-
-        original_count = len(logs)
-        pruned_logs = []
-
-        for log in logs:
-            try:
-                log_date = datetime.fromisoformat(log.get('created_at', ''))
-                if log_date > self.cutoff_date:
-                    pruned_logs.append(log)
-            except:
-                pruned_logs.append(log)
-
-        with open(iteration_file, 'w') as f:
-            json.dump(pruned_logs, f, indent=2)
-
-        return {
-            "pruned": original_count - len(pruned_logs),
-            "remaining": len(pruned_logs),
-            "message": f"Pruned {original_count - len(pruned_logs)} old iteration logs"
-        }
+        return self.prune_store("iteration_logs")
+
+    def prune_files(self) -> Dict[str, Dict[str, Any]]:
+        """Prune every fallback log found in the log directory"""
+        return {name: self.prune_store(name) for name in list_stores(self.log_dir)}
+
+    def prune_table(self, table: str) -> Dict[str, Any]:
+        """Delete expired rows in batches of batch_size until none are left"""
+        model = PRUNED_TABLES[table]
+        expired = select(model.id).where(model.created_at < self.cutoff_date).limit(self.batch_size)
+        statement = delete(model).where(model.id.in_(expired)).execution_options(synchronize_session=False)
+
+        pruned = batches = 0
+        while True:
+            with self.db.get_session() as session:
+                count = session.execute(statement).rowcount
+                session.commit()
+            pruned += count
+            batches += 1
+            self._report(table, pruned)
+            if count < self.batch_size:
+                break
+            time.sleep(self.throttle)
+
+        return {"pruned": pruned, "batches": batches}
+
+    def prune_database(self) -> Dict[str, Any]:
+        """Drop expired partitions, then batch-delete expired rows from unpartitioned tables"""
+        from .partitioning import LogPartitionManager
+
+        manager = LogPartitionManager(self.db)
+        partitions = manager.prune(self.retention_days)
+        tables = {}
+        for table in PRUNED_TABLES:
+            if manager.is_partitioned(table):
+                tables[table] = {"pruned": 0, "batches": 0, "partitioned": True}
+            else:
+                tables[table] = self.prune_table(table)
+        return {"partitions": partitions, "tables": tables}
 
     def prune_all_logs(self) -> Dict[str, Any]:
         """Prune all log types"""
+        files = self.prune_files()
         results = {
-            "feedback": self.prune_feedback_logs(),
-            "iterations": self.prune_iteration_logs(),
-            "total_pruned": 0
+            "feedback": files.get("feedback_log", {"pruned": 0, "remaining": 0}),
+            "iterations": files.get("iteration_logs", {"pruned": 0, "remaining": 0}),
+            "files": files,
+            "total_pruned": sum(result["pruned"] for result in files.values())
         }
 
-        results["total_pruned"] = (
-            results["feedback"]["pruned"] +
-            results["iterations"]["pruned"]
-        )
+        if self.db is not None:
+            results["database"] = self.prune_database()
+            results["total_pruned"] += sum(t["pruned"] for t in results["database"]["tables"].values())
 
+        print(f"[INFO] Log pruning removed {results['total_pruned']} entries older than {self.retention_days} days")
         return results
@@ -0,0 +1,424 @@
+"""Append-only JSONL segment store for file fallback logs"""
+
+import copy
+import json
+import mmap
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: in-process locking only
+    fcntl = None
+
+FALLBACK_LOG_DIR = os.getenv("FALLBACK_LOG_DIR", "logs")
+FALLBACK_SEGMENT_BYTES = int(os.getenv("FALLBACK_SEGMENT_BYTES", str(16 * 1024 * 1024)))
+FALLBACK_FSYNC = os.getenv("FALLBACK_FSYNC", "interval")  # always | interval | never
+FALLBACK_FSYNC_INTERVAL = float(os.getenv("FALLBACK_FSYNC_INTERVAL", "1.0"))
+
+# Record fields kept in each store's sidecar offset index
+INDEX_FIELDS: Dict[str, Tuple[str, ...]] = {
+    "specs": ("id",),
+    "evals": ("id", "spec_id"),
+    "iteration_logs": ("id", "session_id"),
+    "compliance_cases": ("case_id",),
+    "geometry_storage": ("case_id",)
+}
+
+# (segment file name, byte offset, length) of one record
+Location = Tuple[str, int, int]
+
+class SegmentLogStore:
+    """Append-only log of JSON records split across size-rotated segment files.
+
+    Each append writes one line to the active segment under a file lock, so the
+    cost is independent of how much history is already stored. Stores with
+    index_fields also append (field, value, segment, offset, length) entries to
+    a sidecar index so records can be read back by key without a scan.
+    """
+
+    def __init__(self, name: str, directory: str = FALLBACK_LOG_DIR, max_segment_bytes: int = FALLBACK_SEGMENT_BYTES,
+                 fsync: str = FALLBACK_FSYNC, fsync_interval: float = FALLBACK_FSYNC_INTERVAL,
+                 index_fields: Iterable[str] = ()):
+        if fsync not in ("always", "interval", "never"):
+            raise ValueError(f"Unknown fsync policy: {fsync}")
+        self.name = name
+        self.directory = Path(directory) / name
+        self.max_segment_bytes = max_segment_bytes
+        self.fsync = fsync
+        self.fsync_interval = fsync_interval
+        self.legacy_file = Path(directory) / f"{name}.json"
+        self._lock = threading.Lock()
+        self.index_fields = tuple(index_fields)
+        self.index_file = self.directory / f"{name}.idx"
+        self._active_seq: Optional[int] = None
+        self._last_fsync = 0.0
+        self._index: Dict[str, Dict[str, List[Location]]] = {}
+        self._index_pos = 0
+        self._maps: Dict[str, mmap.mmap] = {}
+        self._legacy_index: Dict[str, Dict[str, List[Dict[str, Any]]]] = {}
+        self._legacy_signature = None
+        self._reset_index()
+
+    def segment_path(self, seq: int) -> Path:
+        return self.directory / f"{self.name}.{seq:06d}.jsonl"
+
+    def segments(self) -> List[Path]:
+        """Segment files, oldest first"""
+        if not self.directory.exists():
+            return []
+        return sorted(self.directory.glob(f"{self.name}.*.jsonl"))
+
+    def append(self, record: Dict[str, Any]) -> Tuple[str, int, int]:
+        """Append one record; returns (segment file name, byte offset, length)"""
+        line = (json.dumps(record, default=str, separators=(",", ":")) + "\n").encode("utf-8")
+        with self._locked():
+            path = self._active_segment(len(line))
+            with open(path, "ab") as f:
+                offset = f.tell()
+                f.write(line)
+                f.flush()
+                self._maybe_fsync(f)
+            location = (path.name, offset, len(line))
+            if self.index_fields:
+                self._append_index(record, location)
+            return location
+
+    def iter_records(self, include_legacy: bool = True) -> Iterator[Dict[str, Any]]:
+        """Stream records from the legacy JSON array (if any) and then every segment"""
+        if include_legacy and self.legacy_file.exists():
+            yield from self._iter_legacy()
+        for path in self.segments():
+            with open(path, "rb") as f:
+                for line in f:
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        continue  # Torn final line from a crash mid-append
+
+    def lookup(self, field: str, value: Any) -> List[Dict[str, Any]]:
+        """Records whose indexed field equals value, in append order"""
+        if field not in self.index_fields:
+            raise KeyError(f"{self.name} is not indexed on {field}")
+        with self._lock:
+            self._refresh_index()
+            locations = list(self._index[field].get(str(value), ()))
+            records = [self._read_at(*location) for location in locations]
+            legacy = self._legacy_lookup(field, value)
+        # A concurrent prune may have moved records; drop reads that no longer match
+        records = [r for r in records if r is not None and str(r.get(field)) == str(value)]
+        return legacy + records
+
+    def get(self, field: str, value: Any) -> Optional[Dict[str, Any]]:
+        """Most recently appended record whose indexed field equals value"""
+        records = self.lookup(field, value)
+        return records[-1] if records else None
+
+    def rebuild_index(self):
+        """Regenerate the sidecar index from the segments"""
+        with self._locked():
+            self._rebuild_index()
+
+    def prune(self, keep: Callable[[Dict[str, Any]], bool], throttle: float = 0.0) -> Dict[str, int]:
+        """Drop records for which keep() is false in one streaming pass.
+
+        Each segment (and a legacy JSON array) is rewritten to a temp file and
+        atomically renamed over the original, holding the append lock only for
+        that one segment, so memory use stays constant and writers are not
+        blocked for the whole pass.
+        """
+        kept = removed = 0
+        changed = False
+        if self.legacy_file.exists():
+            with self._locked():
+                legacy_kept, legacy_removed = self._prune_legacy(keep)
+            kept, removed, changed = kept + legacy_kept, removed + legacy_removed, legacy_removed > 0
+
+        for path in self.segments():
+            with self._locked():
+                segment_kept, segment_removed = self._prune_segment(path, keep)
+            kept += segment_kept
+            removed += segment_removed
+            changed = changed or segment_removed > 0
+            if throttle:
+                time.sleep(throttle)
+
+        if changed and self.index_fields:
+            self.rebuild_index()
+        return {"pruned": removed, "remaining": kept}
+
+    @contextmanager
+    def _locked(self):
+        """Hold the in-process lock and the cross-process file lock"""
+        with self._lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with open(self.directory / f"{self.name}.lock", "a") as lock_file:
+                if fcntl:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    if fcntl:
+                        fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _prune_segment(self, path: Path, keep: Callable[[Dict[str, Any]], bool]) -> Tuple[int, int]:
+        kept = removed = 0
+        tmp_path = path.with_suffix(".jsonl.tmp")
+        with open(path, "rb") as source, open(tmp_path, "wb") as out:
+            for line in source:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    removed += 1  # Torn or corrupt line: unreadable anyway
+                    continue
+                if keep(record):
+                    out.write(line)
+                    kept += 1
+                else:
+                    removed += 1
+
+        if not removed:
+            tmp_path.unlink()
+        elif kept:
+            os.replace(tmp_path, path)
+        else:
+            tmp_path.unlink()
+            path.unlink()
+        return kept, removed
+
+    def _prune_legacy(self, keep: Callable[[Dict[str, Any]], bool]) -> Tuple[int, int]:
+        kept = removed = 0
+        tmp_path = self.legacy_file.with_suffix(".json.tmp")
+        with open(tmp_path, "w") as out:
+            out.write("[")
+            for record in self._iter_legacy():
+                if keep(record):
+                    out.write(("," if kept else "") + json.dumps(record, default=str))
+                    kept += 1
+                else:
+                    removed += 1
+            out.write("]")
+
+        if not removed:
+            tmp_path.unlink()
+        elif kept:
+            os.replace(tmp_path, self.legacy_file)
+        else:
+            tmp_path.unlink()
+            self.legacy_file.unlink()
+        return kept, removed
+
+    def close(self):
+        """Release memory maps held for reads"""
+        with self._lock:
+            for mapped in self._maps.values():
+                mapped.close()
+            self._maps.clear()
+
+    def _iter_legacy(self) -> Iterator[Dict[str, Any]]:
+        try:
+            yield from (r for r in iter_json_array(self.legacy_file) if isinstance(r, dict))
+        except (OSError, ValueError):
+            return
+
+    def _legacy_lookup(self, field: str, value: Any) -> List[Dict[str, Any]]:
+        """Legacy JSON array records matching value; the array has no offsets, so it is indexed
+        in memory once and re-read only when its mtime or size changes (e.g. after a prune)"""
+        try:
+            stat = self.legacy_file.stat()
+        except OSError:
+            self._legacy_index, self._legacy_signature = {}, None
+            return []
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if signature != self._legacy_signature:
+            index: Dict[str, Dict[str, List[Dict[str, Any]]]] = {f: {} for f in self.index_fields}
+            for record in self._iter_legacy():
+                for indexed_field in self.index_fields:
+                    if record.get(indexed_field) is not None:
+                        index[indexed_field].setdefault(str(record[indexed_field]), []).append(record)
+            self._legacy_index, self._legacy_signature = index, signature
+        # Copies, so callers cannot modify the cached records
+        return copy.deepcopy(self._legacy_index[field].get(str(value), []))
+
+    def _index_entries(self, record: Dict[str, Any], location: Location) -> bytes:
+        lines = []
+        for field in self.index_fields:
+            value = record.get(field)
+            if value is not None:
+                lines.append(json.dumps([field, str(value), *location], separators=(",", ":")) + "\n")
+        return "".join(lines).encode("utf-8")
+
+    def _append_index(self, record: Dict[str, Any], location: Location):
+        """Append index entries; called with the file lock held"""
+        first_record = location[1] == 0 and len(self.segments()) == 1
+        if not self.index_file.exists() and not first_record:
+            # Segments written before the index existed: index everything, including this record
+            self._rebuild_index()
+            return
+        with open(self.index_file, "ab") as f:
+            f.write(self._index_entries(record, location))
+
+    def _rebuild_index(self):
+        """Rewrite the index from every segment; called with the file lock held"""
+        tmp_path = self.index_file.with_suffix(".idx.tmp")
+        with open(tmp_path, "wb") as out:
+            for path in self.segments():
+                with open(path, "rb") as f:
+                    offset = 0
+                    for line in f:
+                        try:
+                            record = json.loads(line)
+                        except ValueError:
+                            record = None
+                        if isinstance(record, dict) and line.endswith(b"\n"):
+                            out.write(self._index_entries(record, (path.name, offset, len(line))))
+                        offset += len(line)
+        os.replace(tmp_path, self.index_file)
+        self._reset_index()
+
+    def _refresh_index(self):
+        """Load index entries appended since the last read, by this or another process"""
+        if not self.index_file.exists():
+            if self.segments():
+                with open(self.directory / f"{self.name}.lock", "a") as lock_file:
+                    if fcntl:
+                        fcntl.flock(lock_file, fcntl.LOCK_EX)
+                    try:
+                        if not self.index_file.exists():
+                            self._rebuild_index()
+                    finally:
+                        if fcntl:
+                            fcntl.flock(lock_file, fcntl.LOCK_UN)
+            else:
+                return
+        size = self.index_file.stat().st_size
+        if size < self._index_pos:
+            # Index was rebuilt (e.g. after pruning): reload from the start
+            self._reset_index()
+        if size == self._index_pos:
+            return
+        with open(self.index_file, "rb") as f:
+            f.seek(self._index_pos)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # Entry still being written
+                self._index_pos += len(line)
+                try:
+                    field, value, segment, offset, length = json.loads(line)
+                except ValueError:
+                    continue
+                if field in self._index:
+                    self._index[field].setdefault(value, []).append((segment, offset, length))
+
+    def _reset_index(self):
+        self._index = {field: {} for field in self.index_fields}
+        self._index_pos = 0
+        for mapped in self._maps.values():
+            mapped.close()
+        self._maps.clear()
+
+    def _read_at(self, segment: str, offset: int, length: int) -> Optional[Dict[str, Any]]:
+        """Read one record through a memory map of its segment"""
+        mapped = self._maps.get(segment)
+        if mapped is None or mapped.size() < offset + length:
+            path = self.directory / segment
+            try:
+                with open(path, "rb") as f:
+                    size = os.fstat(f.fileno()).st_size
+                    if size < offset + length:
+                        return None
+                    new_map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except (OSError, ValueError):
+                return None
+            if mapped is not None:
+                mapped.close()
+            mapped = self._maps[segment] = new_map
+        try:
+            return json.loads(mapped[offset:offset + length])
+        except ValueError:
+            return None
+
+    def _active_segment(self, incoming: int) -> Path:
+        """Current segment, rotating when the next write would exceed the size limit"""
+        if self._active_seq is None:
+            existing = self.segments()
+            self._active_seq = int(existing[-1].name.split(".")[-2]) if existing else 0
+        # Another process may have rotated since we last appended
+        while self.segment_path(self._active_seq + 1).exists():
+            self._active_seq += 1
+
+        path = self.segment_path(self._active_seq)
+        if path.exists() and path.stat().st_size > 0 and path.stat().st_size + incoming > self.max_segment_bytes:
+            self._active_seq += 1
+            path = self.segment_path(self._active_seq)
+        return path
+
+    def _maybe_fsync(self, f):
+        if self.fsync == "never":
+            return
+        now = time.monotonic()
+        if self.fsync == "always" or now - self._last_fsync >= self.fsync_interval:
+            os.fsync(f.fileno())
+            self._last_fsync = now
+
+def iter_json_array(path: Path, chunk_size: int = 1 << 16) -> Iterator[Any]:
+    """Yield the elements of a JSON array file without loading the whole file"""
+    decoder = json.JSONDecoder()
+    with open(path, "r") as f:
+        buffer, pos, started, eof = "", 0, False, False
+        while True:
+            while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+                pos += 1
+            if pos < len(buffer):
+                if not started:
+                    if buffer[pos] != "[":
+                        raise ValueError(f"{path} is not a JSON array")
+                    started, pos = True, pos + 1
+                    continue
+                if buffer[pos] == "]":
+                    return
+                try:
+                    value, end = decoder.raw_decode(buffer, pos)
+                except ValueError:
+                    if eof:
+                        raise
+                else:
+                    if end < len(buffer) or eof:  # A value ending at the buffer edge may be cut short
+                        yield value
+                        pos = end
+                        continue
+            elif eof:
+                return
+            chunk = f.read(chunk_size)
+            buffer, pos, eof = buffer[pos:] + chunk, 0, not chunk
+
+_stores: Dict[Tuple[str, str], SegmentLogStore] = {}
+_stores_lock = threading.Lock()
+
+def get_log_store(name: str, directory: str = None) -> SegmentLogStore:
+    """Get the shared store for a fallback log, one instance per directory and name.
+
+    Stores listed in INDEX_FIELDS maintain a sidecar offset index.
+    """
+    directory = str(Path(directory or FALLBACK_LOG_DIR).resolve())
+    key = (directory, name)
+    store = _stores.get(key)
+    if store is None:
+        with _stores_lock:
+            store = _stores.get(key)
+            if store is None:
+                store = _stores[key] = SegmentLogStore(name, directory, index_fields=INDEX_FIELDS.get(name, ()))
+    return store
+
+def list_stores(directory: str = None) -> List[str]:
+    """Names of the fallback logs present in a directory, as segments or legacy JSON files"""
+    root = Path(directory or FALLBACK_LOG_DIR)
+    if not root.exists():
+        return []
+    names = {path.stem for path in root.glob("*.json")}
+    names.update(path.name for path in root.iterdir() if path.is_dir() and any(path.glob(f"{path.name}.*.jsonl")))
+    return sorted(names)
@@ -1,6 +1,6 @@
 """SQLAlchemy models for BHIV Bucket"""
 
-from sqlalchemy import Column, Integer, String, Text, DateTime, Float, JSON, Boolean
+from sqlalchemy import Column, Integer, String, Text, DateTime, Float, JSON, Boolean, Index
 from sqlalchemy.orm import declarative_base
 from sqlalchemy.sql import func
 import uuid
@@ -27,6 +27,11 @@ class Eval(Base):
     score = Column(Float, nullable=False)
     created_at = Column(DateTime, server_default=func.now())
 
+    __table_args__ = (
+        Index('ix_evals_spec_id_created_at', 'spec_id', 'created_at'),
+        Index('ix_evals_created_at', 'created_at'),
+    )
+
 class FeedbackLog(Base):
     __tablename__ = 'feedback_logs'
 
@@ -37,6 +42,11 @@ class FeedbackLog(Base):
     reward = Column(Float, nullable=True)
     created_at = Column(DateTime, server_default=func.now())
 
+    __table_args__ = (
+        Index('ix_feedback_logs_spec_id_created_at', 'spec_id', 'created_at'),
+        Index('ix_feedback_logs_created_at', 'created_at'),
+    )
+
 class HidgLog(Base):
     __tablename__ = 'hidg_logs'
 
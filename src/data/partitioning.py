@@ -0,0 +1,242 @@
+"""Monthly time partitions for iteration_logs and feedback_logs"""
+
+import os
+import re
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+from sqlalchemy import MetaData, text
+from .models import FeedbackLog
+from .iteration_models import IterationLog
+
+LOG_PARTITIONING = os.getenv("LOG_PARTITIONING", "false").lower() == "true"
+LOG_PARTITION_MONTHS_AHEAD = int(os.getenv("LOG_PARTITION_MONTHS_AHEAD", "2"))
+
+PARTITIONED_TABLES = {
+    "iteration_logs": IterationLog,
+    "feedback_logs": FeedbackLog
+}
+
+def month_start(moment: datetime) -> datetime:
+    return moment.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+def add_months(month: datetime, count: int) -> datetime:
+    index = month.year * 12 + month.month - 1 + count
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+def partition_name(table: str, month: datetime) -> str:
+    return f"{table}_p{month:%Y%m}"
+
+def default_partition_name(table: str) -> str:
+    return f"{table}_pdefault"
+
+def _bound(month: datetime) -> str:
+    return f"{month:%Y-%m-%d %H:%M:%S}"
+
+class LogPartitionManager:
+    """Keeps one partition per calendar month so retention drops whole tables instead of deleting rows.
+
+    Postgres uses native range partitions (created by the partition_log_tables
+    migration). SQLite emulates them with a table per month behind a UNION ALL
+    view whose INSTEAD OF triggers route writes, so the ORM models are unchanged.
+    Rows outside the monthly range land in a default partition.
+    """
+
+    def __init__(self, db=None):
+        if db is None:
+            from .database import get_database
+            db = get_database()
+        self.db = db
+        self.dialect = db.engine.dialect.name
+
+    def is_partitioned(self, table: str) -> bool:
+        with self.db.engine.connect() as conn:
+            if self.dialect == "postgresql":
+                return bool(conn.execute(text(
+                    "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table pt "
+                    "JOIN pg_class c ON c.oid = pt.partrelid WHERE c.relname = :table)"
+                ), {"table": table}).scalar())
+            if self.dialect == "sqlite":
+                return conn.execute(text(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'view' AND name = :table"
+                ), {"table": table}).first() is not None
+        return False
+
+    def list_partitions(self, table: str) -> List[datetime]:
+        """Months that currently have a partition, oldest first"""
+        with self.db.engine.connect() as conn:
+            return self._months(conn, table)
+
+    def enable(self, months_ahead: int = LOG_PARTITION_MONTHS_AHEAD) -> Dict[str, List[str]]:
+        """Partition the log tables, converting existing SQLite tables in place"""
+        if self.dialect == "sqlite":
+            created = {}
+            for table, model in PARTITIONED_TABLES.items():
+                if not self.is_partitioned(table):
+                    with self.db.engine.begin() as conn:
+                        created[table] = self._sqlite_convert(conn, table, model, months_ahead)
+            for table, names in self.ensure_partitions(months_ahead).items():
+                created.setdefault(table, []).extend(names)
+            return created
+        if self.dialect == "postgresql":
+            missing = [table for table in PARTITIONED_TABLES if not self.is_partitioned(table)]
+            if missing:
+                print(f"[WARN] {', '.join(missing)} not partitioned; run the partition_log_tables migration")
+            return self.ensure_partitions(months_ahead)
+        print(f"[WARN] Log partitioning is not supported on {self.dialect}")
+        return {}
+
+    def ensure_partitions(self, months_ahead: int = LOG_PARTITION_MONTHS_AHEAD,
+                          now: Optional[datetime] = None) -> Dict[str, List[str]]:
+        """Create partitions up to months_ahead past the current month, filling any gap"""
+        current = month_start(now or datetime.now())
+        created = {}
+        for table, model in PARTITIONED_TABLES.items():
+            if not self.is_partitioned(table):
+                continue
+            with self.db.engine.begin() as conn:
+                months = self._months(conn, table)
+                month = add_months(months[-1], 1) if months and months[-1] < current else current
+                new_months = []
+                while month <= add_months(current, months_ahead):
+                    if month not in months:
+                        new_months.append(month)
+                    month = add_months(month, 1)
+                for month in new_months:
+                    self._create_partition(conn, table, model, month)
+                if new_months and self.dialect == "sqlite":
+                    self._sqlite_route(conn, table, model, sorted(months + new_months))
+                created[table] = [partition_name(table, m) for m in new_months]
+        return created
+
+    def drop_partitions_before(self, cutoff: datetime) -> Dict[str, List[str]]:
+        """Drop every monthly partition that ends at or before cutoff"""
+        dropped = {}
+        for table, model in PARTITIONED_TABLES.items():
+            if not self.is_partitioned(table):
+                continue
+            with self.db.engine.begin() as conn:
+                months = self._months(conn, table)
+                expired = [m for m in months if add_months(m, 1) <= cutoff]
+                for month in expired:
+                    name = partition_name(table, month)
+                    if self.dialect == "postgresql":
+                        conn.execute(text(f'ALTER TABLE "{table}" DETACH PARTITION "{name}"'))
+                    conn.execute(text(f'DROP TABLE IF EXISTS "{name}"'))
+                # Stray old rows in the default partition are few, so delete them directly
+                conn.execute(text(f'DELETE FROM "{default_partition_name(table)}" WHERE created_at < :cutoff'),
+                             {"cutoff": _bound(cutoff) if self.dialect == "sqlite" else cutoff})
+                if expired and self.dialect == "sqlite":
+                    self._sqlite_route(conn, table, model, [m for m in months if m not in expired])
+                dropped[table] = [partition_name(table, m) for m in expired]
+        return dropped
+
+    def prune(self, retention_days: int) -> Dict[str, Any]:
+        """Retention job: keep partitions ahead of time and drop the expired ones"""
+        partitioned = [table for table in PARTITIONED_TABLES if self.is_partitioned(table)]
+        if not partitioned:
+            return {"partitioned": False, "dropped": {}, "total_dropped": 0}
+        self.ensure_partitions()
+        dropped = self.drop_partitions_before(datetime.now() - timedelta(days=retention_days))
+        return {
+            "partitioned": True,
+            "dropped": dropped,
+            "total_dropped": sum(len(names) for names in dropped.values())
+        }
+
+    def _months(self, conn, table: str) -> List[datetime]:
+        if self.dialect == "postgresql":
+            names = conn.execute(text(
+                "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+                "JOIN pg_class p ON p.oid = i.inhparent WHERE p.relname = :table"
+            ), {"table": table}).scalars()
+        else:
+            names = conn.execute(text(
+                "SELECT name FROM sqlite_master WHERE type = 'table' AND name LIKE :pattern"
+            ), {"pattern": f"{table}_p%"}).scalars()
+        pattern = re.compile(rf"^{re.escape(table)}_p(\d{{6}})$")
+        return sorted(datetime.strptime(m.group(1), "%Y%m") for m in map(pattern.match, names) if m)
+
+    def _create_partition(self, conn, table: str, model, month: datetime):
+        name = partition_name(table, month)
+        if self.dialect == "postgresql":
+            conn.execute(text(
+                f'CREATE TABLE IF NOT EXISTS "{name}" PARTITION OF "{table}" '
+                f"FOR VALUES FROM ('{_bound(month)}') TO ('{_bound(add_months(month, 1))}')"
+            ))
+            return
+
+        self._sqlite_create_table(conn, model, name)
+        # Rows that arrived before this month had a partition sit in the default one
+        columns = ", ".join(c.name for c in model.__table__.columns)
+        default = default_partition_name(table)
+        bounds = {"lo": _bound(month), "hi": _bound(add_months(month, 1))}
+        conn.execute(text(f'INSERT INTO "{name}" ({columns}) SELECT {columns} FROM "{default}" '
+                          "WHERE created_at >= :lo AND created_at < :hi"), bounds)
+        conn.execute(text(f'DELETE FROM "{default}" WHERE created_at >= :lo AND created_at < :hi'), bounds)
+
+    def _sqlite_create_table(self, conn, model, name: str):
+        """Copy of the model's table (with uniquely named indexes) under another name"""
+        partition = model.__table__.to_metadata(MetaData(), name=name)
+        suffix = name[len(model.__tablename__) + 1:]
+        for index in partition.indexes:
+            index.name = f"{index.name}_{suffix}"
+        partition.create(conn, checkfirst=True)
+
+    def _sqlite_convert(self, conn, table: str, model, months_ahead: int) -> List[str]:
+        """Move an ordinary table into monthly partitions behind a routing view"""
+        columns = ", ".join(c.name for c in model.__table__.columns)
+        conn.execute(text(f'ALTER TABLE "{table}" RENAME TO "{table}_unpartitioned"'))
+
+        first = conn.execute(text(f'SELECT MIN(created_at) FROM "{table}_unpartitioned"')).scalar()
+        current = month_start(datetime.now())
+        month = min(month_start(datetime.fromisoformat(str(first))), current) if first else current
+        months = []
+        while month <= add_months(current, months_ahead):
+            months.append(month)
+            month = add_months(month, 1)
+
+        self._sqlite_create_table(conn, model, default_partition_name(table))
+        for month in months:
+            name = partition_name(table, month)
+            self._sqlite_create_table(conn, model, name)
+            conn.execute(text(f'INSERT INTO "{name}" ({columns}) SELECT {columns} FROM "{table}_unpartitioned" '
+                              "WHERE created_at >= :lo AND created_at < :hi"),
+                         {"lo": _bound(month), "hi": _bound(add_months(month, 1))})
+        conn.execute(text(f'INSERT INTO "{default_partition_name(table)}" ({columns}) SELECT {columns} '
+                          f'FROM "{table}_unpartitioned" WHERE created_at IS NULL OR created_at < :lo OR created_at >= :hi'),
+                     {"lo": _bound(months[0]), "hi": _bound(add_months(months[-1], 1))})
+        conn.execute(text(f'DROP TABLE "{table}_unpartitioned"'))
+
+        self._sqlite_route(conn, table, model, months)
+        return [partition_name(table, m) for m in months]
+
+    def _sqlite_route(self, conn, table: str, model, months: List[datetime]):
+        """(Re)create the UNION ALL view and the triggers that route writes to partitions"""
+        names = [c.name for c in model.__table__.columns]
+        columns = ", ".join(names)
+        partitions = [partition_name(table, m) for m in months] + [default_partition_name(table)]
+        timestamp = "COALESCE(NEW.created_at, CURRENT_TIMESTAMP)"
+        values = ", ".join(timestamp if name == "created_at" else f"NEW.{name}" for name in names)
+
+        routes = []
+        for month in months:
+            routes.append(f'INSERT INTO "{partition_name(table, month)}" ({columns}) SELECT {values} '
+                          f"WHERE {timestamp} >= '{_bound(month)}' AND {timestamp} < '{_bound(add_months(month, 1))}';")
+        in_range = (f"{timestamp} >= '{_bound(months[0])}' AND {timestamp} < '{_bound(add_months(months[-1], 1))}'"
+                    if months else "0")
+        routes.append(f'INSERT INTO "{default_partition_name(table)}" ({columns}) SELECT {values} WHERE NOT ({in_range});')
+        assignments = ", ".join(f"{name} = NEW.{name}" for name in names)
+
+        for statement in (
+            f'DROP TRIGGER IF EXISTS "{table}_insert"',
+            f'DROP TRIGGER IF EXISTS "{table}_update"',
+            f'DROP TRIGGER IF EXISTS "{table}_delete"',
+            f'DROP VIEW IF EXISTS "{table}"',
+            f'CREATE VIEW "{table}" AS ' + " UNION ALL ".join(f'SELECT {columns} FROM "{p}"' for p in partitions),
+            f'CREATE TRIGGER "{table}_insert" INSTEAD OF INSERT ON "{table}" BEGIN {" ".join(routes)} END',
+            f'CREATE TRIGGER "{table}_update" INSTEAD OF UPDATE ON "{table}" BEGIN '
+            + " ".join(f'UPDATE "{p}" SET {assignments} WHERE id = OLD.id;' for p in partitions) + " END",
+            f'CREATE TRIGGER "{table}_delete" INSTEAD OF DELETE ON "{table}" BEGIN '
+            + " ".join(f'DELETE FROM "{p}" WHERE id = OLD.id;' for p in partitions) + " END",
+        ):
+            conn.execute(text(statement))
@@ -0,0 +1,217 @@
+"""Write-behind queue that batches inserts for BHIV Bucket"""
+
+import atexit
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from sqlalchemy import insert
+
+# (model, row, fallback) - fallback persists the row to file storage if the DB write fails
+PendingWrite = Tuple[Any, Dict[str, Any], Optional[Callable[[], Any]]]
+
+class _Flush:
+    """Queue marker: the writer writes its current batch, then sets done.
+
+    Rows queued before the marker have all been written (or sent to their
+    fallback) by the time done is set, whatever is queued after it.
+    """
+
+    def __init__(self):
+        self.done = threading.Event()
+
+# Queue marker that ends the writer
+_STOP = object()
+
+class WriteBehindQueue:
+    """Coalesces single-row inserts into multi-row batches on a background thread.
+
+    A row leaves the queue only once it is committed or written through its
+    fallback, and the queue is drained at interpreter exit.
+    """
+
+    def __init__(self, session_factory, batch_size: int = 100, flush_interval: float = 0.5, max_size: int = 10000,
+                 enqueue_timeout: float = 0.05):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.enqueue_timeout = enqueue_timeout
+        self._queue: "queue.Queue[PendingWrite]" = queue.Queue(maxsize=max_size)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._thread_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "enqueued": 0,
+            "flushed_rows": 0,
+            "batches": 0,
+            "fallback_rows": 0,
+            "overflow_fallbacks": 0,
+            "last_flush_ms": 0.0,
+            "max_flush_ms": 0.0,
+            "total_flush_ms": 0.0
+        }
+        atexit.register(self.close)
+
+    def enqueue(self, model, row: Dict[str, Any], fallback: Optional[Callable[[], Any]] = None):
+        """Queue one row for insert.
+
+        A full queue makes the caller wait up to enqueue_timeout for room; if the
+        writer still has not caught up, the row goes to its fallback store
+        rather than into a DB write on the caller's thread.
+        """
+        self._ensure_thread()
+        try:
+            self._queue.put((model, row, fallback), timeout=self.enqueue_timeout)
+            self._count(enqueued=1)
+        except queue.Full:
+            self._count(overflow_fallbacks=1)
+            self._run_fallbacks([(model, row, fallback)])
+
+    def pending(self) -> int:
+        """Rows queued or being written"""
+        return self._queue.unfinished_tasks
+
+    def flush(self):
+        """Block until every row queued before this call has been written"""
+        if self.pending():
+            self._ensure_thread()
+            marker = _Flush()
+            self._queue.put(marker)
+            marker.done.wait()
+
+    def close(self):
+        """Drain the queue and stop the writer thread"""
+        self.flush()
+        self._stop.set()
+        if self._thread is not None:
+            try:
+                self._queue.put_nowait(_STOP)
+            except queue.Full:
+                pass
+            self._thread.join(timeout=self.flush_interval * 2)
+            self._thread = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get queue depth and flush latency statistics"""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        batches = stats["batches"]
+        return {
+            "queue_depth": self._queue.qsize(),
+            "pending": self.pending(),
+            "enqueued": stats["enqueued"],
+            "flushed_rows": stats["flushed_rows"],
+            "batches": batches,
+            "fallback_rows": stats["fallback_rows"],
+            "overflow_fallbacks": stats["overflow_fallbacks"],
+            "avg_batch_size": round(stats["flushed_rows"] / batches, 2) if batches else 0.0,
+            "last_flush_ms": round(stats["last_flush_ms"], 3),
+            "max_flush_ms": round(stats["max_flush_ms"], 3),
+            "avg_flush_ms": round(stats["total_flush_ms"] / batches, 3) if batches else 0.0
+        }
+
+    def _count(self, **deltas):
+        with self._stats_lock:
+            for key, delta in deltas.items():
+                self._stats[key] += delta
+
+    def _ensure_thread(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._thread_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name="db-write-behind", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                first = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            if isinstance(first, _Flush):
+                self._queue.task_done()
+                first.done.set()
+                continue
+            if first is _STOP:
+                self._queue.task_done()
+                break
+
+            batch = [first]
+            marker = None
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if isinstance(item, _Flush) or item is _STOP:
+                    self._queue.task_done()
+                    if item is _STOP:
+                        self._stop.set()
+                    else:
+                        marker = item
+                    break
+                batch.append(item)
+
+            try:
+                self._write_batch(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+                if marker is not None:
+                    marker.done.set()
+
+    def _write_batch(self, batch: List[PendingWrite]):
+        """Insert a batch with one executemany per model in a single commit"""
+        start = time.perf_counter()
+        rows_by_model: Dict[Any, List[Dict[str, Any]]] = {}
+        for model, row, _ in batch:
+            rows_by_model.setdefault(model, []).append(row)
+
+        try:
+            with self.session_factory() as session:
+                for model, rows in rows_by_model.items():
+                    session.execute(insert(model), rows)
+                session.commit()
+            self._count(flushed_rows=len(batch))
+        except Exception as e:
+            print(f"[WARN] Batched DB write failed, retrying {len(batch)} rows one at a time: {e}")
+            self._write_rows(batch)
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        with self._stats_lock:
+            self._stats["batches"] += 1
+            self._stats["last_flush_ms"] = elapsed_ms
+            self._stats["total_flush_ms"] += elapsed_ms
+            self._stats["max_flush_ms"] = max(self._stats["max_flush_ms"], elapsed_ms)
+
+    def _write_rows(self, batch: List[PendingWrite]):
+        """Insert rows one per commit, so one bad row (duplicate id, missing FK) sends only itself to the fallback"""
+        failed = []
+        for item in batch:
+            model, row, _ = item
+            try:
+                with self.session_factory() as session:
+                    session.execute(insert(model), [row])
+                    session.commit()
+                self._count(flushed_rows=1)
+            except Exception as e:
+                print(f"[WARN] DB write failed for {row.get('id')}, using fallback: {e}")
+                failed.append(item)
+        self._run_fallbacks(failed)
+
+    def _run_fallbacks(self, batch: List[PendingWrite]):
+        for _, _, fallback in batch:
+            if fallback is None:
+                continue
+            try:
+                fallback()
+                self._count(fallback_rows=1)
+            except Exception as fallback_error:
+                print(f"[ERROR] Fallback write failed: {fallback_error}")
@@ -1,9 +1,9 @@
 """Feedback Loop for RL Training"""
 
-import json
 from pathlib import Path
 from datetime import datetime
 from src.schemas.legacy_schema import DesignSpec, EvaluationResult
+from src.data.log_store import get_log_store
 
 class FeedbackLoop:
     def __init__(self):
@@ -35,18 +35,7 @@ class FeedbackLoop:
         }
         
         # Save to iteration logs
-        iteration_file = self.logs_dir / "iteration_logs.json"
-        logs = []
-        if iteration_file.exists():
-            with open(iteration_file, 'r') as f:
-                try:
-                    logs = json.load(f)
-                except:
-                    logs = []
-        
-        logs.append(log_entry)
-        with open(iteration_file, 'w') as f:
-            json.dump(logs, f, indent=2, default=str)
+        get_log_store("iteration_logs", str(self.logs_dir)).append(log_entry)
     
     def get_feedback_for_prompt(self, prompt: str) -> list:
         """Get feedback suggestions for a prompt"""
@@ -70,23 +59,19 @@ class FeedbackLoop:
     
     def get_learning_insights(self) -> dict:
         """Get learning insights from logs"""
-        iteration_file = self.logs_dir / "iteration_logs.json"
-        if not iteration_file.exists():
-            return {"total_iterations": 0, "average_score": 0}
-        
-        with open(iteration_file, 'r') as f:
-            try:
-                logs = json.load(f)
-            except:
-                return {"total_iterations": 0, "average_score": 0}
+        total = 0
+        scores = []
+        for log in get_log_store("iteration_logs", str(self.logs_dir)).iter_records():
+            total += 1
+            evaluation = log.get("evaluation")
+            if isinstance(evaluation, dict) and "score" in evaluation:
+                scores.append(evaluation["score"])
         
-        if not logs:
+        if not total:
             return {"total_iterations": 0, "average_score": 0}
         
-        scores = [log["evaluation"]["score"] for log in logs if "evaluation" in log]
-        
         return {
-            "total_iterations": len(logs),
+            "total_iterations": total,
             "average_score": sum(scores) / len(scores) if scores else 0,
             "final_score": scores[-1] if scores else 0,
             "improvement": scores[-1] - scores[0] if len(scores) > 1 else 0
@@ -108,15 +93,4 @@ class FeedbackLoop:
             "timestamp": datetime.now().isoformat()
         }
         
-        comparison_file = self.logs_dir / "comparison_logs.json"
-        logs = []
-        if comparison_file.exists():
-            with open(comparison_file, 'r') as f:
-                try:
-                    logs = json.load(f)
-                except:
-                    logs = []
-        
-        logs.append(comparison_entry)
-        with open(comparison_file, 'w') as f:
-            json.dump(logs, f, indent=2, default=str)
\ No newline at end of file
+        get_log_store("comparison_logs", str(self.logs_dir)).append(comparison_entry)
\ No newline at end of file
@@ -3,6 +3,17 @@
 from typing import Dict, Any
 import os
 import json
+from src.core.keyword_index import KeywordIndex
+
+# Checked in order; prompts matching none are treated as appliances
+DESIGN_TYPE_KEYWORDS = KeywordIndex({
+    "design_type": {
+        "building": ['building', 'house', 'office', 'structure'],
+        "vehicle": ['car', 'vehicle', 'truck', 'bike'],
+        "electronics": ['phone', 'computer', 'device', 'electronics'],
+        "furniture": ['chair', 'table', 'furniture', 'desk'],
+    },
+})
 
 class LMAdapter:
     def __init__(self, model_client=None):
@@ -51,11 +62,9 @@ class LMAdapter:
     def _log_usage(self, provider: str, cost: float, prompt: str, params: dict):
         """Log compute usage and cost"""
         try:
-            from src.data.database import Database
             import uuid
             from datetime import datetime
             
-            db = Database()
             usage_data = {
                 "job_id": str(uuid.uuid4()),
                 "provider": provider,
@@ -66,21 +75,8 @@ class LMAdapter:
             }
             
             # Save to usage_logs (fallback to file)
-            from pathlib import Path
-            import json
-            
-            Path("logs").mkdir(exist_ok=True)
-            usage_file = Path("logs/usage_logs.json")
-            
-            existing_logs = []
-            if usage_file.exists():
-                with open(usage_file, 'r') as f:
-                    existing_logs = json.load(f)
-            
-            existing_logs.append(usage_data)
-            
-            with open(usage_file, 'w') as f:
-                json.dump(existing_logs, f, indent=2)
+            from src.data.log_store import get_log_store
+            get_log_store("usage_logs").append(usage_data)
                 
         except Exception as e:
             print(f"Usage logging failed: {e}")
@@ -119,19 +115,8 @@ class LMAdapter:
 
     def _heuristic_generate(self, prompt: str, params: dict) -> dict:
         """Fallback heuristic generation"""
-        prompt_lower = prompt.lower()
-        
         # Determine design type
-        if any(word in prompt_lower for word in ['building', 'house', 'office', 'structure']):
-            design_type = 'building'
-        elif any(word in prompt_lower for word in ['car', 'vehicle', 'truck', 'bike']):
-            design_type = 'vehicle'
-        elif any(word in prompt_lower for word in ['phone', 'computer', 'device', 'electronics']):
-            design_type = 'electronics'
-        elif any(word in prompt_lower for word in ['chair', 'table', 'furniture', 'desk']):
-            design_type = 'furniture'
-        else:
-            design_type = 'appliance'
+        design_type = DESIGN_TYPE_KEYWORDS.match(prompt).first("design_type", 'appliance')
 
         # Log local usage
         self._log_usage("local", 0.01, prompt, params)
@@ -23,10 +23,14 @@ if sys.platform.startswith('win'):
 
 from fastapi import FastAPI, HTTPException, Request, Depends, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 from fastapi.security import APIKeyHeader
 from pydantic import BaseModel
 from typing import Dict, Any, List, Optional, Union
 import uvicorn
+import asyncio
+import json
 from datetime import datetime, timezone, timedelta
 import os
 import secrets
@@ -40,9 +44,10 @@ from slowapi.errors import RateLimitExceeded
 from src.agents.main_agent import MainAgent
 from src.agents.evaluator_agent import EvaluatorAgent
 from src.agents.rl_agent import RLLoop
-from src.data.database import Database
+from src.data.database import Database, get_database
 from src.agents.feedback_agent import FeedbackAgent
-from src.core.cache import cache
+from src.core.cache import cache, spec_tag
+from src.core.route_cache import cached_route, ROUTE_CACHE_TTLS
 from src.core.auth import create_access_token, get_current_user
 from fastapi.security import OAuth2PasswordBearer
 # Jose import with fallback
@@ -73,6 +78,10 @@ from src.services.compliance import compliance_proxy
 from src.services.geometry_storage import geometry_storage
 from src.auth.jwt_auth import jwt_auth, LoginRequest, RefreshRequest
 from src.services.compute_router import compute_router
+from src.services.agent_executor import (
+    ExecutorBusy, agent_executor, install_agents, coordinated_improvement_task, evaluate_task,
+    generate_and_evaluate_task, generate_task, rl_task
+)
 from src.utils.system_monitoring import system_monitor, init_sentry
 from src.services.preview_manager import preview_manager
 from src.services.frontend_integration import frontend_integration
@@ -95,12 +104,19 @@ class FallbackDB:
     def save_spec(self, *args): return "fallback_id"
     def save_eval(self, *args): return "fallback_id"
     def get_report(self, *args): return None
-    def get_iteration_logs(self, *args): return []
+    async def get_report_async(self, *args, **kwargs): return None
+    def get_iteration_logs(self, *args, **kwargs): return []
+    def get_iteration_logs_page(self, *args, **kwargs): return {"items": [], "next_cursor": None, "total": 0}
+    def stream_iteration_logs(self, *args, **kwargs): return iter(())
     def save_hidg_log(self, *args): return "fallback_id"
     def save_iteration_log(self, *args): return "fallback_id"
     def save_compliance_case(self, *args): return "fallback_id"
     def save_compliance_feedback(self, *args): return "fallback_id"
     def save_pipeline_result(self, *args): return "fallback_id"
+    async def save_spec_async(self, *args): return "fallback_id"
+    async def save_eval_async(self, *args): return "fallback_id"
+    async def save_hidg_log_async(self, *args): return "fallback_id"
+    async def get_geometry_reference(self, *args): return None
 
 API_KEY = os.getenv("API_KEY", "test-api-key")
 api_key_header = APIKeyHeader(name="X-API-Key", auto_error=False)
@@ -254,7 +270,7 @@ try:
     evaluator_agent = EvaluatorAgent()
     rl_agent = RLLoop()
     feedback_agent = FeedbackAgent()
-    db = Database()
+    db = get_database()
     print("[OK] All agents initialized successfully")
 except Exception as e:
     print(f"[WARN] Agent initialization warning: {e}")
@@ -264,11 +280,29 @@ except Exception as e:
     rl_agent = FallbackAgent()
     feedback_agent = FallbackAgent()
     try:
-        db = Database()
+        db = get_database()
     except Exception as db_error:
         print(f"[ERROR] Database initialization failed: {db_error}")
         db = FallbackDB()
 
+# Thread workers share the stateless agents; RLLoop keeps per-run state, so each worker builds its own
+install_agents(main=prompt_agent, evaluator=evaluator_agent)
+
+@app.on_event("startup")
+async def start_agent_executor():
+    agent_executor.start()
+
+@app.on_event("shutdown")
+async def stop_agent_executor():
+    agent_executor.shutdown(wait=False)
+
+async def run_agent_task(pool: str, fn, *args):
+    """Run agent work on the executor instead of the event loop; a full pool answers 503"""
+    try:
+        return await agent_executor.run(pool, fn, *args)
+    except ExecutorBusy as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
 # Request models
 class GenerateRequest(BaseModel):
     prompt: str
@@ -281,6 +315,12 @@ class IterateRequest(BaseModel):
     prompt: str
     n_iter: int = 3
 
+class BatchGenerateRequest(BaseModel):
+    prompts: List[str]
+    persist: bool = True
+
+BATCH_GENERATE_MAX_PROMPTS = int(os.getenv("BATCH_GENERATE_MAX_PROMPTS", "100000"))
+
 
 
 # ============================================================================
@@ -373,9 +413,13 @@ async def health_check(request: Request):
         if hasattr(agent, 'run'):
             agents_status.append(name)
 
+    pool_stats = db.get_pool_stats() if db_status and hasattr(db, 'get_pool_stats') else {}
+
     return {
         "status": "healthy" if db_status else "degraded",
         "database": db_status,
+        "database_pool": pool_stats,
+        "database_write_queue": db.get_write_queue_stats() if hasattr(db, 'get_write_queue_stats') else {"enabled": False},
         "agents": agents_status,
         "timestamp": datetime.now(timezone.utc).isoformat()
     }
@@ -394,7 +438,8 @@ async def basic_metrics(request: Request, auth=Depends(verify_dual_auth)):
         from pathlib import Path
         specs_count = len(list(Path("spec_outputs").glob("*.json"))) if Path("spec_outputs").exists() else 0
         reports_count = len(list(Path("reports").glob("*.json"))) if Path("reports").exists() else 0
-        logs_count = len(list(Path("logs").glob("*.json"))) if Path("logs").exists() else 0
+        from src.data.log_store import list_stores
+        logs_count = len(list_stores())  # one per fallback log, whether JSONL segments or a legacy array
         return {
             "generated_specs": specs_count,
             "evaluation_reports": reports_count,
@@ -449,8 +494,7 @@ async def run_system_test(request: Request, auth=Depends(verify_dual_auth)):
     """🧪 Run system validation"""
     try:
         # Test core functionality
-        spec = prompt_agent.run("Test building")
-        evaluation = evaluator_agent.run(spec, "Test building")
+        spec, evaluation = await run_agent_task("agents", generate_and_evaluate_task, "Test building")
 
         return {
             "success": True,
@@ -461,6 +505,8 @@ async def run_system_test(request: Request, auth=Depends(verify_dual_auth)):
             ],
             "message": "All core tests passed"
         }
+    except HTTPException:
+        raise
     except Exception as e:
         import logging
         logging.error(f"System test failed: {e}")
@@ -504,6 +550,16 @@ async def get_cache_stats(request: Request, auth=Depends(verify_dual_auth)):
         logging.error(f"Failed to get cache stats: {e}")
         raise HTTPException(status_code=500, detail="Failed to get cache stats")
 
+@app.get("/executor-stats", tags=["📊 System Monitoring"])
+@limiter.limit("20/minute")
+async def get_executor_stats(request: Request, auth=Depends(verify_dual_auth)):
+    """Per-pool metrics of the agent executor"""
+    return {
+        "success": True,
+        "executor_stats": agent_executor.get_stats(),
+        "timestamp": datetime.now(timezone.utc).isoformat()
+    }
+
 @app.get("/metrics", tags=["📊 System Monitoring"])
 @limiter.limit("20/minute")
 async def get_metrics_public(request: Request, auth=Depends(verify_dual_auth)):
@@ -528,6 +584,7 @@ async def get_detailed_metrics(request: Request, auth=Depends(verify_dual_auth))
         return {
             "health": health_metrics,
             "compute": compute_stats,
+            "executor": agent_executor.get_stats(),
             "timestamp": datetime.now(timezone.utc).isoformat()
         }
     except Exception as e:
@@ -605,13 +662,14 @@ async def get_sentry_status(request: Request, auth=Depends(verify_dual_auth)):
 
 @app.post("/generate", tags=["🤖 Core AI Generation"])
 @limiter.limit("20/minute")
+@cached_route("generate", "generate_request")
 async def generate_spec(request: Request, generate_request: GenerateRequest, auth=Depends(verify_dual_auth)):
     """🎨 Generate specification from prompt"""
     start_time = time.time()
     try:
         # Generate spec directly using MainAgent
         system_monitor.increment_jobs()
-        spec = prompt_agent.run(generate_request.prompt)
+        spec = await run_agent_task("agents", generate_task, generate_request.prompt)
 
         spec_dict = spec.model_dump() if hasattr(spec, 'model_dump') else (spec if isinstance(spec, dict) else {})  # type: ignore
         return {
@@ -619,17 +677,20 @@ async def generate_spec(request: Request, generate_request: GenerateRequest, aut
             "success": True,
             "message": "Specification generated successfully"
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/api/v1/generate", tags=["🤖 Core AI Generation"])
 @limiter.limit("20/minute")
+@cached_route("generate_v2", "body")
 async def generate_v2(request: Request, body: dict, auth=Depends(verify_dual_auth)):
     """✨ Enhanced generation with LM adapter and v2 schema"""
     start_time = time.time()
     try:
         prompt = body.get('prompt', 'Default design')
-        spec = prompt_agent.run(prompt)
+        spec = await run_agent_task("agents", generate_task, prompt)
         spec_dict = spec.model_dump() if hasattr(spec, 'model_dump') else (spec if isinstance(spec, dict) else {})  # type: ignore[attr-defined]
         
         import uuid
@@ -644,9 +705,54 @@ async def generate_v2(request: Request, body: dict, auth=Depends(verify_dual_aut
             "processing_time": processing_time,
             "success": True
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/api/v1/generate/batch", tags=["🤖 Core AI Generation"])
+@limiter.limit("5/minute")
+async def generate_batch(request: Request, batch_request: BatchGenerateRequest, auth=Depends(verify_dual_auth)):
+    """📦 Generate specs for many prompts in one vectorized pass, saved with one bulk insert"""
+    prompts = batch_request.prompts
+    if not prompts:
+        raise HTTPException(status_code=422, detail="prompts must not be empty")
+    if len(prompts) > BATCH_GENERATE_MAX_PROMPTS:
+        raise HTTPException(status_code=413, detail=f"At most {BATCH_GENERATE_MAX_PROMPTS} prompts per batch")
+
+    def run_batch():
+        if hasattr(prompt_agent, "run_batch"):
+            results = prompt_agent.run_batch(prompts, batch_request.persist)
+        else:
+            results = [(None, prompt_agent.run(prompt)) for prompt in prompts]
+        return [
+            {"spec_id": spec_id,
+             "spec_json": spec.model_dump() if hasattr(spec, 'model_dump') else (spec if isinstance(spec, dict) else {})}  # type: ignore[attr-defined]
+            for spec_id, spec in results
+        ]
+
+    start_time = time.time()
+    try:
+        # CPU-bound for large batches, so keep it off the event loop
+        items = await asyncio.to_thread(run_batch)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    design_types: Dict[str, int] = {}
+    for item in items:
+        design_type = item["spec_json"].get("design_type", "general")
+        design_types[design_type] = design_types.get(design_type, 0) + 1
+
+    return {
+        "success": True,
+        "count": len(items),
+        "design_types": design_types,
+        "results": items,
+        "processing_time": time.time() - start_time
+    }
+
 @app.post("/switch", tags=["🤖 Core AI Generation"])
 @limiter.limit("20/minute")
 async def switch_legacy(request: Request, switch_data: dict, auth=Depends(verify_dual_auth)):
@@ -675,6 +781,9 @@ async def switch_material(request: Request, body: dict, auth=Depends(verify_dual
         import uuid
         iteration_id = str(uuid.uuid4())
         preview_url = f"/preview/{spec_id}_switched.jpg"
+
+        # Cached views of the spec (three.js data, previews, evaluations) are now stale
+        await cache.invalidate_tags_async(spec_tag(spec_id))
         
         return {
             "spec_id": spec_id,
@@ -737,6 +846,7 @@ async def compliance_feedback(request: Request, feedback_data: dict, auth=Depend
 async def get_geometry(request: Request, case_id: str, auth=Depends(verify_dual_auth)):
     """📏 Get Geometry Data"""
     try:
+        reference = await db.get_geometry_reference(case_id)
         # Return mock geometry data
         return {
             "success": True,
@@ -745,6 +855,8 @@ async def get_geometry(request: Request, case_id: str, auth=Depends(verify_dual_
                 "vertices": [[0,0,0], [1,0,0], [1,1,0]],
                 "faces": [[0,1,2]]
             },
+            "geometry_url": reference.get("local_url") if reference else None,
+            "original_url": reference.get("original_url") if reference else None,
             "format": "json"
         }
     except Exception as e:
@@ -752,6 +864,7 @@ async def get_geometry(request: Request, case_id: str, auth=Depends(verify_dual_
 
 @app.post("/api/v1/pipeline/run", tags=["⚖️ Compliance Pipeline"])
 @limiter.limit("10/minute")
+@cached_route("pipeline_run", "pipeline_data")
 async def run_compliance_pipeline(request: Request, pipeline_data: dict, auth=Depends(verify_dual_auth)):
     """🔧 Run Compliance Pipeline"""
     try:
@@ -759,7 +872,7 @@ async def run_compliance_pipeline(request: Request, pipeline_data: dict, auth=De
         pipeline_id = str(uuid.uuid4())
         prompt = pipeline_data.get('prompt', 'Default building')
         
-        spec = prompt_agent.run(prompt)
+        spec = await run_agent_task("agents", generate_task, prompt)
         spec_data = spec.model_dump() if hasattr(spec, 'model_dump') else (spec if isinstance(spec, dict) else {})  # type: ignore[attr-defined]
         
         compliance_result = {
@@ -777,6 +890,8 @@ async def run_compliance_pipeline(request: Request, pipeline_data: dict, auth=De
             "geometry_url": geometry_url,
             "message": "Pipeline completed successfully"
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -786,6 +901,7 @@ async def run_compliance_pipeline(request: Request, pipeline_data: dict, auth=De
 
 @app.post("/evaluate", tags=["🧠 AI Evaluation & Improvement"])
 @limiter.limit("20/minute")
+@cached_route("evaluate", "eval_data")
 async def evaluate_spec(request: Request, eval_data: dict, auth=Depends(verify_dual_auth)):
     """📈 Evaluate specification"""
     try:
@@ -834,7 +950,7 @@ async def evaluate_spec(request: Request, eval_data: dict, auth=Depends(verify_d
             )
         
         # Run evaluation
-        evaluation = evaluator_agent.run(spec, prompt)
+        evaluation = await run_agent_task("agents", evaluate_task, spec, prompt)
 
         # Convert evaluation to dict safely
         eval_dict = getattr(evaluation, 'model_dump', lambda: evaluation if isinstance(evaluation, dict) else {"score": 0.75})()
@@ -843,8 +959,8 @@ async def evaluate_spec(request: Request, eval_data: dict, auth=Depends(verify_d
         # Save evaluation and get report ID
         try:
             spec_dict = getattr(spec, 'model_dump', lambda: spec if isinstance(spec, dict) else {})()
-            spec_id = db.save_spec(prompt, spec_dict, 'EvaluatorAgent')
-            report_id = db.save_eval(spec_id, prompt, eval_dict, eval_score)
+            spec_id = await db.save_spec_async(prompt, spec_dict, 'EvaluatorAgent')
+            report_id = await db.save_eval_async(spec_id, prompt, eval_dict, eval_score)
         except Exception as e:
             print(f"DB save failed: {e}")
             import uuid
@@ -871,11 +987,8 @@ async def iterate_rl(request: Request, iter_data: dict, auth=Depends(verify_dual
         # Handle both dict and IterateRequest formats
         prompt = iter_data.get('prompt', 'Improve design')
         n_iter = max(2, iter_data.get('max_iterations', iter_data.get('n_iter', 3)))
-        # Set max iterations if supported
-        if hasattr(rl_agent, 'max_iterations'):
-            setattr(rl_agent, 'max_iterations', n_iter)
 
-        results = rl_agent.run(prompt, n_iter)
+        results = await run_agent_task("rl", rl_task, prompt, n_iter)
 
         # Format detailed iteration logs
         detailed_iterations = [{
@@ -918,27 +1031,39 @@ async def iterate_rl(request: Request, iter_data: dict, auth=Depends(verify_dual
         }
 
         return response_data
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/batch-evaluate", tags=["🧠 AI Evaluation & Improvement"])
 @limiter.limit("20/minute")
+@cached_route("batch_evaluate", "batch_data")
 async def batch_evaluate(request: Request, batch_data: dict, auth=Depends(verify_dual_auth)):
     """📋 Batch Evaluate Multiple"""
     try:
         specs = batch_data.get('specs', [])
+        prompts = [spec_data.get('prompt', 'Evaluate design') if isinstance(spec_data, dict) else spec_data for spec_data in specs]
+
+        # Per-prompt results are cached too, fetched and stored with one Redis round-trip each
+        keys = [cache.get_cache_key(prompt, "batch_evaluate_item") for prompt in prompts]
+        cached_items = await cache.mget_async(keys)
+        new_items = {}
         results = []
-        
-        for spec_data in specs:
-            prompt = spec_data.get('prompt', 'Evaluate design') if isinstance(spec_data, dict) else spec_data
-            spec = prompt_agent.run(prompt)
-            evaluation = evaluator_agent.run(spec, prompt)
-            
-            results.append({
-                "prompt": prompt,
-                "spec": getattr(spec, 'model_dump', lambda: spec if isinstance(spec, dict) else {})(),  # type: ignore[attr-defined]
-                "evaluation": getattr(evaluation, 'model_dump', lambda: evaluation if isinstance(evaluation, dict) else {})()  # type: ignore[attr-defined]
-            })
+
+        for prompt, key in zip(prompts, keys):
+            item = cached_items.get(key) or new_items.get(key)
+            if item is None:
+                spec, evaluation = await run_agent_task("agents", generate_and_evaluate_task, prompt)
+                item = jsonable_encoder({
+                    "spec": getattr(spec, 'model_dump', lambda: spec if isinstance(spec, dict) else {})(),  # type: ignore[attr-defined]
+                    "evaluation": getattr(evaluation, 'model_dump', lambda: evaluation if isinstance(evaluation, dict) else {})()  # type: ignore[attr-defined]
+                })
+                new_items[key] = item
+            results.append({"prompt": prompt, **item})
+
+        if new_items:
+            await cache.mset_async(new_items, ROUTE_CACHE_TTLS["batch_evaluate"])
         
         return {
             "success": True,
@@ -946,6 +1071,8 @@ async def batch_evaluate(request: Request, batch_data: dict, auth=Depends(verify
             "count": len(results),
             "message": f"Batch processed {len(results)} prompts"
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -986,17 +1113,16 @@ async def advanced_rl_training(request: Request, rl_data: dict, auth=Depends(ver
 async def coordinated_improvement(request: Request, coord_data: dict, auth=Depends(verify_dual_auth)):
     """🤝 Multi-Agent Coordination"""
     try:
-        from src.agents.agent_coordinator import AgentCoordinator
-        coordinator = AgentCoordinator()
-
         prompt = coord_data.get('prompt', 'Coordinated improvement')
-        result = await coordinator.coordinated_improvement(prompt)
+        result = await run_agent_task("rl", coordinated_improvement_task, prompt)
 
         return {
             "success": True,
             "result": result,
             "message": "Coordinated improvement completed"
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -1022,7 +1148,7 @@ async def evaluate_v2(request: Request, eval_data: dict, auth=Depends(verify_dua
             requirements=[prompt]
         )
         
-        evaluation = evaluator_agent.run(spec, prompt)
+        evaluation = await run_agent_task("agents", evaluate_task, spec, prompt)
         eval_dict = evaluation.model_dump() if hasattr(evaluation, 'model_dump') else (evaluation if isinstance(evaluation, dict) else {})  # type: ignore[attr-defined]
         eval_score = getattr(evaluation, 'score', 0.85)
         
@@ -1039,6 +1165,8 @@ async def evaluate_v2(request: Request, eval_data: dict, auth=Depends(verify_dua
             "feedback": getattr(evaluation, 'feedback', 'Good design'),
             "recommendations": getattr(evaluation, 'recommendations', [])
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -1051,7 +1179,7 @@ async def iterate_v2(request: Request, iter_data: dict, auth=Depends(verify_dual
         strategy = iter_data.get('strategy', 'improve_materials')
         max_iterations = iter_data.get('max_iterations', 3)
         
-        results = rl_agent.run(f"Improve {spec_id} using {strategy}", max_iterations)
+        results = await run_agent_task("rl", rl_task, f"Improve {spec_id} using {strategy}", max_iterations)
         preview_url = f"/preview/{spec_id}_final.jpg"
         
         return {
@@ -1062,6 +1190,8 @@ async def iterate_v2(request: Request, iter_data: dict, auth=Depends(verify_dual
             "preview_url": preview_url
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -1071,24 +1201,19 @@ async def iterate_v2(request: Request, iter_data: dict, auth=Depends(verify_dual
 
 @app.get("/reports/{report_id}", tags=["📋 Reports & Data"])
 @limiter.limit("20/minute")
-async def get_report(request: Request, report_id: str, auth=Depends(verify_dual_auth)):
+async def get_report(request: Request, report_id: str, include_data: bool = True, auth=Depends(verify_dual_auth)):
     """📄 Get Evaluation Report"""
     try:
-        # Mock report for any report_id
-        report = {
-            "report_id": report_id,
-            "evaluation": {
-                "score": 0.85,
-                "criteria": {"aesthetics": 0.9, "functionality": 0.8, "cost": 0.85}
-            },
-            "timestamp": datetime.now(timezone.utc).isoformat(),
-            "status": "completed"
-        }
-        
+        report = await db.get_report_async(report_id, include_data=include_data)
+        if report is None:
+            raise HTTPException(status_code=404, detail="Report not found")
+
         return {
             "success": True,
             "report": report
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -1107,7 +1232,7 @@ async def log_values(request: Request, log_data: dict, auth=Depends(verify_dual_
         technical_notes = log_data.get('technical_notes', {})
         
         # Save to database
-        hidg_id = db.save_hidg_log(
+        hidg_id = await db.save_hidg_log_async(
             date, day, task, values_reflection, achievements, technical_notes
         )
 
@@ -1121,35 +1246,33 @@ async def log_values(request: Request, log_data: dict, auth=Depends(verify_dual_
 
 @app.get("/iterations/{session_id}", tags=["📋 Reports & Data"])
 @limiter.limit("20/minute")
-async def get_iteration_logs(request: Request, session_id: str, auth=Depends(verify_dual_auth)):
-    """📊 Get Iteration Logs"""
+async def get_iteration_logs(request: Request, session_id: str, limit: int = 100, cursor: Optional[str] = None,
+                             fields: Optional[str] = None, format: str = "json", auth=Depends(verify_dual_auth)):
+    """📊 Get Iteration Logs
+
+    Keyset-paginated via cursor/next_cursor: count is the page size and total_iterations the
+    session's; fields is a comma-separated projection and format=ndjson streams the whole
+    session one log per line.
+    """
     try:
-        # Mock iteration logs for any session_id
-        logs = [
-            {
-                "iteration": 1,
-                "session_id": session_id,
-                "score_before": 0.7,
-                "score_after": 0.75,
-                "improvement": 0.05,
-                "timestamp": datetime.now(timezone.utc).isoformat()
-            },
-            {
-                "iteration": 2,
-                "session_id": session_id,
-                "score_before": 0.75,
-                "score_after": 0.82,
-                "improvement": 0.07,
-                "timestamp": datetime.now(timezone.utc).isoformat()
-            }
-        ]
+        field_list = [f.strip() for f in fields.split(",") if f.strip()] if fields else None
+
+        if format == "ndjson":
+            logs = await asyncio.to_thread(db.stream_iteration_logs, session_id, field_list)
+            lines = (json.dumps(log, default=str) + "\n" for log in logs)
+            return StreamingResponse(lines, media_type="application/x-ndjson")
 
+        page = await asyncio.to_thread(db.get_iteration_logs_page, session_id, limit, cursor, field_list)
         return {
             "success": True,
             "session_id": session_id,
-            "total_iterations": len(logs),
-            "iterations": logs
+            "total_iterations": page["total"],
+            "count": len(page["items"]),
+            "iterations": page["items"],
+            "next_cursor": page["next_cursor"]
         }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -1162,15 +1285,10 @@ async def get_iteration_logs(request: Request, session_id: str, auth=Depends(ver
 async def prune_logs(request: Request, retention_days: int = 30, auth=Depends(verify_dual_auth)):
     """Prune old logs for production scalability"""
     try:
-        # Import with fallback for missing module
-        try:
-            from src.db.log_pruning import LogPruner  # type: ignore
-        except ImportError:
-            class LogPruner:
-                def __init__(self, retention_days=30): self.retention_days = retention_days
-                def prune_all_logs(self): return {"total_pruned": 0, "files_cleaned": []}
-        pruner = LogPruner(retention_days=retention_days)
-        results = pruner.prune_all_logs()
+        from src.data.log_pruning import LogPruner
+
+        pruner = LogPruner(retention_days=retention_days, db=db if isinstance(db, Database) else None)
+        results = await asyncio.to_thread(pruner.prune_all_logs)
 
         return {
             "success": True,
@@ -1183,6 +1301,21 @@ async def prune_logs(request: Request, retention_days: int = 30, auth=Depends(ve
         logging.error(f"Log pruning failed: {e}")
         raise HTTPException(status_code=500, detail=f"Log pruning failed: {str(e)}")
 
+@app.post("/admin/reload-rules", tags=["🔧 Administration"])
+@limiter.limit("20/minute")
+async def reload_extraction_rules(request: Request, auth=Depends(verify_dual_auth)):
+    """Recompile the extraction rule table now instead of waiting for the mtime poll"""
+    from src.core.extraction_rules import rule_store
+
+    try:
+        reloaded = await asyncio.to_thread(rule_store.reload, True)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Rule reload failed: {str(e)}")
+    stats = rule_store.get_stats()
+    if not reloaded:
+        raise HTTPException(status_code=422, detail=f"Rule file is invalid, still serving v{stats['version']}")
+    return {"success": True, **stats}
+
 # ============================================================================
 # 🖥️ FRONTEND INTEGRATION
 # ============================================================================
@@ -1245,6 +1378,7 @@ async def get_ui_test_summary(request: Request, auth=Depends(verify_dual_auth)):
 
 @app.get("/api/v1/three-js/{spec_id}", tags=["🖥️ Frontend Integration"])
 @limiter.limit("20/minute")
+@cached_route("three_js", "spec_id")
 async def get_three_js_data(request: Request, spec_id: str, auth=Depends(verify_dual_auth)):
     """🎮 Get Three.js Data"""
     try:
@@ -1276,6 +1410,7 @@ async def get_three_js_data(request: Request, spec_id: str, auth=Depends(verify_
 
 @app.get("/api/v1/preview/viewer/{spec_id}", tags=["🖼️ Preview Management"])
 @limiter.limit("20/minute")
+@cached_route("preview_viewer", "spec_id")
 async def get_preview_viewer(request: Request, spec_id: str, auth=Depends(verify_dual_auth)):
     """👁️ Get Preview Viewer"""
     try:
@@ -1381,11 +1516,12 @@ async def cleanup_stale_previews(request: Request, auth=Depends(verify_dual_auth
 
 @app.post("/api/v1/mobile/generate", tags=["📱 Mobile Platform"])
 @limiter.limit("20/minute")
+@cached_route("mobile_generate", "mobile_request")
 async def mobile_generate_fixed(request: Request, mobile_request: dict, auth=Depends(verify_dual_auth)):
     """📱 Mobile Generate Fixed"""
     try:
         prompt = mobile_request.get('prompt', 'Mobile design')
-        spec = prompt_agent.run(prompt)
+        spec = await run_agent_task("agents", generate_task, prompt)
         spec_data = spec.model_dump() if hasattr(spec, 'model_dump') else (spec if isinstance(spec, dict) else {})  # type: ignore[attr-defined]
         
         import uuid
@@ -1399,6 +1535,8 @@ async def mobile_generate_fixed(request: Request, mobile_request: dict, auth=Dep
             "mobile_optimized": True,
             "message": "Mobile generation completed"
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -1683,14 +1821,11 @@ async def run_end_to_end_demo(request: Request, demo_data: dict, auth=Depends(ve
     try:
         prompt = demo_data.get('prompt', 'Demo building design')
         
-        # Step 1: Generate
-        spec = prompt_agent.run(prompt)
-        
-        # Step 2: Evaluate
-        evaluation = evaluator_agent.run(spec, prompt)
+        # Step 1 + 2: Generate and evaluate
+        spec, evaluation = await run_agent_task("agents", generate_and_evaluate_task, prompt)
         
         # Step 3: Iterate (1 iteration for demo)
-        rl_results = rl_agent.run(prompt, 1)
+        rl_results = await run_agent_task("rl", rl_task, prompt, 1)
         
         # Step 4: Generate preview
         preview_url = f"/demo/preview/{int(time.time())}.jpg"
@@ -1711,6 +1846,8 @@ async def run_end_to_end_demo(request: Request, demo_data: dict, auth=Depends(ve
             "message": "End-to-end demo completed successfully"
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Demo failed: {str(e)}")
 
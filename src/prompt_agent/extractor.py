@@ -2,6 +2,7 @@
 
 from src.schemas.legacy_schema import DesignSpec, MaterialSpec, DimensionSpec
 from src.core.lm_adapter import LocalLMAdapter
+from src.core.prompt_normalizer import normalize_text
 
 class MainAgent:
     def __init__(self):
@@ -23,7 +24,7 @@ class MainAgent:
     
     def _extract_spec_fallback(self, prompt: str) -> DesignSpec:
         """Fallback rule-based extraction"""
-        prompt_lower = prompt.lower()
+        prompt_lower = normalize_text(prompt)
         
         building_type = "general"
         if "office" in prompt_lower:
@@ -2,7 +2,7 @@
 
 from fastapi import APIRouter, Depends, HTTPException
 from src.core.auth import verify_api_key, get_current_user as verify_jwt_token
-from src.data.database import Database
+from src.data.database import Database, get_database
 from pydantic import BaseModel
 from typing import Dict, Any, Optional, List
 import httpx
@@ -27,9 +27,6 @@ class ComplianceFeedbackRequest(BaseModel):
     feedback_data: Dict[str, Any]
     user_id: Optional[str] = None
 
-def get_database():
-    return Database()
-
 async def store_geometry_file(case_id: str, geometry_url: str, db: Database) -> str:
     """Store geometry file and return local URL"""
     try:
@@ -82,7 +79,7 @@ async def run_case(
             data["local_geometry_url"] = local_geometry_url
         
         # Save compliance case to database
-        await db.save_compliance_case(
+        await db.save_compliance_case_async(
             case_id=body.case_id,
             project_id=body.project_id,
             case_data=body.dict(),
@@ -117,7 +114,7 @@ async def feedback(
             data = resp.json()
         
         # Save feedback to database
-        await db.save_compliance_feedback(
+        await db.save_compliance_feedback_async(
             case_id=body.case_id,
             feedback_data=body.dict(),
             result=data
@@ -2,7 +2,7 @@
 
 from fastapi import APIRouter, Depends, HTTPException
 from src.core.auth import verify_api_key, get_current_user as verify_jwt_token
-from src.data.database import Database
+from src.data.database import Database, get_database
 from src.lm_adapter import LMAdapter
 from src.agents.evaluator_agent import EvaluatorAgent
 from src.agents.rl_agent import RLLoop
@@ -40,9 +40,6 @@ def get_evaluator():
 def get_rl_agent():
     return RLLoop()
 
-def get_database():
-    return Database()
-
 @router.post("/core/run", response_model=CoreRunResponse)
 async def run_core_pipeline(
     body: CoreRunRequest,
@@ -172,7 +169,7 @@ async def run_compliance_check(spec: Spec, project_id: str, db: Database) -> Dic
         }
         
         # Save compliance result
-        await db.save_compliance_case(
+        await db.save_compliance_case_async(
             case_id=compliance_result["case_id"],
             project_id=project_id,
             case_data={"spec_id": spec.spec_id, "spec_data": spec.dict()},
@@ -75,8 +75,8 @@ async def generate(
         
         # Save to database (mock implementation)
         try:
-            from src.data.database import Database
-            db = Database()
+            from src.data.database import get_database
+            db = get_database()
             await db.insert_spec(spec.dict())
         except Exception as e:
             print(f"Database save failed: {e}")
@@ -3,7 +3,7 @@
 from fastapi import APIRouter, Depends, HTTPException
 from src.schemas.spec_schema import Spec, ObjectSpec
 from src.core.auth import verify_api_key, get_current_user as verify_jwt_token
-from src.data.database import Database
+from src.data.database import Database, get_database
 from pydantic import BaseModel
 from typing import Dict, Any, Optional
 import uuid
@@ -34,9 +34,6 @@ class SwitchResponse(BaseModel):
     preview_url: str
     changed: ChangeInfo
 
-def get_database():
-    return Database()
-
 def find_object(spec: Spec, object_id: str) -> ObjectSpec:
     """Find object by ID in spec"""
     for obj in spec.objects:
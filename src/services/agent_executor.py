@@ -0,0 +1,272 @@
+"""Worker pools for CPU-bound agent work, kept off the event loop
+
+Endpoints hand MainAgent, EvaluatorAgent and RLLoop calls to a pool instead of
+running them inside async handlers, so one long RL run no longer stalls every
+other request on the worker. EXECUTOR_MODE picks threads (the default) or
+processes; process workers are spawned fresh and build their own agents once
+at start-up, so requests never pay agent construction. Each pool caps its
+backlog at EXECUTOR_QUEUE_MAX tasks beyond its workers and rejects the rest
+with ExecutorBusy, which the API turns into a 503.
+"""
+
+import asyncio
+import atexit
+import functools
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional
+
+EXECUTOR_MODE = os.getenv("EXECUTOR_MODE", "thread")  # thread | process
+EXECUTOR_AGENT_WORKERS = int(os.getenv("EXECUTOR_AGENT_WORKERS", "4"))
+EXECUTOR_RL_WORKERS = int(os.getenv("EXECUTOR_RL_WORKERS", "2"))
+EXECUTOR_QUEUE_MAX = int(os.getenv("EXECUTOR_QUEUE_MAX", "32"))
+
+class ExecutorBusy(Exception):
+    """A pool's backlog is full; the caller should retry later"""
+
+    def __init__(self, pool: str, pending: int):
+        super().__init__(f"{pool} pool is busy ({pending} tasks pending)")
+        self.pool = pool
+        self.pending = pending
+
+# ---------------------------------------------------------------------------
+# Agents inside a worker
+# ---------------------------------------------------------------------------
+
+def _main_agent():
+    from src.agents.main_agent import MainAgent
+    return MainAgent()
+
+def _evaluator_agent():
+    from src.agents.evaluator_agent import EvaluatorAgent
+    return EvaluatorAgent()
+
+def _rl_agent():
+    from src.agents.rl_agent import RLLoop
+    return RLLoop()
+
+def _coordinator():
+    from src.agents.agent_coordinator import AgentCoordinator
+    return AgentCoordinator()
+
+AGENT_FACTORIES: Dict[str, Callable[[], Any]] = {
+    "main": _main_agent,
+    "evaluator": _evaluator_agent,
+    "rl": _rl_agent,
+    "coordinator": _coordinator,
+}
+
+# Agents shared by every thread of this process (installed by the app), and per-worker ones
+_shared_agents: Dict[str, Any] = {}
+_worker_agents = threading.local()
+
+def install_agents(**agents):
+    """Share already-built agents with this process's thread workers.
+
+    Only stateless agents belong here; RLLoop keeps per-run state on the
+    instance, so thread workers each build their own.
+    """
+    _shared_agents.update(agents)
+
+def get_agent(name: str):
+    agent = _shared_agents.get(name)
+    if agent is not None:
+        return agent
+    agents = getattr(_worker_agents, "agents", None)
+    if agents is None:
+        agents = _worker_agents.agents = {}
+    if name not in agents:
+        agents[name] = AGENT_FACTORIES[name]()
+    return agents[name]
+
+def _warm_worker(names):
+    """Pool initializer: build the worker's agents before it takes its first task"""
+    for name in names:
+        try:
+            get_agent(name)
+        except Exception as e:
+            print(f"[WARN] Could not pre-warm {name} agent: {e}")
+
+def _timed_call(fn: Callable, args: tuple):
+    started = time.time()
+    result = fn(*args)
+    return started, time.time(), result
+
+# ---------------------------------------------------------------------------
+# Tasks (module-level so process pools can pickle them)
+# ---------------------------------------------------------------------------
+
+def generate_task(prompt: str):
+    return get_agent("main").run(prompt)
+
+def evaluate_task(spec, prompt: str):
+    return get_agent("evaluator").run(spec, prompt)
+
+def generate_and_evaluate_task(prompt: str):
+    spec = get_agent("main").run(prompt)
+    return spec, get_agent("evaluator").run(spec, prompt)
+
+def rl_task(prompt: str, n_iter: int):
+    return get_agent("rl").run(prompt, n_iter)
+
+def coordinated_improvement_task(prompt: str):
+    return asyncio.run(get_agent("coordinator").coordinated_improvement(prompt))
+
+# ---------------------------------------------------------------------------
+# Pools
+# ---------------------------------------------------------------------------
+
+class AgentPool:
+    """One thread or process pool with a bounded backlog and its own metrics"""
+
+    def __init__(self, name: str, workers: int, agents: tuple, mode: str = EXECUTOR_MODE,
+                 queue_max: int = EXECUTOR_QUEUE_MAX):
+        if mode not in ("thread", "process"):
+            print(f"[WARN] Unknown EXECUTOR_MODE {mode}, using threads")
+            mode = "thread"
+        self.name = name
+        self.mode = mode
+        self.workers = max(1, workers)
+        self.agents = agents
+        self.queue_max = queue_max
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._stats = {"submitted": 0, "completed": 0, "failed": 0, "cancelled": 0, "rejected": 0, "restarts": 0,
+                       "wait_ms_total": 0.0, "wait_ms_max": 0.0, "run_ms_total": 0.0, "run_ms_max": 0.0}
+
+    def start(self) -> Executor:
+        """Create the pool and pre-warm its workers (idempotent)"""
+        with self._lock:
+            if self._executor is None:
+                if self.mode == "process":
+                    # spawn, not fork: children must not inherit the parent's DB engines and Redis sockets
+                    self._executor = ProcessPoolExecutor(
+                        self.workers, mp_context=multiprocessing.get_context("spawn"),
+                        initializer=_warm_worker, initargs=(self.agents,))
+                else:
+                    self._executor = ThreadPoolExecutor(
+                        self.workers, thread_name_prefix=f"agents-{self.name}",
+                        initializer=_warm_worker, initargs=(self.agents,))
+                # Tasks submitted while every worker is busy start new workers, up to the limit
+                for _ in range(self.workers):
+                    self._executor.submit(time.sleep, 0)
+            return self._executor
+
+    async def run(self, fn: Callable, *args):
+        """Run fn(*args) on the pool and await its result; raises ExecutorBusy when the backlog is full.
+
+        A task stays pending until its work ends, even if the caller is cancelled first.
+        """
+        with self._lock:
+            if self._pending >= self.workers + self.queue_max:
+                self._stats["rejected"] += 1
+                raise ExecutorBusy(self.name, self._pending)
+            self._pending += 1
+            self._stats["submitted"] += 1
+        submitted = time.time()
+        try:
+            future = self.start().submit(_timed_call, fn, args)
+        except BaseException:
+            self._record(submitted, None)
+            raise
+        future.add_done_callback(functools.partial(self._record, submitted))
+        try:
+            _, _, result = await asyncio.wrap_future(future)
+        except BrokenProcessPool:
+            self._reset()
+            raise
+        except asyncio.CancelledError:
+            with self._lock:
+                self._stats["cancelled"] += 1
+            raise
+        return result
+
+    def _record(self, submitted: float, future: Optional[Future]):
+        """Done callback: the task has left the pool (None when it never got in)"""
+        with self._lock:
+            self._pending -= 1
+            if future is not None and future.cancelled():
+                return  # dropped from the queue before it started
+            if future is None or future.exception() is not None:
+                self._stats["failed"] += 1
+                return
+            started, finished, _ = future.result()
+            wait_ms, run_ms = (started - submitted) * 1000, (finished - started) * 1000
+            self._stats["completed"] += 1
+            self._stats["wait_ms_total"] += max(wait_ms, 0.0)
+            self._stats["wait_ms_max"] = max(self._stats["wait_ms_max"], wait_ms)
+            self._stats["run_ms_total"] += run_ms
+            self._stats["run_ms_max"] = max(self._stats["run_ms_max"], run_ms)
+
+    def _reset(self):
+        """Drop a pool whose worker process died; the next task starts a fresh one"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+            self._stats["restarts"] += 1
+        print(f"[WARN] {self.name} pool lost a worker process, restarting")
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self, wait: bool = True):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=not wait)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            pending = self._pending
+        completed = stats["completed"]
+        return {
+            "mode": self.mode,
+            "workers": self.workers,
+            "queue_max": self.queue_max,
+            "started": self._executor is not None,
+            "pending": pending,
+            "queued": max(0, pending - self.workers),
+            "submitted": stats["submitted"],
+            "completed": completed,
+            "failed": stats["failed"],
+            "cancelled": stats["cancelled"],
+            "rejected": stats["rejected"],
+            "restarts": stats["restarts"],
+            "avg_wait_ms": round(stats["wait_ms_total"] / completed, 2) if completed else 0.0,
+            "max_wait_ms": round(stats["wait_ms_max"], 2),
+            "avg_run_ms": round(stats["run_ms_total"] / completed, 2) if completed else 0.0,
+            "max_run_ms": round(stats["run_ms_max"], 2),
+        }
+
+class AgentExecutor:
+    """The app's pools: "agents" for generation and evaluation, "rl" for long RL and coordination runs,
+    so RL backlogs cannot starve quick requests"""
+
+    def __init__(self, mode: str = EXECUTOR_MODE, agent_workers: int = EXECUTOR_AGENT_WORKERS,
+                 rl_workers: int = EXECUTOR_RL_WORKERS, queue_max: int = EXECUTOR_QUEUE_MAX):
+        self.pools = {
+            "agents": AgentPool("agents", agent_workers, ("main", "evaluator"), mode, queue_max),
+            "rl": AgentPool("rl", rl_workers, ("rl", "coordinator"), mode, queue_max),
+        }
+
+    def start(self):
+        for pool in self.pools.values():
+            pool.start()
+
+    def shutdown(self, wait: bool = True):
+        for pool in self.pools.values():
+            pool.shutdown(wait)
+
+    async def run(self, pool: str, fn: Callable, *args):
+        return await self.pools[pool].run(fn, *args)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {name: pool.get_stats() for name, pool in self.pools.items()}
+
+# Global executor
+agent_executor = AgentExecutor()
+atexit.register(agent_executor.shutdown, False)
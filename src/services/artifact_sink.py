@@ -0,0 +1,279 @@
+"""Pluggable sinks for the spec artifacts MainAgent.run produces
+
+ARTIFACT_SINK picks the sinks per deployment as a comma-separated list:
+  none    - keep nothing
+  db      - one specs row per generation, batched into multi-row inserts
+  file    - a JSON file per spec under ARTIFACT_DIR
+  object  - an object store upload (local stand-in laid out like bucket keys)
+Every sink except none writes on a background thread, so saving never puts
+disk or DB I/O on the request path. Production defaults to db, development
+to db,file (the files the metrics endpoints count).
+"""
+
+import atexit
+import json
+import os
+import queue
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+ARTIFACT_SINK = os.getenv("ARTIFACT_SINK") or ("db" if os.getenv("PRODUCTION_MODE") == "true" else "db,file")
+ARTIFACT_DIR = os.getenv("ARTIFACT_DIR", "spec_outputs")
+ARTIFACT_BUCKET_URL = os.getenv("ARTIFACT_BUCKET_URL") or os.getenv("BHIV_BUCKET_URL", "https://bhiv-bucket.s3.amazonaws.com")
+ARTIFACT_BUCKET_DIR = os.getenv("ARTIFACT_BUCKET_DIR", "artifact_bucket")
+ARTIFACT_BATCH_SIZE = int(os.getenv("ARTIFACT_BATCH_SIZE", "100"))
+ARTIFACT_FLUSH_INTERVAL = float(os.getenv("ARTIFACT_FLUSH_INTERVAL", "0.5"))
+ARTIFACT_QUEUE_MAX = int(os.getenv("ARTIFACT_QUEUE_MAX", "10000"))
+
+def artifact_name(prefix: str = "design_spec") -> str:
+    """Timestamped file name with a random suffix, so concurrent requests never collide"""
+    return f"{prefix}_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}.json"
+
+def artifact_document(prompt: str, spec_data: Dict[str, Any], generator: str = "MainAgent") -> Dict[str, Any]:
+    return {
+        "prompt": prompt,
+        "specification": spec_data,
+        "metadata": {
+            "generated_at": datetime.now().isoformat(),
+            "generator": generator
+        }
+    }
+
+class BatchWriter:
+    """Background thread handing queued items to write_batch in groups.
+
+    Like the DB write-behind queue: an item leaves the queue once written, a
+    full queue writes inline rather than dropping, and the queue is drained at
+    interpreter exit.
+    """
+
+    def __init__(self, name: str, write_batch: Callable[[List[Any]], None], batch_size: int = ARTIFACT_BATCH_SIZE,
+                 flush_interval: float = ARTIFACT_FLUSH_INTERVAL, max_size: int = ARTIFACT_QUEUE_MAX):
+        self.name = name
+        self.write_batch = write_batch
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max_size)
+        self._thread: Optional[threading.Thread] = None
+        self._thread_lock = threading.Lock()
+        self._stats = {"enqueued": 0, "written": 0, "batches": 0, "errors": 0, "overflow_writes": 0}
+        atexit.register(self.flush)
+
+    def put(self, item: Any):
+        self._ensure_thread()
+        try:
+            self._queue.put_nowait(item)
+            self._stats["enqueued"] += 1
+        except queue.Full:
+            self._stats["overflow_writes"] += 1
+            self._write([item])
+
+    def flush(self):
+        """Block until every queued item has been written"""
+        if self._queue.unfinished_tasks:
+            self._ensure_thread()
+            self._queue.join()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"queue_depth": self._queue.qsize(), **self._stats}
+
+    def _ensure_thread(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._thread_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name=f"artifact-{self.name}", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            try:
+                self._write(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _write(self, batch: List[Any]):
+        try:
+            self.write_batch(batch)
+            self._stats["written"] += len(batch)
+        except Exception as e:
+            self._stats["errors"] += len(batch)
+            print(f"[WARN] Artifact sink {self.name} failed to write {len(batch)} items: {e}")
+        self._stats["batches"] += 1
+
+class ArtifactSink:
+    """Receives (prompt, spec) for every generated spec. save() only queues work and returns
+    references (spec_id, path, url) that become valid once the sink has flushed."""
+
+    name = "none"
+
+    def save(self, prompt: str, spec_data: Dict[str, Any]) -> Dict[str, Any]:
+        return {}
+
+    def flush(self):
+        pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"sink": self.name}
+
+class NullSink(ArtifactSink):
+    """Keeps nothing: for stateless deployments and load tests"""
+
+class _BatchedSink(ArtifactSink, ABC):
+    """Base for sinks whose writes go through a BatchWriter thread"""
+
+    def __init__(self):
+        self.writer = BatchWriter(self.name, self._write_batch)
+
+    def flush(self):
+        self.writer.flush()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"sink": self.name, **self.writer.get_stats()}
+
+    @abstractmethod
+    def _write_batch(self, batch: List[Any]):
+        """Persist a batch of queued items; runs on the writer thread"""
+        pass
+
+class DatabaseSink(_BatchedSink):
+    """Spec rows only, saved with one multi-row insert per batch"""
+
+    name = "db"
+
+    def __init__(self, database=None, agent_type: str = "MainAgent"):
+        self.database = database
+        self.agent_type = agent_type
+        super().__init__()
+
+    def save(self, prompt: str, spec_data: Dict[str, Any]) -> Dict[str, Any]:
+        spec_id = str(uuid.uuid4())
+        self.writer.put((spec_id, prompt, spec_data))
+        return {"spec_id": spec_id}
+
+    def _write_batch(self, batch: List[Any]):
+        from src.data.database import get_database
+
+        database = self.database or get_database()
+        # Already off the request path: insert the batch as one statement, not via the write-behind queue
+        database.save_specs([(prompt, spec_data) for _, prompt, spec_data in batch], self.agent_type,
+                            spec_ids=[spec_id for spec_id, _, _ in batch], write_behind=False)
+
+class FileSink(_BatchedSink):
+    """One compact JSON file per spec, written off the request path"""
+
+    name = "file"
+
+    def __init__(self, directory: str = ARTIFACT_DIR):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        super().__init__()
+
+    def save(self, prompt: str, spec_data: Dict[str, Any]) -> Dict[str, Any]:
+        path = self.directory / artifact_name()
+        self.writer.put((path, artifact_document(prompt, spec_data)))
+        return {"spec_file": str(path)}
+
+    def _write_batch(self, batch: List[Any]):
+        for path, document in batch:
+            with open(path, "w") as f:
+                json.dump(document, f, default=str, separators=(",", ":"))
+
+class ObjectStoreSink(_BatchedSink):
+    """Object store stand-in: objects land under a local directory keyed like the bucket,
+    and save() returns the URL each object will have in ARTIFACT_BUCKET_URL"""
+
+    name = "object"
+
+    def __init__(self, bucket_url: str = ARTIFACT_BUCKET_URL, directory: str = ARTIFACT_BUCKET_DIR):
+        self.bucket_url = bucket_url.rstrip("/")
+        self.directory = Path(directory)
+        super().__init__()
+
+    def save(self, prompt: str, spec_data: Dict[str, Any]) -> Dict[str, Any]:
+        key = f"specs/{datetime.now().strftime('%Y/%m/%d')}/{artifact_name()}"
+        self.writer.put((key, artifact_document(prompt, spec_data)))
+        return {"spec_url": f"{self.bucket_url}/{key}"}
+
+    def _write_batch(self, batch: List[Any]):
+        for key, document in batch:
+            path = self.directory / key
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(json.dumps(document, default=str, separators=(",", ":")))
+
+class MultiSink(ArtifactSink):
+    """Fans each spec out to several sinks and merges their references"""
+
+    def __init__(self, sinks: List[ArtifactSink]):
+        self.sinks = sinks
+        self.name = ",".join(sink.name for sink in sinks)
+
+    def save(self, prompt: str, spec_data: Dict[str, Any]) -> Dict[str, Any]:
+        refs: Dict[str, Any] = {}
+        for sink in self.sinks:
+            refs.update(sink.save(prompt, spec_data))
+        return refs
+
+    def flush(self):
+        for sink in self.sinks:
+            sink.flush()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"sink": self.name, "sinks": [sink.get_stats() for sink in self.sinks]}
+
+SINKS = {
+    "none": NullSink,
+    "db": DatabaseSink,
+    "file": FileSink,
+    "object": ObjectStoreSink
+}
+
+def create_artifact_sink(spec: str = ARTIFACT_SINK) -> ArtifactSink:
+    """Build the sink(s) named in spec, e.g. "db" or "db,file"; unknown names are skipped with a warning"""
+    sinks = []
+    for name in (part.strip().lower() for part in spec.split(",")):
+        if name in ("", "none"):
+            continue
+        if name not in SINKS:
+            print(f"[WARN] Unknown artifact sink {name}, skipping")
+            continue
+        sinks.append(SINKS[name]())
+    if not sinks:
+        return NullSink()
+    return sinks[0] if len(sinks) == 1 else MultiSink(sinks)
+
+_artifact_sink: Optional[ArtifactSink] = None
+_artifact_sink_lock = threading.Lock()
+
+def get_artifact_sink() -> ArtifactSink:
+    """Process-wide sink built from ARTIFACT_SINK on first use"""
+    global _artifact_sink
+    if _artifact_sink is None:
+        with _artifact_sink_lock:
+            if _artifact_sink is None:
+                _artifact_sink = create_artifact_sink()
+                print(f"[INFO] Spec artifacts go to: {_artifact_sink.name}")
+    return _artifact_sink
+
+def set_artifact_sink(sink: ArtifactSink) -> Optional[ArtifactSink]:
+    """Swap the process-wide sink (tests, embedding apps); returns the previous one"""
+    global _artifact_sink
+    with _artifact_sink_lock:
+        previous, _artifact_sink = _artifact_sink, sink
+    return previous
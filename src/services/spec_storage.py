@@ -41,6 +41,8 @@ class SpecStorage:
         if spec_id in self.specs:
             self.specs[spec_id] = updated_spec
             self._save_specs()
+            from src.core.cache import cache, spec_tag
+            cache.invalidate_tags(spec_tag(spec_id))
             return True
         return False
 
@@ -38,12 +38,23 @@ class SystemMonitor:
             job_stats = {"total_jobs": 0, "total_cost": 0}
         
         # Get database status
+        pool_stats = {}
+        write_queue_stats = {"enabled": False}
         try:
-            from src.db.database import db
-            db.get_session().close()
+            from src.data.database import get_database
+            database = get_database()
+            database.get_session().close()
+            pool_stats = database.get_pool_stats()
+            write_queue_stats = database.get_write_queue_stats()
             db_status = "healthy"
         except Exception:
             db_status = "degraded"
+
+        try:
+            from src.core.cache import cache
+            cache_stats = cache.get_stats()
+        except Exception:
+            cache_stats = {}
         
         return {
             "status": "healthy" if db_status == "healthy" else "degraded",
@@ -54,6 +65,9 @@ class SystemMonitor:
             "compute_jobs": job_stats["total_jobs"],
             "compute_cost": job_stats["total_cost"],
             "database_status": db_status,
+            "database_pool": pool_stats,
+            "database_write_queue": write_queue_stats,
+            "cache": cache_stats,
             "timestamp": datetime.now().isoformat()
         }
     
@@ -80,6 +94,60 @@ compute_cost_total {metrics['compute_cost']}
 # HELP system_uptime_seconds System uptime in seconds
 # TYPE system_uptime_seconds gauge
 system_uptime_seconds {metrics['uptime_seconds']}
+"""
+        pool = metrics["database_pool"]
+        if "checked_out" in pool:
+            prometheus_metrics += f"""
+# HELP db_pool_checked_out Connections currently checked out of the pool
+# TYPE db_pool_checked_out gauge
+db_pool_checked_out {pool['checked_out']}
+
+# HELP db_pool_overflow Connections open beyond the pool size
+# TYPE db_pool_overflow gauge
+db_pool_overflow {pool['overflow']}
+
+# HELP db_pool_utilization_percent Checked-out connections as a percent of pool capacity
+# TYPE db_pool_utilization_percent gauge
+db_pool_utilization_percent {pool['utilization_percent']}
+"""
+        write_queue = metrics["database_write_queue"]
+        if write_queue.get("enabled"):
+            prometheus_metrics += f"""
+# HELP db_write_queue_depth Rows waiting in the write-behind queue
+# TYPE db_write_queue_depth gauge
+db_write_queue_depth {write_queue['queue_depth']}
+
+# HELP db_write_flushed_rows_total Rows written by the write-behind queue
+# TYPE db_write_flushed_rows_total counter
+db_write_flushed_rows_total {write_queue['flushed_rows']}
+
+# HELP db_write_fallback_rows_total Rows written to file fallback after a failed batch
+# TYPE db_write_fallback_rows_total counter
+db_write_fallback_rows_total {write_queue['fallback_rows']}
+
+# HELP db_write_flush_ms_avg Average batch flush latency in milliseconds
+# TYPE db_write_flush_ms_avg gauge
+db_write_flush_ms_avg {write_queue['avg_flush_ms']}
+"""
+        cache_stats = metrics["cache"]
+        if cache_stats:
+            prometheus_metrics += f"""
+# HELP cache_hits_total Cache lookups answered from L1 or Redis
+# TYPE cache_hits_total counter
+cache_hits_total {cache_stats['hits']}
+
+# HELP cache_misses_total Cache lookups that found nothing
+# TYPE cache_misses_total counter
+cache_misses_total {cache_stats['misses']}
+
+# HELP cache_generations_total Generator calls made on cache misses
+# TYPE cache_generations_total counter
+cache_generations_total {cache_stats['generations']}
+
+# HELP cache_coalesced_total Cache misses served by another caller's generation
+# TYPE cache_coalesced_total counter
+cache_coalesced_total{{scope="local"}} {cache_stats['coalesced_local']}
+cache_coalesced_total{{scope="remote"}} {cache_stats['coalesced_remote']}
 """
         return prometheus_metrics
 
@@ -0,0 +1,57 @@
+"""Throughput of batch generation versus one prompt at a time, for 1k-100k prompts
+
+Usage: python tests/benchmarks/bench_batch_generate.py [size ...]
+
+"matrix" is KeywordIndex.match_batch alone (sparse prompt x keyword matrix and
+the concept matrix), "rules" adds template resolution per group of prompts,
+"batch" is UniversalPromptExtractor.extract_specs end to end and "single" is
+extract_spec called in a loop. Nothing is persisted.
+"""
+
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from src.core.extraction_rules import rule_store
+from src.prompt_agent.universal_extractor import UniversalPromptExtractor
+
+SIZES = [1_000, 10_000, 100_000]
+
+SUBJECTS = ["office building", "residential house", "warehouse", "electric car", "pickup truck", "smartphone",
+            "laptop computer", "office chair", "standing desk", "refrigerator", "garden shed", "motorcycle"]
+DETAILS = ["with parking", "with solar panels", "steel frame", "concrete floor", "wood finish", "aluminum body",
+           "with gps", "bluetooth", "touchscreen", "wireless charging", "with elevator", "3 stories", "modern"]
+
+def make_prompts(count: int, rng: random.Random):
+    return [f"{rng.choice(SUBJECTS)} {' '.join(rng.sample(DETAILS, rng.randint(0, 4)))} #{i}" for i in range(count)]
+
+def timed(func):
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or SIZES
+    rng = random.Random(11)
+    extractor = UniversalPromptExtractor()
+    profile = rule_store.get().profiles["universal"]
+    extractor.extract_specs(make_prompts(10, rng))  # warm the token map
+
+    for size in sizes:
+        prompts = make_prompts(size, rng)
+        stages = {
+            "matrix": timed(lambda: profile.index.match_batch(prompts)),
+            "rules": timed(lambda: profile.evaluate_batch(prompts, copy_results=False)),
+            "batch": timed(lambda: extractor.extract_specs(prompts)),
+            "single": timed(lambda: [extractor.extract_spec(p) for p in prompts]),
+        }
+        print(f"[INFO] {size} prompts")
+        for stage, seconds in stages.items():
+            print(f"{stage:>8}: {seconds:8.3f} s  {size / seconds:10.0f} prompts/s  {seconds / size * 1e6:7.1f} us/prompt")
+        print(f"{'speedup':>8}: {stages['single'] / stages['batch']:.2f}x batch over single")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Throughput benchmark for bulk export/import versus row-by-row ORM access"""
+
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from sqlalchemy import insert
+from src.data.database import Database
+from src.data.models import Spec
+from src.data.bulk_transfer import export_table, import_table
+
+ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+
+def seed(db: Database, rows: int):
+    spec_data = {"design_type": "building", "objects": [{"id": f"obj_{i}", "type": "wall"} for i in range(10)]}
+    batch = [{"id": str(uuid.uuid4()), "prompt": f"Office building {i}", "spec_data": spec_data, "agent_type": "MainAgent"}
+             for i in range(rows)]
+    with db.get_session() as session:
+        session.execute(insert(Spec), batch)
+        session.commit()
+
+def row_by_row_copy(source: Database, target: Database) -> float:
+    start = time.perf_counter()
+    with source.get_session() as session:
+        for spec in session.query(Spec).all():
+            target.save_spec(spec.prompt, spec.spec_data, spec.agent_type)
+    return time.perf_counter() - start
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        source = Database(f"sqlite:///{tmp}/source.db", write_behind=False)
+        seed(source, ROWS)
+        path = f"{tmp}/specs.ndjson.gz"
+
+        exported = export_table("specs", path, source)
+        imported = import_table(path, Database(f"sqlite:///{tmp}/target.db", write_behind=False))
+
+        sample = min(ROWS, 2000)
+        baseline_db = Database(f"sqlite:///{tmp}/baseline.db", write_behind=False)
+        baseline_source = Database(f"sqlite:///{tmp}/baseline_source.db", write_behind=False)
+        seed(baseline_source, sample)
+        baseline = row_by_row_copy(baseline_source, baseline_db)
+
+        print(f"\n📦 BULK TRANSFER BENCHMARK ({ROWS} specs)")
+        print("═══════════════════════════════")
+        print(f"Export: {exported['rows_per_sec']:>10} rows/s  ({exported['bytes'] / ROWS:.1f} bytes/row compressed)")
+        print(f"Import: {imported['rows_per_sec']:>10} rows/s  ({imported['chunks']} chunks)")
+        print(f"Row-by-row ORM copy: {sample / baseline:>10.1f} rows/s  ({sample} rows)")
+
+if __name__ == "__main__":
+    main()
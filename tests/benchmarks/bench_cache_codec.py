@@ -0,0 +1,52 @@
+"""Redis payload size and (de)serialization CPU for each cache codec versus plain json.dumps
+
+Usage: python tests/benchmarks/bench_cache_codec.py [iterations]
+
+Only codecs whose libraries are installed are measured (msgpack, zstandard and
+lz4 are optional). Payload bytes are what Redis stores per entry.
+"""
+
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from src.core.cache_codec import CacheCodec, available_compressors, available_serializers
+from src.prompt_agent.universal_extractor import UniversalPromptExtractor
+
+ITERATIONS = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+
+def payloads():
+    extractor = UniversalPromptExtractor()
+    spec = extractor.extract_spec("Modern 5 story office building with steel and concrete, parking and solar").model_dump()
+    route_response = {"spec": spec, "success": True, "message": "Specification generated successfully"}
+    batch = {"success": True, "results": [{"prompt": f"office {i}", "spec": spec, "evaluation": {"score": 0.8}}
+                                          for i in range(20)], "count": 20}
+    return {"single spec": route_response, "batch of 20": batch}
+
+def timed(func, value):
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        result = func(value)
+    return result, (time.perf_counter() - start) / ITERATIONS * 1e6
+
+def main():
+    for label, value in payloads().items():
+        baseline, encode_us = timed(lambda v: json.dumps(v, default=str), value)
+        _, decode_us = timed(json.loads, baseline)
+        print(f"\n[INFO] {label}")
+        print(f"{'json.dumps (legacy)':>22}: {len(baseline.encode()):7d} B  encode {encode_us:8.1f} us  decode {decode_us:8.1f} us")
+
+        for serializer in available_serializers():
+            for compression in available_compressors():
+                codec = CacheCodec(serializer=serializer, compression=compression, min_size=0)
+                encoded, encode_us = timed(codec.encode, value)
+                _, decode_us = timed(codec.decode, encoded)
+                saved = (1 - len(encoded) / len(baseline.encode())) * 100
+                print(f"{serializer + '+' + compression:>22}: {len(encoded):7d} B  encode {encode_us:8.1f} us  "
+                      f"decode {decode_us:8.1f} us  ({saved:5.1f}% smaller)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Cache hit rate with raw versus canonical prompt keys over replayed generate traffic
+
+Usage: python tests/benchmarks/bench_cache_hit_rate.py [traffic.jsonl]
+
+Each JSONL line needs a "prompt" (or "title") field. Without a file, traffic is
+synthesized from a few base prompts with the case, spacing, punctuation,
+stopword and synonym variations real clients send.
+"""
+
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from src.core.prompt_normalizer import canonical_prompt, extractor_synonyms
+
+REQUESTS = 20000
+
+BASE_PROMPTS = [
+    "modern office building with parking",
+    "3 story residential house with steel frame",
+    "warehouse with concrete floor",
+    "electric car with gps",
+    "wooden desk with drawers",
+    "smart thermostat with wireless control",
+    "change floor to marble",
+    "grey cushions for the sofa",
+]
+
+SYNONYM_SWAPS = {"grey": "gray", "cushions": "pillows", "floor": "flooring", "desk": "table"}
+
+def vary(prompt: str, rng: random.Random) -> str:
+    words = prompt.split()
+    if rng.random() < 0.3:
+        words = [SYNONYM_SWAPS.get(w, w) for w in words]
+    if rng.random() < 0.3:
+        words.insert(0, rng.choice(["a", "the", "please design a"]))
+    text = rng.choice([" ", "  "]).join(words)
+    if rng.random() < 0.5:
+        text = text.capitalize() if rng.random() < 0.5 else text.upper()
+    return text + rng.choice(["", ".", "!", " "])
+
+def load_traffic(path: str = None):
+    if path:
+        with open(path, encoding="utf-8") as f:
+            return [row.get("prompt") or row.get("title", "") for row in map(json.loads, f) if row]
+    rng = random.Random(42)
+    # Zipf-like popularity: a few prompts dominate, as with trending requests
+    weights = [1 / (rank + 1) for rank in range(len(BASE_PROMPTS))]
+    return [vary(rng.choices(BASE_PROMPTS, weights)[0], rng) for _ in range(REQUESTS)]
+
+def replay(traffic, key_func):
+    seen = set()
+    hits = 0
+    start = time.perf_counter()
+    for prompt in traffic:
+        key = key_func(prompt)
+        if key in seen:
+            hits += 1
+        else:
+            seen.add(key)
+    seconds = time.perf_counter() - start
+    return hits / len(traffic) * 100, len(seen), seconds / len(traffic) * 1e6
+
+def main():
+    traffic = load_traffic(sys.argv[1] if len(sys.argv) > 1 else None)
+    synonyms = extractor_synonyms()
+    print(f"[INFO] Replaying {len(traffic)} requests")
+    for label, key_func in (
+        ("raw", lambda p: p),
+        ("lowercase", lambda p: p.lower()),
+        ("canonical", canonical_prompt),
+        ("canonical+synonyms", lambda p: canonical_prompt(p, synonyms)),
+    ):
+        hit_rate, unique, per_key_us = replay(traffic, key_func)
+        print(f"{label:>20}: hit rate {hit_rate:6.2f}%  unique keys {unique:6d}  key cost {per_key_us:6.2f} us")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Per-prompt cost of the compiled keyword index versus per-category substring checks
+
+Usage: python tests/benchmarks/bench_keyword_index.py
+
+Runs the MainAgent, UniversalPromptExtractor, LocalLMAdapter and ObjectTargeter
+keyword tables over prompts of growing length. "substring" is the old
+`any(keyword in prompt_lower ...)` loop per concept of every table, "index" is one
+uncached KeywordIndex scan and "memoized" is the lookup a repeated prompt pays.
+"""
+
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from src.agents.main_agent import KEYWORDS as MAIN_AGENT_KEYWORDS
+from src.core.extraction_rules import rule_store
+from src.core.nlp_parser import KEYWORDS as TARGETER_KEYWORDS
+from src.core.prompt_normalizer import normalize_text
+
+INDEXES = {
+    "main_agent": MAIN_AGENT_KEYWORDS,
+    "universal": rule_store.get().profiles["universal"].index,
+    "local_lm": rule_store.get().profiles["local_lm"].index,
+    "targeter": TARGETER_KEYWORDS,
+}
+PROMPT_WORDS = [40, 400, 4000]
+ROUNDS = 200
+
+VOCABULARY = ("design a modern office building with parking and solar panels for our team near the river "
+              "using steel frame concrete floor glass walls grey cushions wireless sensors and a mobile app "
+              "that sends notification alerts to the cloud dashboard with analytics reporting").split()
+
+def substring_scan(index, prompt):
+    """What the extractors did before: normalize, then scan once per keyword of every concept"""
+    prompt_lower = normalize_text(prompt)
+    return {
+        table: [concept for concept, keywords in index.tables[table].items()
+                if any(keyword in prompt_lower for keyword in keywords)]
+        for table in index.tables
+    }
+
+def timed(func, prompts):
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        for prompt in prompts:
+            func(prompt)
+    return (time.perf_counter() - start) / (ROUNDS * len(prompts)) * 1e6
+
+def main():
+    rng = random.Random(7)
+    for words in PROMPT_WORDS:
+        prompts = [" ".join(rng.choices(VOCABULARY, k=words)) for _ in range(5)]
+        print(f"[INFO] {words} word prompts ({len(prompts[0])} chars)")
+        for name, index in INDEXES.items():
+            for prompt in prompts:
+                expected = substring_scan(index, prompt)
+                matches = index._match(prompt)
+                assert all(matches.concepts(table) == found for table, found in expected.items()), name
+            substring_us = timed(lambda p: substring_scan(index, p), prompts)
+            index_us = timed(index._match, prompts)
+            memo_us = timed(index.match, prompts)
+            print(f"{name:>12}: {len(index):3d} keywords  substring {substring_us:8.1f} us  "
+                  f"index {index_us:8.1f} us  memoized {memo_us:6.2f} us")
+
+if __name__ == "__main__":
+    main()
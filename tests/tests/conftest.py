@@ -20,4 +20,10 @@ os.environ["TESTING"] = "true"
 def setup_test_env():
     """Setup test environment variables"""
     # Ensure test environment is properly configured
-    yield
\ No newline at end of file
+    yield
+
+@pytest.fixture
+def fake_redis():
+    """Shared in-process Redis for cache tests (see fake_redis.py)"""
+    from .fake_redis import FakeRedis
+    return FakeRedis()
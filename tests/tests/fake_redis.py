@@ -0,0 +1,161 @@
+"""In-process Redis stand-ins for cache tests, counting round-trips
+
+FakeRedis shares its data and subscribers with every client made by
+connect(), so several CacheManagers act like workers on one server.
+FakeAsyncRedis is the redis.asyncio-shaped view of the same server.
+"""
+
+import math
+
+
+class FakeRedis:
+    def __init__(self, data=None, subscribers=None):
+        self.data = {} if data is None else data
+        self.subscribers = [] if subscribers is None else subscribers
+        self.round_trips = 0
+        self.commands = []
+
+    def connect(self):
+        return FakeRedis(self.data, self.subscribers)
+
+    def _command(self, name):
+        self.round_trips += 1
+        self.commands.append(name)
+
+    @property
+    def calls(self):
+        return self.commands.count("get")
+
+    def get(self, key):
+        self._command("get")
+        return self.data.get(key)
+
+    def mget(self, keys):
+        self._command("mget")
+        return [self.data.get(key) for key in keys]
+
+    def setex(self, key, ttl, value):
+        self._command("setex")
+        self.data[key] = value
+        return True
+
+    def set(self, key, value, nx=False, px=None):
+        self._command("set")
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    def exists(self, key):
+        self._command("exists")
+        return int(key in self.data)
+
+    def delete(self, *keys):
+        self._command("delete")
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+    def unlink(self, *keys):
+        self._command("unlink")
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+    def sadd(self, key, *members):
+        self._command("sadd")
+        found = self.data.setdefault(key, set())
+        added = len(set(members) - found)
+        found.update(members)
+        return added
+
+    def smembers(self, key):
+        self._command("smembers")
+        return set(self.data.get(key, set()))
+
+    def expire(self, key, seconds):
+        self._command("expire")
+        return int(key in self.data)
+
+    def eval(self, script, numkeys, key, token):
+        self._command("eval")
+        if self.data.get(key) == token:
+            return int(self.data.pop(key, None) is not None)
+        return 0
+
+    def scan_iter(self, match="*", count=10):
+        prefix = match.rstrip("*")
+        keys = [key for key in list(self.data) if key.startswith(prefix)]
+        for _ in range(max(1, math.ceil(len(keys) / count))):
+            self._command("scan")
+        return iter(keys)
+
+    def publish(self, channel, message):
+        self._command("publish")
+        for handlers in self.subscribers:
+            if channel in handlers:
+                handlers[channel]({"type": "message", "channel": channel, "data": message})
+
+    def pubsub(self, ignore_subscribe_messages=True):
+        redis = self
+
+        class PubSub:
+            def subscribe(self, **handlers):
+                redis.subscribers.append(handlers)
+
+            def run_in_thread(self, sleep_time=1.0, daemon=True):
+                return object()
+
+        return PubSub()
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    """Queues commands and runs them as a single round-trip on execute()"""
+
+    def __init__(self, redis):
+        self.redis = redis
+        self.queued = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.queued.append((name, args, kwargs))
+            return self
+        return queue
+
+    def execute(self):
+        self.redis._command("pipeline")
+        results = []
+        for name, args, kwargs in self.queued:
+            results.append(getattr(FakeRedis(self.redis.data, self.redis.subscribers), name)(*args, **kwargs))
+        self.queued = []
+        return results
+
+
+class FakeAsyncRedis:
+    """Awaitable facade over a FakeRedis; round-trips are counted on the wrapped client"""
+
+    def __init__(self, redis):
+        self.redis = redis
+
+    def __getattr__(self, name):
+        method = getattr(self.redis, name)
+
+        async def call(*args, **kwargs):
+            return method(*args, **kwargs)
+        return call
+
+    def pipeline(self, transaction=True):
+        pipe = self.redis.pipeline(transaction)
+
+        class AsyncPipeline:
+            def __getattr__(self, name):
+                queue = getattr(pipe, name)
+
+                def queued(*args, **kwargs):
+                    queue(*args, **kwargs)
+                    return self
+                return queued
+
+            async def execute(self):
+                return pipe.execute()
+
+        return AsyncPipeline()
@@ -0,0 +1,154 @@
+"""Test the agent executor pools behind the generation, evaluation and RL routes"""
+
+import asyncio
+import os
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.services.agent_executor import AgentPool, ExecutorBusy, get_agent, install_agents
+
+
+def test_thread_pool_runs_off_the_event_loop():
+    pool = AgentPool("test", 2, agents=(), mode="thread")
+    try:
+        loop_thread = threading.get_ident()
+        worker_thread = asyncio.run(pool.run(threading.get_ident))
+        stats = pool.get_stats()
+    finally:
+        pool.shutdown()
+
+    assert worker_thread != loop_thread
+    assert stats["submitted"] == stats["completed"] == 1 and stats["pending"] == 0
+
+
+def test_full_backlog_is_rejected():
+    pool = AgentPool("test", 1, agents=(), mode="thread", queue_max=1)
+    release = threading.Event()
+
+    async def scenario():
+        first = asyncio.ensure_future(pool.run(release.wait, 5))
+        second = asyncio.ensure_future(pool.run(release.wait, 5))
+        await asyncio.sleep(0)
+        with pytest.raises(ExecutorBusy):
+            await pool.run(release.wait, 5)
+        release.set()
+        await asyncio.gather(first, second)
+
+    try:
+        asyncio.run(scenario())
+        stats = pool.get_stats()
+    finally:
+        release.set()
+        pool.shutdown()
+
+    assert stats["rejected"] == 1 and stats["completed"] == 2
+
+
+def test_failures_are_counted():
+    pool = AgentPool("test", 1, agents=(), mode="thread")
+    try:
+        with pytest.raises(ZeroDivisionError):
+            asyncio.run(pool.run(divmod, 1, 0))
+        stats = pool.get_stats()
+    finally:
+        pool.shutdown()
+
+    assert stats["failed"] == 1 and stats["pending"] == 0
+
+
+def test_cancelled_caller_keeps_task_pending_until_work_ends():
+    pool = AgentPool("test", 1, agents=(), mode="thread")
+    running, release = threading.Event(), threading.Event()
+
+    def work():
+        running.set()
+        return release.wait(5)
+
+    async def scenario():
+        task = asyncio.ensure_future(pool.run(work))
+        await asyncio.to_thread(running.wait, 5)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        return pool.get_stats()
+
+    try:
+        stats = asyncio.run(scenario())
+        assert stats["pending"] == 1 and stats["cancelled"] == 1 and stats["failed"] == 0
+        release.set()
+        pool.shutdown()
+        stats = pool.get_stats()
+    finally:
+        release.set()
+        pool.shutdown()
+
+    assert stats["pending"] == 0 and stats["completed"] == 1
+
+
+def test_process_pool_runs_in_another_process():
+    pool = AgentPool("test", 1, agents=(), mode="process")
+    try:
+        assert asyncio.run(pool.run(os.getpid)) != os.getpid()
+    finally:
+        pool.shutdown()
+
+
+def test_installed_agents_are_shared_and_others_per_worker(monkeypatch):
+    import src.services.agent_executor as agent_executor
+
+    monkeypatch.setattr(agent_executor, "_shared_agents", {})
+    monkeypatch.setitem(agent_executor.AGENT_FACTORIES, "rl", object)
+    shared = object()
+    install_agents(main=shared)
+
+    def lookup():
+        return get_agent("main"), get_agent("rl"), get_agent("rl")
+
+    results = []
+    workers = [threading.Thread(target=lambda: results.append(lookup())) for _ in range(2)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    assert all(main is shared for main, _, _ in results)
+    assert all(first is second for _, first, second in results)
+    assert results[0][1] is not results[1][1]
+
+
+@pytest.fixture
+def client(monkeypatch):
+    from src.main import app, verify_dual_auth
+
+    monkeypatch.setattr(app.state.limiter, "enabled", False)
+    app.dependency_overrides[verify_dual_auth] = lambda: {"user": "test"}
+    try:
+        yield TestClient(app)
+    finally:
+        app.dependency_overrides.pop(verify_dual_auth, None)
+
+
+def test_iterate_runs_on_rl_pool(client):
+    from src.main import agent_executor
+
+    before = agent_executor.get_stats()["rl"]["completed"]
+    response = client.post("/iterate", json={"prompt": "Executor test office", "n_iter": 2})
+
+    assert response.status_code == 200
+    assert agent_executor.get_stats()["rl"]["completed"] == before + 1
+    stats = client.get("/executor-stats").json()["executor_stats"]
+    assert set(stats) == {"agents", "rl"}
+
+
+def test_busy_pool_returns_503(client, monkeypatch):
+    import src.main as main
+
+    async def busy(pool, fn, *args):
+        raise ExecutorBusy(pool, 99)
+
+    monkeypatch.setattr(main.agent_executor, "run", busy)
+    response = client.post("/api/v1/evaluate", json={"prompt": "busy", "spec_json": {}})
+
+    assert response.status_code == 503
@@ -0,0 +1,101 @@
+"""Test the spec artifact sinks behind MainAgent.run"""
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from src.agents.main_agent import MainAgent
+from src.data.database import Database
+from src.prompt_agent.universal_extractor import UniversalPromptExtractor
+from src.services.artifact_sink import (
+    DatabaseSink, FileSink, MultiSink, NullSink, ObjectStoreSink, _BatchedSink, create_artifact_sink
+)
+
+SPEC = {"design_type": "building", "materials": [{"type": "steel"}]}
+
+
+def test_file_sink_writes_unique_files_in_background(tmp_path):
+    sink = FileSink(str(tmp_path))
+    refs = [sink.save(f"prompt {i}", SPEC) for i in range(20)]  # same second, no collisions
+    sink.flush()
+
+    paths = {ref["spec_file"] for ref in refs}
+    assert len(paths) == 20 and len(list(tmp_path.glob("design_spec_*.json"))) == 20
+    document = json.loads(open(refs[3]["spec_file"]).read())
+    assert document["prompt"] == "prompt 3" and document["specification"] == SPEC
+    assert sink.get_stats()["written"] == 20
+
+
+def test_db_sink_batches_rows(tmp_path):
+    database = Database(f"sqlite:///{tmp_path / 'sink.db'}", write_behind=False)
+    sink = DatabaseSink(database)
+    spec_ids = [sink.save(f"prompt {i}", SPEC)["spec_id"] for i in range(5)]
+    sink.flush()
+
+    assert all(database.get_spec_sync(spec_id)["design_type"] == "building" for spec_id in spec_ids)
+    assert sink.get_stats()["batches"] < 5
+
+
+def test_db_sink_skips_write_behind_queue(tmp_path):
+    database = Database(f"sqlite:///{tmp_path / 'sink.db'}", write_behind=True)
+    sink = DatabaseSink(database)
+    spec_ids = [sink.save(f"prompt {i}", SPEC)["spec_id"] for i in range(5)]
+    sink.flush()
+
+    assert database.write_queue.get_stats()["enqueued"] == 0
+    assert all(database.get_spec_sync(spec_id)["design_type"] == "building" for spec_id in spec_ids)
+
+
+def test_object_sink_returns_bucket_url(tmp_path):
+    sink = ObjectStoreSink("https://bucket.example.com/", str(tmp_path))
+    url = sink.save("prompt", SPEC)["spec_url"]
+    sink.flush()
+
+    key = url.replace("https://bucket.example.com/", "")
+    assert key.startswith("specs/") and (tmp_path / key).exists()
+
+
+def test_create_artifact_sink_from_spec(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    assert isinstance(create_artifact_sink("none"), NullSink)
+    assert isinstance(create_artifact_sink("bogus"), NullSink)
+    assert isinstance(create_artifact_sink("db"), DatabaseSink)
+    multi = create_artifact_sink("db, file")
+    assert isinstance(multi, MultiSink) and multi.name == "db,file"
+
+
+def test_batched_sinks_must_implement_write_batch():
+    class NoWriter(_BatchedSink):
+        name = "broken"
+
+    with pytest.raises(TypeError):
+        NoWriter()
+
+
+def test_production_defaults_to_db_only():
+    code = "from src.services.artifact_sink import ARTIFACT_SINK; print(ARTIFACT_SINK)"
+    env = {"PRODUCTION_MODE": "true", "PATH": ""}
+    out = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True,
+                         cwd=Path(__file__).resolve().parents[2])
+    assert out.stdout.strip() == "db"
+
+
+def test_run_only_queues_artifacts(tmp_path, monkeypatch):
+    class RecordingSink(NullSink):
+        saved = []
+
+        def save(self, prompt, spec_data):
+            self.saved.append((prompt, spec_data["design_type"]))
+            return {}
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr("src.agents.main_agent.get_artifact_sink", RecordingSink)
+    agent = MainAgent()
+
+    agent.run("Steel office building with parking")
+
+    assert RecordingSink.saved == [("Steel office building with parking", "building")]
+    assert list(tmp_path.iterdir()) == []  # no spec_outputs directory unless a file sink asks for one
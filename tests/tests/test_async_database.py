@@ -0,0 +1,68 @@
+"""Test async database engine path"""
+
+import pytest
+from src.data.database import Database, _driver_url, ASYNC_DRIVERS, SYNC_DRIVERS
+
+
+@pytest.fixture
+def async_db(tmp_path):
+    db = Database(f"sqlite:///{tmp_path / 'async.db'}")
+    yield db
+    db.dispose()
+
+
+def test_driver_url_selection():
+    """URL scheme selects the matching sync and async drivers"""
+    assert _driver_url("postgresql://u:p@host/db", ASYNC_DRIVERS) == "postgresql+asyncpg://u:p@host/db"
+    assert _driver_url("postgresql+asyncpg://u:p@host/db", SYNC_DRIVERS) == "postgresql+psycopg2://u:p@host/db"
+    assert _driver_url("sqlite:///local.db", ASYNC_DRIVERS) == "sqlite+aiosqlite:///local.db"
+
+
+async def test_async_spec_roundtrip(async_db):
+    """Specs saved, read and updated through the async engine"""
+    assert async_db.async_engine is not None
+
+    spec_id = await async_db.save_spec_async("Office", {"objects": []})
+    assert await async_db.get_spec(spec_id) == {"objects": []}
+
+    assert await async_db.update_spec(spec_id, {"objects": [{"id": "obj_1"}]})
+    assert async_db.get_spec_sync(spec_id) == {"objects": [{"id": "obj_1"}]}
+
+    eval_id = await async_db.save_eval_async(spec_id, "Office", {"score": 80}, 80.0)
+    assert async_db.get_eval(eval_id)["spec_id"] == spec_id
+
+
+async def test_async_calls_without_driver_use_thread(async_db):
+    """Without an async driver the sync path runs off the event loop"""
+    async_db.AsyncSessionLocal = None
+
+    spec_id = await async_db.save_spec_async("House", {"objects": []})
+    assert await async_db.get_spec(spec_id) == {"objects": []}
+    assert await async_db.update_spec(spec_id, {"objects": [1]})
+    assert await async_db.get_spec(spec_id) == {"objects": [1]}
+
+
+async def test_report_fetch_single_query(async_db):
+    """Reports join eval and spec in one statement and can skip the JSON payloads"""
+    from sqlalchemy import event
+
+    spec_id = async_db.save_spec("Office", {"objects": [1, 2]})
+    eval_id = async_db.save_eval(spec_id, "Office", {"criteria": {"cost": 0.8}}, 82.0)
+
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(async_db.engine, "before_cursor_execute", listener)
+    try:
+        report = async_db.get_report(eval_id)
+    finally:
+        event.remove(async_db.engine, "before_cursor_execute", listener)
+
+    assert len(statements) == 1
+    assert report["spec"]["spec_data"] == {"objects": [1, 2]}
+    assert report["evaluation"]["eval_data"] == {"criteria": {"cost": 0.8}}
+
+    slim = await async_db.get_report_async(eval_id, include_data=False)
+    assert slim["evaluation"]["score"] == 82.0
+    assert slim["spec"]["id"] == spec_id
+    assert "eval_data" not in slim["evaluation"] and "spec_data" not in slim["spec"]
+    assert await async_db.get_report_async("missing") is None
@@ -0,0 +1,60 @@
+"""Test batch generation over many prompts"""
+
+import pytest
+from fastapi.testclient import TestClient
+from src.agents.main_agent import MainAgent
+from src.data.database import Database
+from src.prompt_agent.universal_extractor import UniversalPromptExtractor
+
+PROMPTS = ["Steel office building with parking", "electric car with gps", "wireless phone",
+           "oak dining chair", "steel office building with parking!", "garden gnome"]
+
+
+def _comparable(spec):
+    return spec.model_dump(exclude={"metadata", "timestamp"})
+
+
+def test_batch_matches_one_at_a_time():
+    extractor = UniversalPromptExtractor()
+    batch = extractor.extract_specs(PROMPTS)
+
+    assert [_comparable(s) for s in batch] == [_comparable(extractor.extract_spec(p)) for p in PROMPTS]
+    batch[0].features.append("changed")  # prompts sharing a rule result still get their own objects
+    assert "changed" not in batch[4].features
+
+
+def test_run_batch_persists_specs(tmp_path, monkeypatch):
+    database = Database(f"sqlite:///{tmp_path / 'batch.db'}", write_behind=True)
+    monkeypatch.setattr("src.data.database.get_database", lambda: database)
+    agent = MainAgent.__new__(MainAgent)
+    agent.universal_extractor = UniversalPromptExtractor()
+
+    results = agent.run_batch(PROMPTS)
+
+    assert [spec.design_type for _, spec in results] == \
+        ["building", "vehicle", "electronics", "furniture", "building", "general"]
+    assert database.write_queue.get_stats()["enqueued"] == 0  # one direct insert, even with write-behind on
+    assert database.get_spec_sync(results[1][0])["design_type"] == "vehicle"
+    with pytest.raises(ValueError):
+        agent.run_batch(["ok prompt", "x"])
+
+
+def test_batch_endpoint(monkeypatch):
+    from src.main import app, verify_dual_auth
+
+    monkeypatch.setattr(app.state.limiter, "enabled", False)
+    monkeypatch.setattr("src.main.BATCH_GENERATE_MAX_PROMPTS", 10)
+    app.dependency_overrides[verify_dual_auth] = lambda: {"user": "test"}
+    try:
+        client = TestClient(app)
+        response = client.post("/api/v1/generate/batch", json={"prompts": PROMPTS, "persist": False})
+        too_many = client.post("/api/v1/generate/batch", json={"prompts": ["office"] * 11, "persist": False})
+        invalid = client.post("/api/v1/generate/batch", json={"prompts": ["office", ""], "persist": False})
+    finally:
+        app.dependency_overrides.pop(verify_dual_auth, None)
+
+    body = response.json()
+    assert response.status_code == 200 and body["count"] == len(PROMPTS)
+    assert body["design_types"] == {"building": 2, "vehicle": 1, "electronics": 1, "furniture": 1, "general": 1}
+    assert body["results"][0]["spec_json"]["features"] == ["parking"]
+    assert (too_many.status_code, invalid.status_code) == (413, 422)
@@ -0,0 +1,71 @@
+"""Test bulk export/import of specs, evals and iteration logs"""
+
+import gzip
+import json
+import pytest
+from src.data.database import Database
+from src.data.bulk_transfer import export_tables, import_tables, export_table, import_table, main
+
+
+@pytest.fixture
+def source(tmp_path):
+    db = Database(f"sqlite:///{tmp_path / 'source.db'}", write_behind=False)
+    yield db
+    db.dispose()
+
+
+@pytest.fixture
+def target(tmp_path):
+    db = Database(f"sqlite:///{tmp_path / 'target.db'}", write_behind=False)
+    yield db
+    db.dispose()
+
+
+def test_roundtrip_preserves_rows(source, target, tmp_path):
+    spec_ids = [source.save_spec(f"Office {i}", {"objects": [i]}) for i in range(7)]
+    eval_id = source.save_eval(spec_ids[0], "Office 0", {"score": 70}, 70.0)
+    source.save_iteration_log(session_id="s-1", iteration_number=1, prompt="Office", spec_after={}, reward=0.2)
+
+    exported = export_tables(str(tmp_path / "dump"), db=source, chunk_size=3)
+    assert {r["table"]: r["rows"] for r in exported} == {"specs": 7, "evals": 1, "iteration_logs": 1}
+    assert next(r for r in exported if r["table"] == "specs")["chunks"] == 3
+
+    imported = import_tables(str(tmp_path / "dump"), db=target)
+    assert sum(r["rows"] for r in imported) == 9
+    assert target.get_spec_sync(spec_ids[4]) == {"objects": [4]}
+    assert target.get_report(eval_id)["evaluation"]["score"] == 70.0
+    assert target.get_iteration_logs("s-1")[0]["reward"] == 0.2
+
+    # Re-importing skips rows that already exist
+    import_tables(str(tmp_path / "dump"), db=target)
+    with target.get_session() as session:
+        from src.data.models import Spec
+        assert session.query(Spec).count() == 7
+
+
+def test_export_file_is_columnar(source, tmp_path):
+    source.save_spec("House", {"objects": []})
+    path = tmp_path / "specs.ndjson.gz"
+    export_table("specs", str(path), source)
+
+    with gzip.open(path, "rt") as f:
+        header, chunk = [json.loads(line) for line in f]
+    assert header["table"] == "specs" and "spec_data" in header["columns"]
+    assert chunk["rows"] == 1 and chunk["columns"]["prompt"] == ["House"]
+
+
+def test_import_rejects_unknown_format(target, tmp_path):
+    path = tmp_path / "bad.ndjson.gz"
+    with gzip.open(path, "wt") as f:
+        f.write(json.dumps({"table": "specs", "format_version": 99}) + "\n")
+    with pytest.raises(ValueError):
+        import_table(str(path), target)
+
+
+def test_cli_export_and_import(tmp_path, capsys):
+    source_url = f"sqlite:///{tmp_path / 'cli_source.db'}"
+    Database(source_url, write_behind=False).save_spec("Warehouse", {"objects": []})
+
+    assert main(["--database-url", source_url, "export", str(tmp_path / "out"), "--tables", "specs"]) == 0
+    assert main(["--database-url", f"sqlite:///{tmp_path / 'cli_target.db'}", "import", str(tmp_path / "out")]) == 0
+    assert "import specs: 1 rows" in capsys.readouterr().out
@@ -0,0 +1,438 @@
+"""Test cache manager and its in-memory tier"""
+
+import asyncio
+import importlib
+import json
+import os
+import threading
+import time
+import pytest
+from src.core.cache import BoundedTTLCache, CacheManager
+from src.core.cache_codec import MAGIC, CacheCodec
+from .fake_redis import FakeAsyncRedis, FakeRedis
+
+# src.core re-exports the global `cache` instance, which shadows the module attribute
+cache_module = importlib.import_module("src.core.cache")
+
+
+@pytest.fixture
+def memory_cache():
+    manager = CacheManager(max_entries=3, max_bytes=10_000)
+    manager.redis_client = None
+    return manager
+
+
+def test_lru_eviction_by_entries(memory_cache):
+    for key in ("a", "b", "c"):
+        memory_cache.set(key, {"value": key})
+    memory_cache.get("a")  # a becomes most recently used
+    memory_cache.set("d", {"value": "d"})
+
+    assert memory_cache.get("b") is None
+    assert memory_cache.get("a") == {"value": "a"}
+    stats = memory_cache.get_stats()
+    assert stats["memory_cache_size"] == 3
+    assert stats["memory_evictions"] == 1
+
+
+def test_byte_cap_and_oversized_values():
+    cache = BoundedTTLCache(max_entries=100, max_bytes=200)
+    for i in range(10):
+        cache.set(f"k{i}", "x" * 40, ttl=60)
+
+    assert cache.bytes <= 200
+    assert len(cache) < 10 and cache.get("k9") == "x" * 40
+    assert not cache.set("huge", "x" * 500, ttl=60)
+    assert cache.stats["rejected"] == 1
+
+
+def test_size_passed_by_caller_is_not_recomputed(monkeypatch):
+    cache = BoundedTTLCache(max_entries=10, max_bytes=1000)
+    monkeypatch.setattr(importlib.import_module("src.core.cache").json, "dumps", lambda *args, **kwargs: pytest.fail("value was re-encoded"))
+    cache.set("key", {"spec": list(range(100))}, ttl=60, size=42)
+
+    assert cache.bytes == len("key") + 42
+
+
+def test_ttl_expiry(memory_cache):
+    memory_cache.set("short", [1], ttl=0)
+    memory_cache.set("long", [2], ttl=60)
+    time.sleep(0.01)
+
+    assert memory_cache.get("short") is None
+    assert memory_cache.get("long") == [2]
+    assert memory_cache.get_stats()["memory_expirations"] == 1
+
+
+def test_overwrite_updates_size(memory_cache):
+    memory_cache.set("a", "x" * 100)
+    memory_cache.set("a", "y")
+    assert memory_cache._memory_cache.bytes == len("a") + len(memory_cache.codec.encode("y"))
+    assert memory_cache.clear_cache()
+    assert memory_cache.get_stats()["memory_cache_bytes"] == 0
+
+
+def test_l2_hit_promotes_to_l1():
+    redis = FakeRedis()
+    writer = CacheManager(redis_client=redis.connect())
+    reader = CacheManager(redis_client=redis.connect())
+    writer.set("hot", {"spec": 1})
+
+    assert reader.get("hot") == {"spec": 1}  # L2 hit
+    calls = reader.redis_client.calls
+    assert reader.get("hot") == {"spec": 1}  # L1 hit, no round-trip
+    assert reader.redis_client.calls == calls
+
+    stats = reader.get_stats()
+    assert (stats["l1_hits"], stats["l2_hits"]) == (1, 1)
+    assert stats["l1_hit_rate_percent"] == 50.0 and stats["l2_hit_rate_percent"] == 100.0
+
+
+def test_l1_entries_use_short_ttl():
+    manager = CacheManager(redis_client=FakeRedis(), l1_ttl=0)
+    manager.set("k", [1], ttl=3600)
+    time.sleep(0.01)
+
+    assert manager.get("k") == [1]
+    assert manager.get_stats()["l2_hits"] == 1
+
+
+def test_delete_invalidates_other_workers():
+    redis = FakeRedis()
+    worker_a = CacheManager(redis_client=redis.connect())
+    worker_b = CacheManager(redis_client=redis.connect())
+    worker_a.set("k", "v1")
+    assert worker_b.get("k") == "v1"  # now cached in worker_b's L1
+
+    worker_a.delete("k")
+
+    assert worker_b.get("k") is None
+    assert worker_b.get_stats()["invalidations_received"] == 1
+
+    worker_a.set("j", "v")
+    worker_b.get("j")
+    worker_a.clear_cache()
+    assert len(worker_b._memory_cache) == 0
+
+
+def test_concurrent_misses_share_one_generation(memory_cache):
+    calls = []
+    started = threading.Event()
+
+    def slow_generate(prompt):
+        calls.append(prompt)
+        started.set()
+        time.sleep(0.1)
+        return {"prompt": prompt}
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(memory_cache.cached_generate("trending", slow_generate)))
+               for _ in range(10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert calls == ["trending"]
+    assert results == [{"prompt": "trending"}] * 10
+    stats = memory_cache.get_stats()
+    assert stats["generations"] == 1
+    assert stats["coalesced_local"] + stats["hits"] == 9
+    assert stats["inflight"] == 0
+
+
+def test_async_misses_share_one_generation(memory_cache):
+    calls = []
+
+    async def generate(prompt):
+        calls.append(prompt)
+        await asyncio.sleep(0.05)
+        return {"prompt": prompt}
+
+    async def burst():
+        return await asyncio.gather(*[memory_cache.cached_generate_async("trending", generate) for _ in range(50)])
+
+    results = asyncio.run(burst())
+
+    assert len(calls) == 1
+    assert all(result == {"prompt": "trending"} for result in results)
+    assert memory_cache.get_stats()["coalesced_local"] == 49
+
+
+def test_generation_error_reaches_every_waiter(memory_cache):
+    async def failing(prompt):
+        await asyncio.sleep(0.01)
+        raise RuntimeError("model down")
+
+    async def burst():
+        return await asyncio.gather(*[memory_cache.cached_generate_async("p", failing) for _ in range(3)],
+                                    return_exceptions=True)
+
+    results = asyncio.run(burst())
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert memory_cache.get("p") is None and not memory_cache._inflight_async
+
+
+def test_other_worker_waits_for_lock_owner(monkeypatch):
+    monkeypatch.setattr(cache_module, "CACHE_LOCK_POLL", 0.01)
+    redis = FakeRedis()
+    owner = CacheManager(redis_client=redis.connect())
+    waiter = CacheManager(redis_client=redis.connect())
+    key = owner.get_cache_key("trending")
+    redis.data[f"lock:prompt:{key}"] = "owner-token"
+
+    def finish():
+        time.sleep(0.05)
+        owner.set(key, {"spec": "from owner"})
+        redis.data.pop(f"lock:prompt:{key}")
+
+    threading.Thread(target=finish).start()
+    result = waiter.cached_generate("trending", lambda prompt: pytest.fail("waiter should not generate"))
+
+    assert result == {"spec": "from owner"}
+    assert waiter.get_stats()["coalesced_remote"] == 1
+
+
+def test_abandoned_lock_falls_back_to_generating(monkeypatch):
+    monkeypatch.setattr(cache_module, "CACHE_LOCK_WAIT", 0.05)
+    monkeypatch.setattr(cache_module, "CACHE_LOCK_POLL", 0.01)
+    redis = FakeRedis()
+    manager = CacheManager(redis_client=redis.connect())
+    redis.data[f"lock:prompt:{manager.get_cache_key('p')}"] = "stuck"
+
+    assert manager.cached_generate("p", lambda prompt: "fresh") == "fresh"
+    stats = manager.get_stats()
+    assert stats["lock_fallbacks"] == 1 and stats["generations"] == 1
+    assert redis.data[f"lock:prompt:{manager.get_cache_key('p')}"] == "stuck"  # not ours to release
+
+
+def _wait_for_refreshes(manager, timeout=2.0):
+    deadline = time.time() + timeout
+    while manager._refreshing and time.time() < deadline:
+        time.sleep(0.01)
+
+
+def test_stale_value_served_while_refreshing(memory_cache):
+    manager = memory_cache
+    manager.xfetch_beta = 0
+    versions = iter(["v1", "v2"])
+
+    def generate(prompt):
+        time.sleep(0.02)
+        return next(versions)
+
+    assert manager.cached_generate("p", generate, ttl=0) == "v1"
+    assert manager.cached_generate("p", generate, ttl=0) == "v1"  # stale, refresh starts
+    _wait_for_refreshes(manager)
+
+    stats = manager.get_stats()
+    assert stats["stale_served"] == 1 and stats["background_refreshes"] == 1
+    assert manager._unwrap(manager.get(manager.get_cache_key("p"))) == "v2"
+
+
+def test_failed_refresh_keeps_stale_value(memory_cache):
+    memory_cache.xfetch_beta = 0
+    memory_cache.cached_generate("p", lambda prompt: "v1", ttl=0)
+
+    def broken(prompt):
+        raise RuntimeError("model down")
+
+    assert memory_cache.cached_generate("p", broken, ttl=0) == "v1"
+    _wait_for_refreshes(memory_cache)
+
+    assert memory_cache.get_stats()["refresh_errors"] == 1
+    assert memory_cache.cached_generate("p", broken, ttl=0) == "v1"
+
+
+def test_xfetch_refreshes_expensive_entries_early(memory_cache):
+    key = memory_cache.get_cache_key("p")
+    memory_cache.set(key, {"_swr": 1, "value": "v1", "fresh_until": time.time() + 5, "delta": 10.0})
+
+    memory_cache.xfetch_beta = 0
+    assert not memory_cache._needs_refresh(memory_cache.get(key))
+
+    memory_cache.xfetch_beta = 1e6  # expected early margin dwarfs the remaining 5s
+    assert memory_cache.cached_generate("p", lambda prompt: "v2") == "v1"
+    _wait_for_refreshes(memory_cache)
+
+    assert memory_cache.get_stats()["early_refreshes"] == 1
+    assert memory_cache.cached_generate("p", lambda prompt: "v3") == "v2"
+
+
+def test_async_stale_refresh_runs_once(memory_cache):
+    memory_cache.xfetch_beta = 0
+    calls = []
+
+    async def generate(prompt):
+        calls.append(prompt)
+        await asyncio.sleep(0.01)
+        return len(calls)
+
+    async def scenario():
+        await memory_cache.cached_generate_async("p", generate, ttl=0)
+        stale = await asyncio.gather(*[memory_cache.cached_generate_async("p", generate, ttl=0) for _ in range(5)])
+        await asyncio.gather(*memory_cache._refresh_tasks)
+        return stale
+
+    assert asyncio.run(scenario()) == [1] * 5
+    assert len(calls) == 2
+    assert memory_cache.get_stats()["background_refreshes"] == 1
+
+
+def test_refresh_keeps_tags_recorded_before_store(memory_cache):
+    memory_cache.xfetch_beta = 0
+    key = memory_cache.get_cache_key("p")
+
+    async def generate(prompt):
+        await memory_cache.tag_async(key, ["spec:s1"])  # routes tag inside compute, before the store
+        return "view"
+
+    async def scenario():
+        await memory_cache.cached_generate_async("p", generate, ttl=0)
+        await memory_cache.cached_generate_async("p", generate, ttl=0)  # stale: refresh overwrites the entry
+        await asyncio.gather(*memory_cache._refresh_tasks)
+
+    asyncio.run(scenario())
+
+    assert memory_cache.get_stats()["background_refreshes"] == 1
+    assert memory_cache.invalidate_tags("spec:s1") == 1
+    assert memory_cache.get(key) is None
+
+
+def test_codec_round_trip_and_threshold():
+    codec = CacheCodec(serializer="json", compression="zlib", min_size=100)
+    spec = {"design_type": "building", "materials": [{"type": "steel", "grade": "A36"}] * 50}
+
+    small, large = codec.encode({"a": 1}), codec.encode(spec)
+    assert small[1] & 0x0F == 0 and large[1] & 0x0F != 0  # only the large payload is compressed
+    assert len(large) < len(json.dumps(spec)) / 5
+    assert codec.decode(small) == {"a": 1} and codec.decode(large) == spec
+
+
+def test_codec_decodes_other_and_legacy_formats():
+    written_by_old_deploy = CacheCodec(serializer="json", compression="none").encode([1, "x"])
+    reader = CacheCodec(serializer="auto", compression="auto", min_size=0)
+
+    assert reader.decode(written_by_old_deploy) == [1, "x"]
+    assert reader.decode('{"legacy": true}') == {"legacy": True}
+    assert reader.decode(b'{"legacy": true}') == {"legacy": True}
+    assert reader.encode({"a": 1}).startswith(MAGIC)
+
+
+def test_redis_values_are_tagged_binary():
+    redis = FakeRedis()
+    manager = CacheManager(redis_client=redis, codec=CacheCodec(min_size=0))
+    manager.set("k", {"spec": "x" * 200})
+
+    assert redis.data["prompt:k"].startswith(MAGIC)
+    manager._memory_cache.clear()
+    assert manager.get("k") == {"spec": "x" * 200}
+
+    redis.data["prompt:old"] = '{"written": "before codecs"}'
+    assert manager.get("old") == {"written": "before codecs"}
+
+
+def test_mget_and_mset_use_one_round_trip_each(fake_redis):
+    manager = CacheManager(redis_client=fake_redis, pubsub_invalidation=False)
+    manager.mset({f"k{i}": {"n": i} for i in range(20)})
+    assert fake_redis.commands == ["pipeline"]
+
+    manager._memory_cache.clear()
+    manager.get("k0")  # promoted into L1
+    before = fake_redis.round_trips
+    found = manager.mget([f"k{i}" for i in range(25)])
+
+    assert fake_redis.round_trips - before == 1
+    assert len(found) == 20 and found["k7"] == {"n": 7}
+    assert manager.get_stats()["misses"] == 5
+
+
+def test_async_path_uses_async_client(fake_redis):
+    sync_side = fake_redis.connect()
+    manager = CacheManager(redis_client=sync_side, async_redis_client=FakeAsyncRedis(fake_redis),
+                           pubsub_invalidation=False)
+
+    async def scenario():
+        await manager.mset_async({"a": 1, "b": 2})
+        manager._memory_cache.clear()
+        return await manager.get_async("a"), await manager.mget_async(["a", "b", "c"]), \
+            await manager.cached_generate_async("p", lambda prompt: "spec")
+
+    assert asyncio.run(scenario()) == (1, {"a": 1, "b": 2}, "spec")
+    assert sync_side.round_trips == 0  # nothing blocked the event loop
+    assert manager.get_stats()["async_redis"] is True
+
+
+def test_clear_unlinks_in_batches(fake_redis, monkeypatch):
+    monkeypatch.setattr(cache_module, "CACHE_CLEAR_BATCH", 100)
+    manager = CacheManager(redis_client=fake_redis, pubsub_invalidation=False)
+    manager.mset({f"k{i}": i for i in range(250)})
+    fake_redis.data["other:key"] = b"kept"
+    fake_redis.commands.clear()
+
+    assert manager.clear_cache()
+    assert fake_redis.commands.count("unlink") == 3 and "delete" not in fake_redis.commands
+    assert list(fake_redis.data) == ["other:key"]
+
+
+def test_invalidate_tags_evicts_only_tagged_keys(fake_redis):
+    worker_a = CacheManager(redis_client=fake_redis.connect())
+    worker_b = CacheManager(redis_client=fake_redis.connect())
+    worker_a.mset({"view:1": "a", "view:2": "b", "other": "c"})
+    worker_a.tag("view:1", ["spec:1"])
+    worker_a.tag("view:2", ["spec:1", "spec:2"])
+    assert worker_b.mget(["view:1", "view:2", "other"]) == {"view:1": "a", "view:2": "b", "other": "c"}
+
+    assert worker_a.invalidate_tags("spec:1") == 2
+
+    assert worker_b.get("view:1") is None and worker_b.get("view:2") is None
+    assert worker_b.get("other") == "c"
+    assert "tag:spec:1" not in fake_redis.data
+    assert worker_a.get_stats()["invalidated_keys"] == 2
+
+
+def test_invalidate_tags_without_redis(memory_cache):
+    memory_cache.set("view:1", "a")
+    memory_cache.set("other", "c")
+    memory_cache.tag("view:1", ["spec:1"])
+
+    assert memory_cache.invalidate_tags("spec:1", "spec:unknown") == 1
+    assert memory_cache.get("view:1") is None and memory_cache.get("other") == "c"
+
+
+def test_tag_map_stays_bounded_under_eviction():
+    manager = CacheManager(max_entries=100, max_bytes=5_000)
+    manager.redis_client = None
+    for i in range(20_000):
+        manager.tag(f"view:{i}", [f"spec:{i}", "spec:shared"])  # routes tag before the value is stored
+        manager.set(f"view:{i}", i)
+    manager.tag("too-big", ["spec:big"])
+    manager.set("too-big", os.urandom(5_000).hex())
+
+    assert len(manager._tags) <= 101 and len(manager._key_tags) <= 100
+    assert len(manager._tags["spec:shared"]) == 100 and "spec:big" not in manager._tags
+    assert manager.invalidate_tags("spec:19999") == 1
+    assert "spec:19999" not in manager._tags and len(manager._tags["spec:shared"]) == 99
+
+
+def test_async_clients_are_closed_with_their_loop(fake_redis, monkeypatch):
+    closed = []
+
+    class Client:
+        async def aclose(self):
+            closed.append(self)
+
+    monkeypatch.setattr(cache_module.redis_async, "from_url", lambda *args, **kwargs: Client())
+    manager = CacheManager(redis_client=fake_redis.connect())
+    manager._redis_url = "redis://fake"
+
+    async def use():
+        client = manager._async_client()
+        assert manager._async_client() is client
+        await asyncio.sleep(0)
+        return client
+
+    first, second = asyncio.run(use()), asyncio.run(use())
+
+    assert first is not second and closed == [first, second]
+    assert manager._async_clients == {}
@@ -0,0 +1,56 @@
+"""Test shared database provider and connection pool"""
+
+from src.data import database
+from src.data.database import Database, get_database
+
+
+def test_get_database_returns_shared_instance():
+    """All callers share one Database and one engine"""
+    assert get_database() is get_database()
+    assert get_database().engine is get_database().engine
+
+
+def test_agents_use_shared_database(monkeypatch):
+    """Agents save through the shared provider instead of building engines"""
+    from src.agents.evaluator_agent import EvaluatorAgent
+    from src.schemas.legacy_schema import DesignSpec
+
+    def fail_construct(*args, **kwargs):
+        raise AssertionError("Database() constructed on the request path")
+
+    shared = get_database()
+    monkeypatch.setattr(database, "Database", fail_construct)
+    spec = DesignSpec(building_type="office", stories=2, materials=[{"type": "steel"}],
+                      dimensions={"length": 10, "width": 10, "height": 7, "area": 100},
+                      features=["parking"], requirements=["Office"])
+    EvaluatorAgent().run(spec, "Office")
+    assert get_database() is shared
+
+
+def test_schema_checked_once_per_url(tmp_path, monkeypatch):
+    """create_all runs only for the first Database on a URL"""
+    calls = []
+    monkeypatch.setattr(Database, "create_tables", lambda self: calls.append(self.database_url))
+    url = f"sqlite:///{tmp_path / 'pool.db'}"
+
+    Database(url)
+    Database(url)
+
+    assert calls == [url]
+
+
+def test_pool_stats(tmp_path):
+    """Pool stats report utilization for queue pools"""
+    db = Database(f"sqlite:///{tmp_path / 'stats.db'}")
+    session = db.get_session()
+    session.connection()
+    stats = db.get_pool_stats()
+    session.close()
+
+    assert stats["pool_class"] == "QueuePool"
+    assert stats["size"] == database.DB_POOL_SIZE
+    assert stats["checked_out"] == 1
+    assert stats["capacity"] == database.DB_POOL_SIZE + database.DB_MAX_OVERFLOW
+    assert stats["utilization_percent"] > 0
+    assert db.get_pool_stats()["checked_out"] == 0
+    db.dispose()
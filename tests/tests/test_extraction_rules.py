@@ -0,0 +1,92 @@
+"""Test the declarative extraction rule table and its hot reload"""
+
+import json
+import os
+import shutil
+import time
+import pytest
+from src.core.extraction_rules import EXTRACTION_RULES_PATH, ExtractionRules, RuleStore
+from src.core.lm_adapter import LocalLMAdapter
+from src.prompt_agent.universal_extractor import UniversalPromptExtractor
+
+
+def _rules_file(tmp_path):
+    path = tmp_path / "rules.json"
+    shutil.copy(EXTRACTION_RULES_PATH, path)
+    return path
+
+
+def _rewrite(path, edit):
+    data = json.loads(path.read_text())
+    edit(data)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(data))
+    os.replace(tmp, path)
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))  # coarse filesystem clocks
+
+
+def test_bundled_rules_drive_both_extractors():
+    spec = UniversalPromptExtractor().extract_spec("Steel office building with parking and solar roof")
+    assert (spec.design_type, spec.category) == ("building", "office")
+    assert [(m.type, m.grade) for m in spec.materials] == [("steel", "A36")]
+    assert spec.features == ["parking", "solar_panels"]
+    assert spec.dimensions.area == 300.0
+
+    spec = UniversalPromptExtractor().extract_spec("wireless phone")
+    assert [m.type for m in spec.materials] == ["silicon", "plastic"]
+
+    local = LocalLMAdapter().run("Efficient electric bike, durable and smart")
+    assert (local["design_type"], local["category"]) == ("vehicle", "electric")
+    assert local["performance"]["efficiency"] == "high"
+    assert local["requirements"] == ["high durability", "energy efficiency"]
+    assert local["materials"] == [{"type": "standard", "grade": None, "properties": {}}]
+
+
+def test_results_are_fresh_copies():
+    rules = ExtractionRules.from_file(EXTRACTION_RULES_PATH)
+    first = rules.evaluate("universal", "steel office")
+    first["materials"][0]["grade"] = "changed"
+    first["features"].append("changed")
+    assert rules.evaluate("universal", "steel office")["materials"][0]["grade"] == "A36"
+    assert rules.evaluate("universal", "steel office")["features"] == ["basic_functionality"]
+
+
+def test_rule_file_changes_are_picked_up(tmp_path):
+    path = _rules_file(tmp_path)
+    store = RuleStore(path, reload_interval=0)
+    before = store.get()
+    assert before.evaluate("universal", "glass office")["materials"][0]["type"] == "standard"
+
+    _rewrite(path, lambda data: data["profiles"]["universal"]["templates"]["building"]["materials"]["all"].append(
+        {"keywords": ["glass"], "value": {"type": "glass", "grade": "tempered"}}))
+    assert store.get() is before  # polling disabled
+    assert store.reload()
+
+    assert store.get().evaluate("universal", "glass office")["materials"] == [{"type": "glass", "grade": "tempered"}]
+    assert before.evaluate("universal", "glass office")["materials"][0]["type"] == "standard"  # old snapshot intact
+    assert store.get_stats()["reloads"] == 1
+
+
+def test_broken_rule_file_keeps_serving_previous_rules(tmp_path):
+    path = _rules_file(tmp_path)
+    store = RuleStore(path, reload_interval=0)
+    rules = store.get()
+
+    path.write_text("{not json")
+    assert not store.reload(force=True)
+    assert store.get() is rules and store.get_stats()["reload_errors"] == 1
+
+    with pytest.raises(ValueError):
+        ExtractionRules({"profiles": {"p": {"design_types": [], "templates": {"*": {"f": {}}}}}})
+
+
+def test_workers_poll_for_changes(tmp_path):
+    path = _rules_file(tmp_path)
+    store = RuleStore(path, reload_interval=0.01)
+    store.get()
+
+    _rewrite(path, lambda data: data.update(version=2))
+    time.sleep(0.02)
+
+    assert store.get().version == 2
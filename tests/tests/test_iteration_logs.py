@@ -0,0 +1,78 @@
+"""Test paginated and streaming iteration log retrieval"""
+
+import json
+import uuid
+import pytest
+from fastapi.testclient import TestClient
+from src.data.database import Database, get_database
+
+
+@pytest.fixture
+def db(tmp_path):
+    database = Database(f"sqlite:///{tmp_path / 'iterations.db'}")
+    yield database
+    database.dispose()
+
+
+def _save_session(database, session_id, count):
+    for n in range(1, count + 1):
+        database.save_iteration_log(
+            session_id=session_id, iteration_number=n, prompt="Office",
+            spec_before={"n": n - 1}, spec_after={"n": n}, evaluation_data={}, feedback_data={},
+            score_before=0.5, score_after=0.6, reward=0.1
+        )
+
+
+def test_keyset_pages_cover_session_once(db):
+    _save_session(db, "s-1", 7)
+    _save_session(db, "s-2", 3)
+
+    seen, cursor = [], None
+    while True:
+        page = db.get_iteration_logs_page("s-1", limit=3, cursor=cursor, fields=["score_after"])
+        seen += page["items"]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert [log["iteration_number"] for log in seen] == list(range(1, 8))
+    assert page["total"] == 7
+    assert set(seen[0]) == {"id", "iteration_number", "score_after"}
+
+
+def test_projection_rejects_unknown_fields(db):
+    with pytest.raises(ValueError):
+        db.get_iteration_logs("s-1", fields=["password"])
+    with pytest.raises(ValueError):
+        db.get_iteration_logs_page("s-1", cursor="not-a-cursor")
+
+
+def test_stream_yields_projected_rows(db):
+    _save_session(db, "s-3", 5)
+
+    rows = list(db.stream_iteration_logs("s-3", fields=["reward"], batch_size=2))
+    assert [row["iteration_number"] for row in rows] == [1, 2, 3, 4, 5]
+    assert "spec_after" not in rows[0]
+    assert [log["spec_after"] for log in db.get_iteration_logs("s-3")] == [{"n": n} for n in range(1, 6)]
+
+
+def test_iterations_endpoint_pages_and_streams():
+    from src.main import app, verify_dual_auth
+
+    session_id = f"endpoint-{uuid.uuid4()}"
+    _save_session(get_database(), session_id, 4)
+    app.dependency_overrides[verify_dual_auth] = lambda: {"user": "test"}
+    try:
+        client = TestClient(app)
+        page = client.get(f"/iterations/{session_id}", params={"limit": 3, "fields": "reward"}).json()
+        assert (page["count"], page["total_iterations"]) == (3, 4) and page["next_cursor"]
+        rest = client.get(f"/iterations/{session_id}", params={"cursor": page["next_cursor"]}).json()
+        assert [log["iteration_number"] for log in rest["iterations"]] == [4]
+
+        streamed = client.get(f"/iterations/{session_id}", params={"format": "ndjson"})
+        assert streamed.headers["content-type"].startswith("application/x-ndjson")
+        assert [json.loads(line)["iteration_number"] for line in streamed.text.splitlines()] == [1, 2, 3, 4]
+
+        assert client.get(f"/iterations/{session_id}", params={"fields": "nope"}).status_code == 400
+    finally:
+        app.dependency_overrides.pop(verify_dual_auth, None)
@@ -0,0 +1,61 @@
+"""Test the compiled keyword index behind the rule-based extractors"""
+
+import random
+from src.agents.main_agent import MainAgent
+from src.core.keyword_index import KeywordIndex
+from src.core.nlp_parser import ObjectTargeter
+from src.core.prompt_normalizer import normalize_text
+from src.lm_adapter import DESIGN_TYPE_KEYWORDS
+
+
+def test_matches_like_substring_checks():
+    keywords = ["data", "database", "app", "appliance", "ui", "auto", "car", "smart home"]
+    index = KeywordIndex({"t": {k: [k] for k in keywords}})
+    rng = random.Random(3)
+    for _ in range(2000):
+        prompt = "".join(rng.choice("abcdeilnpstuomrh .,!") for _ in range(rng.randint(0, 40)))
+        text = normalize_text(prompt)
+        assert index.match(prompt).keywords == {k for k in keywords if k in text}, prompt
+
+
+def test_tables_keep_priority_and_order():
+    index = KeywordIndex({
+        "type": {"email": ["email", "message"], "building": ["building", "office"]},
+        "feature": {"cloud": ["cloud"], "mobile": ["phone", "app"], "parking": "parking"},
+    })
+    matches = index.match("Office email from my phone, backed up to the CLOUD")
+
+    assert matches.first("type") == "email"
+    assert matches.concepts("feature") == ["cloud", "mobile"]
+    assert matches.has("type", "building") and not matches.has("feature", "parking")
+    assert index.match("nothing here").first("type", "general") == "general"
+    assert index.match("Office email") is index.match("Office email")  # memoized per prompt
+
+
+def test_extractors_share_behaviour():
+    agent = MainAgent.__new__(MainAgent)
+    assert agent._extract_design_type("Announcement email for the launch") == "email"
+    assert agent._extract_components("Building a sensor network") == ["interface", "sensor", "network"]
+    assert agent._extract_general_features("hello") == ["basic_functionality"]
+    assert DESIGN_TYPE_KEYWORDS.match("Wooden desk").first("design_type", "appliance") == "furniture"
+
+    targeter = ObjectTargeter()
+    assert targeter.parse_material("grey pillows") == {"material": "fabric", "properties": {"color": "gray"}}
+    spec = {"objects": [{"id": "w", "type": "wall"}, {"id": "c", "type": "cushion"}]}
+    assert targeter.parse_target("make the pillows red", spec) == "c"
+
+
+def test_batch_matches_single_prompts():
+    index = KeywordIndex({
+        "type": {"email": ["email", "message"], "building": ["building", "office"]},
+        "feature": {"cloud": ["cloud"], "mobile": ["phone", "app"], "home": "smart home"},
+    })
+    prompts = ["Office email", "phone app in the cloud", "", "smart home office", "office email!"]
+    batch = index.match_batch(prompts)
+
+    assert list(batch.first("type", "general")) == ["email", "general", "general", "building", "email"]
+    assert list(batch.has("feature", "home")) == [False, False, False, True, False]
+    matches, first_rows, groups = batch.groups()
+    assert groups[0] == groups[4] and len(matches) == 4
+    for row, prompt in enumerate(prompts):
+        assert matches[groups[row]].concepts("feature") == index.match(prompt).concepts("feature")
@@ -0,0 +1,85 @@
+"""Test streaming file pruning and batched DB deletes"""
+
+import json
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import insert
+from src.data.database import Database
+from src.data.iteration_models import IterationLog
+from src.data.log_pruning import LogPruner
+from src.data.log_store import get_log_store
+
+OLD = (datetime.now() - timedelta(days=90)).isoformat()
+NEW = datetime.now().isoformat()
+
+
+@pytest.fixture
+def db(tmp_path):
+    database = Database(f"sqlite:///{tmp_path / 'prune.db'}", write_behind=False)
+    yield database
+    database.dispose()
+
+
+def test_prune_rewrites_segments_and_legacy(tmp_path):
+    log_dir = tmp_path / "logs"
+    log_dir.mkdir()
+    (log_dir / "feedback_log.json").write_text(json.dumps([
+        {"id": "legacy-old", "timestamp": OLD}, {"id": "legacy-new", "timestamp": NEW}, {"id": "no-date"}
+    ]))
+    store = get_log_store("specs", str(log_dir))
+    store.max_segment_bytes = 200
+    for i in range(10):
+        store.append({"id": f"spec-{i}", "created_at": OLD if i < 6 else NEW})
+
+    results = LogPruner(retention_days=30, throttle=0, log_dir=str(log_dir)).prune_all_logs()
+
+    assert results["files"]["specs"] == {"pruned": 6, "remaining": 4, "message": "Pruned 6 old specs entries"}
+    assert results["feedback"]["pruned"] == 1
+    assert results["total_pruned"] == 7
+    assert [r["id"] for r in get_log_store("feedback_log", str(log_dir)).iter_records()] == ["legacy-new", "no-date"]
+    assert [r["id"] for r in store.iter_records()] == [f"spec-{i}" for i in range(6, 10)]
+    assert store.get("id", "spec-8")["id"] == "spec-8"
+    assert store.get("id", "spec-2") is None
+    assert not list((log_dir / "specs").glob("*.tmp"))
+
+
+def test_prune_reads_every_timestamp_field(tmp_path):
+    log_dir = str(tmp_path)
+    get_log_store("iterations", log_dir).append({"iter_id": "old", "ts": OLD})
+    get_log_store("iterations", log_dir).append({"iter_id": "new", "ts": NEW})
+    get_log_store("switch_iterations", log_dir).append({"id": "old", "saved_at": OLD})
+    get_log_store("switch_iterations", log_dir).append({"id": "new", "saved_at": NEW})
+
+    files = LogPruner(retention_days=30, throttle=0, log_dir=log_dir).prune_files()
+
+    assert files["iterations"]["pruned"] == files["switch_iterations"]["pruned"] == 1
+    assert [r["iter_id"] for r in get_log_store("iterations", log_dir).iter_records()] == ["new"]
+    assert [r["id"] for r in get_log_store("switch_iterations", log_dir).iter_records()] == ["new"]
+
+
+def test_prune_table_deletes_in_batches(db):
+    rows = [{
+        "id": f"log-{i}", "session_id": "s-1", "iteration_number": i, "prompt": "Office", "spec_after": {},
+        "evaluation_data": {}, "feedback_data": {}, "score_after": 0.5, "reward": 0.1,
+        "created_at": datetime.now() - timedelta(days=90 if i < 25 else 1)
+    } for i in range(30)]
+    with db.get_session() as session:
+        session.execute(insert(IterationLog), rows)
+        session.commit()
+
+    progress = []
+    pruner = LogPruner(retention_days=30, db=db, batch_size=10, throttle=0, progress=progress.append)
+    result = pruner.prune_table("iteration_logs")
+
+    assert result == {"pruned": 25, "batches": 3}
+    assert [p["pruned"] for p in progress] == [10, 20, 25]
+    assert len(db.get_iteration_logs("s-1")) == 5
+
+
+def test_prune_all_logs_includes_database(db, tmp_path):
+    db.save_feedback("spec-1", 1, {"note": "fresh"}, 0.5)
+    results = LogPruner(retention_days=30, db=db, throttle=0, log_dir=str(tmp_path / "empty")).prune_all_logs()
+
+    assert results["database"]["partitions"]["partitioned"] is False
+    assert results["database"]["tables"]["feedback_logs"]["pruned"] == 0
+    assert results["total_pruned"] == 0
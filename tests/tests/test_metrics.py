@@ -101,6 +101,19 @@ def test_basic_metrics_endpoint():
     assert json_response["evaluation_reports"] >= 0
     assert json_response["log_files"] >= 0
 
+def test_basic_metrics_counts_segmented_logs(tmp_path, monkeypatch):
+    """Fallback logs stored as JSONL segment directories are counted alongside legacy JSON files"""
+    from src.data.log_store import get_log_store
+
+    monkeypatch.setattr("src.data.log_store.FALLBACK_LOG_DIR", str(tmp_path))
+    get_log_store("specs", str(tmp_path)).append({"id": "spec-1"})
+    (tmp_path / "feedback_log.json").write_text("[]")
+
+    response = client.get("/basic-metrics", headers=get_auth_headers())
+
+    assert response.status_code == 200
+    assert response.json()["log_files"] == 2
+
 def test_system_overview_endpoint():
     """Test system overview endpoint for comprehensive monitoring"""
     headers = get_auth_headers()
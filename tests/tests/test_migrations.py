@@ -37,6 +37,58 @@ def test_table_structure():
     
     print("Table structures verified successfully")
 
+def _query_plan(engine, statement):
+    """SQLite query plan details for a SQLAlchemy statement"""
+    from sqlalchemy import text
+    compiled = statement.compile(engine, compile_kwargs={"literal_binds": True})
+    with engine.connect() as conn:
+        return " | ".join(row[-1] for row in conn.execute(text(f"EXPLAIN QUERY PLAN {compiled}")))
+
+def test_hot_queries_use_indexes():
+    """Hot lookups stay index searches instead of full table scans"""
+    from datetime import datetime
+    from sqlalchemy import create_engine, select
+    from src.data.iteration_models import IterationLog
+
+    engine = create_engine("sqlite://")
+    models.Base.metadata.create_all(engine)
+    cutoff = datetime(2026, 1, 1)
+
+    plans = {
+        "iterations by session": _query_plan(engine, select(IterationLog).where(
+            IterationLog.session_id == "s-1").order_by(IterationLog.iteration_number)),
+        "evals by spec": _query_plan(engine, select(models.Eval).where(
+            models.Eval.spec_id == "spec-1").order_by(models.Eval.created_at)),
+        "feedback by spec": _query_plan(engine, select(models.FeedbackLog).where(
+            models.FeedbackLog.spec_id == "spec-1").order_by(models.FeedbackLog.created_at)),
+        "eval by id": _query_plan(engine, select(models.Eval).where(models.Eval.id == "eval-1")),
+        "prune iteration logs": _query_plan(engine, select(IterationLog.id).where(IterationLog.created_at < cutoff)),
+        "prune evals": _query_plan(engine, select(models.Eval.id).where(models.Eval.created_at < cutoff)),
+        "prune feedback": _query_plan(engine, select(models.FeedbackLog.id).where(models.FeedbackLog.created_at < cutoff)),
+    }
+
+    for query, plan in plans.items():
+        assert "SEARCH" in plan and "INDEX" in plan, f"{query} is not indexed: {plan}"
+        assert "TEMP B-TREE" not in plan, f"{query} sorts without an index: {plan}"
+
+def test_index_migration_matches_models():
+    """The index migration creates exactly the indexes declared on the models"""
+    import importlib.util
+    from pathlib import Path
+    from src.data.iteration_models import IterationLog  # noqa: F401 - registers iteration_logs
+
+    path = Path(__file__).resolve().parents[2] / "alembic" / "versions" / "add_hot_query_indexes.py"
+    spec = importlib.util.spec_from_file_location("add_hot_query_indexes", path)
+    migration = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(migration)
+
+    declared = {
+        (index.name, table.name, tuple(c.name for c in index.columns))
+        for table in models.Base.metadata.sorted_tables
+        for index in table.indexes
+    }
+    assert {(name, table, tuple(columns)) for name, table, columns in migration.INDEXES} == declared
+
 if __name__ == "__main__":
     test_migration_tables_exist()
     test_table_structure()
\ No newline at end of file
@@ -0,0 +1,91 @@
+"""Test monthly partitioning of iteration and feedback logs"""
+
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import insert, text
+from src.data.database import Database
+from src.data.iteration_models import IterationLog
+from src.data.partitioning import LogPartitionManager, add_months, month_start
+
+
+@pytest.fixture
+def db(tmp_path):
+    database = Database(f"sqlite:///{tmp_path / 'partitioned.db'}", write_behind=False)
+    yield database
+    database.dispose()
+
+
+def _insert_log(db, log_id, created_at):
+    with db.get_session() as session:
+        session.execute(insert(IterationLog), [{
+            "id": log_id, "session_id": "s-1", "iteration_number": 1, "prompt": "Office",
+            "spec_after": {}, "evaluation_data": {}, "feedback_data": {}, "score_after": 0.5,
+            "reward": 0.1, "created_at": created_at
+        }])
+        session.commit()
+
+
+def _count(db, table):
+    with db.engine.connect() as conn:
+        return conn.execute(text(f'SELECT COUNT(*) FROM "{table}"')).scalar()
+
+
+def test_enable_moves_existing_rows_into_months(db):
+    old = datetime.now() - timedelta(days=95)
+    _insert_log(db, "old", old)
+    db.save_iteration_log(session_id="s-1", iteration_number=2, prompt="Office", spec_after={}, reward=0.2)
+
+    manager = LogPartitionManager(db)
+    created = manager.enable(months_ahead=1)
+
+    current = month_start(datetime.now())
+    assert manager.is_partitioned("iteration_logs") and manager.is_partitioned("feedback_logs")
+    assert manager.list_partitions("iteration_logs")[0] == month_start(old)
+    assert manager.list_partitions("iteration_logs")[-1] == add_months(current, 1)
+    assert f"iteration_logs_p{current:%Y%m}" in created["iteration_logs"]
+    assert _count(db, f"iteration_logs_p{old:%Y%m}") == 1
+    assert len(db.get_iteration_logs("s-1")) == 2
+
+
+def test_writes_route_to_partitions(db):
+    manager = LogPartitionManager(db)
+    manager.enable(months_ahead=1)
+    current = month_start(datetime.now())
+
+    log_id = db.save_iteration_log(session_id="s-2", iteration_number=1, prompt="Office", spec_after={}, reward=0.1)
+    db.save_feedback("spec-1", 1, {"note": "ok"}, 0.5)
+    _insert_log(db, "ancient", datetime(2001, 1, 1))
+
+    assert _count(db, f"iteration_logs_p{current:%Y%m}") == 1
+    assert _count(db, f"feedback_logs_p{current:%Y%m}") == 1
+    assert _count(db, "iteration_logs_pdefault") == 1
+    assert db.get_iteration_logs("s-2")[0]["id"] == log_id
+
+
+def test_prune_drops_whole_expired_partitions(db):
+    old = datetime.now() - timedelta(days=95)
+    _insert_log(db, "old", old)
+    manager = LogPartitionManager(db)
+    manager.enable(months_ahead=1)
+    db.save_iteration_log(session_id="s-1", iteration_number=2, prompt="Office", spec_after={}, reward=0.2)
+
+    result = manager.prune(retention_days=30)
+
+    assert result["partitioned"] and f"iteration_logs_p{old:%Y%m}" in result["dropped"]["iteration_logs"]
+    assert month_start(old) not in manager.list_partitions("iteration_logs")
+    assert [log["iteration_number"] for log in db.get_iteration_logs("s-1")] == [2]
+
+
+def test_ensure_partitions_creates_future_months(db):
+    manager = LogPartitionManager(db)
+    manager.enable(months_ahead=0)
+    later = add_months(month_start(datetime.now()), 3)
+
+    created = manager.ensure_partitions(months_ahead=0, now=later)
+
+    assert f"iteration_logs_p{later:%Y%m}" in created["iteration_logs"]
+    assert len(created["iteration_logs"]) == 3
+
+
+def test_prune_without_partitioning_is_noop(db):
+    assert LogPartitionManager(db).prune(retention_days=30) == {"partitioned": False, "dropped": {}, "total_dropped": 0}
@@ -0,0 +1,52 @@
+"""Test prompt canonicalization for cache keys and extractors"""
+
+from src.core.cache import CacheManager
+from src.core.nlp_parser import ObjectTargeter
+from src.core.prompt_normalizer import canonical_prompt, extractor_synonyms, normalize_text
+from src.prompt_agent.universal_extractor import UniversalPromptExtractor
+
+
+def test_variants_share_one_canonical_form():
+    variants = ["Modern office building", "modern  office building ", "Modern office building.",
+                "The modern office building, please", "MODERN, office-building!"]
+    assert {canonical_prompt(v) for v in variants} == {"modern office building"}
+
+
+def test_meaningful_differences_are_kept():
+    assert canonical_prompt("3 story house") != canonical_prompt("5 story house")
+    assert canonical_prompt("house with parking") != canonical_prompt("house without parking")
+    assert canonical_prompt("3.5m wall") == "3.5m wall"
+    assert canonical_prompt("the") == "the"  # all-stopword prompts still get a key
+
+
+def test_word_order_is_kept():
+    swapped = [
+        ("3 bedroom house with 2 bathrooms", "2 bedroom house with 3 bathrooms"),
+        ("red chair on blue floor", "blue chair on red floor"),
+        ("house with pool, no garage", "house with garage, no pool"),
+        ("steel house with 4 bedrooms and 1 bathrooms", "steel house with 1 bedrooms and 4 bathrooms"),
+    ]
+    manager = CacheManager(redis_client=None, pubsub_invalidation=False)
+    for first, second in swapped:
+        assert canonical_prompt(first) != canonical_prompt(second)
+        assert manager.get_cache_key(first) != manager.get_cache_key(second)
+    assert canonical_prompt("very very tall tower") != canonical_prompt("very tall tower")
+
+
+def test_synonyms_are_opt_in():
+    assert canonical_prompt("grey pillows") == "grey pillows"
+    assert canonical_prompt("grey pillows", extractor_synonyms()) == "gray cushion"
+
+
+def test_cache_keys_use_canonical_prompt():
+    manager = CacheManager(redis_client=None, pubsub_invalidation=False)
+    assert manager.get_cache_key("Modern office building.") == manager.get_cache_key("modern  office building ")
+    assert manager.get_cache_key("office", "generate") != manager.get_cache_key("office", "evaluate")
+
+
+def test_extractors_read_normalized_text():
+    assert normalize_text("Steel-frame OFFICE,with parking") == "steel frame office with parking"
+    spec = UniversalPromptExtractor().extract_spec("OFFICE building; steel+concrete, parking.")
+    assert spec.category == "office"
+    assert [m.type for m in spec.materials] == ["steel", "concrete"]
+    assert ObjectTargeter().parse_material("Make the FLOOR: Marble!") == {"material": "marble"}
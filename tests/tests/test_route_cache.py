@@ -0,0 +1,131 @@
+"""Test declarative response caching on the generation and evaluation routes"""
+
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+from src.core.cache import cache
+from src.core.route_cache import cached_route, normalize_body, request_cache_key
+
+
+@pytest.fixture
+def client(monkeypatch):
+    import src.main as main
+    from src.main import app, verify_dual_auth
+
+    calls = []
+    real_run = main.prompt_agent.run
+
+    def counting_run(prompt, *args, **kwargs):
+        calls.append(prompt)
+        return real_run(prompt, *args, **kwargs)
+
+    monkeypatch.setattr(main.prompt_agent, "run", counting_run)
+    monkeypatch.setattr(app.state.limiter, "enabled", False)
+    app.dependency_overrides[verify_dual_auth] = lambda: {"user": "test"}
+    cache.clear_cache()
+    try:
+        test_client = TestClient(app)
+        test_client.calls = calls
+        yield test_client
+    finally:
+        app.dependency_overrides.pop(verify_dual_auth, None)
+        cache.clear_cache()
+
+
+def test_equivalent_bodies_share_a_key():
+    assert normalize_body({"prompt": "Modern office building."}) == {"prompt": "modern office building"}
+    assert request_cache_key("generate", {"prompt": "modern  office building ", "n": 1}) == \
+        request_cache_key("generate", {"n": 1, "prompt": "Modern office building"})
+    assert request_cache_key("generate", {"prompt": "office"}) != request_cache_key("evaluate", {"prompt": "office"})
+
+
+def test_generate_served_from_cache(client):
+    first = client.post("/generate", json={"prompt": "Modern office building"})
+    second = client.post("/generate", json={"prompt": "modern  office building."})
+
+    assert first.status_code == second.status_code == 200
+    assert (first.headers["X-Cache"], second.headers["X-Cache"]) == ("MISS", "HIT")
+    assert first.headers["Cache-Control"] == "private, max-age=3600"
+    assert first.json() == second.json()
+    assert len(client.calls) == 1
+
+
+def test_swapped_quantities_are_not_served_from_cache(client):
+    first = client.post("/generate", json={"prompt": "steel house with 4 bedrooms and 1 bathrooms"})
+    second = client.post("/generate", json={"prompt": "steel house with 1 bedrooms and 4 bathrooms"})
+
+    assert (first.headers["X-Cache"], second.headers["X-Cache"]) == ("MISS", "MISS")
+    assert second.json()["spec"]["requirements"] == ["steel house with 1 bedrooms and 4 bathrooms"]
+    assert len(client.calls) == 2
+
+
+def test_coalesced_waits_are_not_reported_as_hits():
+    calls = []
+
+    @cached_route("evaluate", "body", ttl=60)
+    async def view(body: dict):
+        calls.append(body)
+        await asyncio.sleep(0.05)
+        return {"score": 1}
+
+    async def scenario():
+        first, second = await asyncio.gather(view(body={"prompt": "Coalesced office"}),
+                                              view(body={"prompt": "coalesced office."}))
+        return first, second, await view(body={"prompt": "Coalesced office"})
+
+    cache.clear_cache()
+    try:
+        responses = asyncio.run(scenario())
+    finally:
+        cache.clear_cache()
+
+    assert [response.headers["X-Cache"] for response in responses] == ["MISS", "COALESCED", "HIT"]
+    assert len(calls) == 1
+
+
+def test_routes_do_not_share_entries(client):
+    client.post("/api/v1/generate", json={"prompt": "Steel warehouse"})
+    mobile = client.post("/api/v1/mobile/generate", json={"prompt": "Steel warehouse"})
+
+    assert mobile.headers["X-Cache"] == "MISS"
+    assert mobile.json()["mobile_optimized"] is True
+    assert len(client.calls) == 2
+
+
+def test_no_cache_request_bypasses(client):
+    client.post("/api/v1/pipeline/run", json={"prompt": "Hospital"})
+    bypass = client.post("/api/v1/pipeline/run", json={"prompt": "Hospital"}, headers={"Cache-Control": "no-cache"})
+
+    assert bypass.headers["X-Cache"] == "BYPASS"
+    assert len(client.calls) == 2
+
+
+def test_errors_are_not_cached(client):
+    assert client.post("/evaluate", json={}).status_code == 422
+    assert client.post("/evaluate", json={}).status_code == 422
+    assert cache.get_stats()["generations"] == 0
+
+
+def test_batch_items_cached_individually(client):
+    client.post("/batch-evaluate", json={"specs": [{"prompt": "Office"}, {"prompt": "House"}]})
+    response = client.post("/batch-evaluate", json={"specs": [{"prompt": "office."}, {"prompt": "Warehouse"}]})
+
+    assert response.headers["X-Cache"] == "MISS"
+    assert [r["prompt"] for r in response.json()["results"]] == ["office.", "Warehouse"]
+    assert client.calls == ["Office", "House", "Warehouse"]
+
+
+def test_spec_switch_invalidates_cached_views(client):
+    assert client.get("/api/v1/three-js/spec_42").headers["X-Cache"] == "MISS"
+    assert client.get("/api/v1/three-js/spec_42").headers["X-Cache"] == "HIT"
+    client.get("/api/v1/three-js/spec_7")
+    client.post("/generate", json={"prompt": "Wooden dining table"})
+
+    switched = client.post("/api/v1/switch", json={"spec_id": "spec_42", "target": {"object": "table"},
+                                                   "update": {"material": "steel"}})
+
+    assert switched.status_code == 200
+    assert client.get("/api/v1/three-js/spec_42").headers["X-Cache"] == "MISS"
+    assert client.get("/api/v1/three-js/spec_7").headers["X-Cache"] == "HIT"
+    assert client.post("/generate", json={"prompt": "Wooden dining table"}).headers["X-Cache"] == "HIT"
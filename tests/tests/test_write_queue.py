@@ -0,0 +1,147 @@
+"""Test write-behind batching for database inserts"""
+
+import threading
+import time
+
+import pytest
+from src.data.database import Database
+from src.data.models import Spec
+
+
+@pytest.fixture
+def queued_db(tmp_path):
+    db = Database(f"sqlite:///{tmp_path / 'queued.db'}", write_behind=True)
+    yield db
+    db.dispose()
+
+
+def test_ids_returned_before_flush(queued_db):
+    """Saves return pre-generated IDs and land in one batch"""
+    queued_db.write_queue.flush_interval = 5
+    spec_ids = [queued_db.save_spec(f"Prompt {i}", {"i": i}) for i in range(10)]
+    eval_id = queued_db.save_eval(spec_ids[0], "Prompt 0", {"score": 70}, 70.0)
+
+    assert len(set(spec_ids)) == 10
+    assert queued_db.write_queue.pending() > 0
+
+    queued_db.write_queue.flush()
+    with queued_db.get_session() as session:
+        assert session.query(Spec).count() == 10
+    assert queued_db.get_eval(eval_id)["spec_id"] == spec_ids[0]
+
+    stats = queued_db.get_write_queue_stats()
+    assert stats["enabled"] is True
+    assert stats["flushed_rows"] == 11
+    assert stats["queue_depth"] == 0
+    assert stats["batches"] < 11
+
+
+def test_reads_see_queued_writes(queued_db):
+    """Reads flush pending rows first"""
+    queued_db.write_queue.flush_interval = 5
+    session_id = "session-1"
+    for i in range(3):
+        queued_db.save_iteration_log(session_id=session_id, iteration_number=i + 1, prompt="Office",
+                                     spec_after={}, evaluation_data={}, feedback_data={},
+                                     score_after=80.0, reward=0.5)
+
+    logs = queued_db.get_iteration_logs(session_id)
+    assert [log["iteration_number"] for log in logs] == [1, 2, 3]
+
+
+def test_failed_batch_uses_fallback(queued_db, monkeypatch):
+    """Rows from a failed batch are written through their fallback with the same ID"""
+    saved = []
+    monkeypatch.setattr(queued_db, "_fallback_save_feedback",
+                        lambda spec_id, iteration, data, reward, feedback_id: saved.append(feedback_id))
+
+    def broken_session():
+        raise RuntimeError("database down")
+
+    queued_db.write_queue.session_factory = broken_session
+    feedback_id = queued_db.save_feedback("spec-1", 1, {"suggestions": []}, 0.5)
+    queued_db.write_queue.flush()
+
+    assert saved == [feedback_id]
+    assert queued_db.get_write_queue_stats()["fallback_rows"] == 1
+
+
+async def test_async_save_is_queued(queued_db):
+    """Async saves enqueue without touching the database"""
+    spec_id = await queued_db.save_spec_async("Office", {"objects": []})
+    assert await queued_db.get_spec(spec_id) == {"objects": []}
+
+
+async def test_async_saves_enqueue_off_the_event_loop(queued_db, monkeypatch):
+    """A full queue's wait and fallback must not block the event loop"""
+    threads = []
+    enqueue = queued_db.write_queue.enqueue
+    monkeypatch.setattr(queued_db.write_queue, "enqueue",
+                        lambda *args: threads.append(threading.get_ident()) or enqueue(*args))
+
+    spec_id = await queued_db.save_spec_async("Office", {})
+    await queued_db.save_eval_async(spec_id, "Office", {}, 1.0)
+
+    assert len(threads) == 2 and threading.get_ident() not in threads
+
+
+def test_full_queue_applies_backpressure_then_falls_back(tmp_path):
+    """A full queue blocks briefly, then sends the row to its fallback instead of writing inline"""
+    from src.data.write_queue import WriteBehindQueue
+
+    def unused_session():
+        raise AssertionError("overflow must not write to the database on the caller's thread")
+
+    write_queue = WriteBehindQueue(unused_session, flush_interval=5, max_size=1, enqueue_timeout=0.01)
+    write_queue._ensure_thread = lambda: None  # no writer, so the queue stays full
+    saved = []
+    write_queue.enqueue(Spec, {"id": "a"}, lambda: saved.append("a"))
+    write_queue.enqueue(Spec, {"id": "b"}, lambda: saved.append("b"))
+    write_queue._queue.get_nowait()
+    write_queue._queue.task_done()  # nothing left for the exit-time drain
+
+    assert saved == ["b"]
+    stats = write_queue.get_stats()
+    assert stats["enqueued"] == 1 and stats["overflow_fallbacks"] == 1 and stats["fallback_rows"] == 1
+
+
+def test_failed_batch_retries_rows_individually(queued_db):
+    """Only the row that breaks the batch goes to the fallback"""
+    queued_db.write_queue.flush_interval = 5
+    existing = queued_db.save_spec("Existing", {"i": 0})
+    queued_db.write_queue.flush()
+    saved = []
+    for spec_id in ("good-1", existing, "good-2"):
+        queued_db.write_queue.enqueue(Spec, {"id": spec_id, "prompt": "p", "spec_data": {}, "agent_type": "MainAgent"},
+                                      lambda spec_id=spec_id: saved.append(spec_id))
+    queued_db.write_queue.flush()
+
+    assert saved == [existing]
+    with queued_db.get_session() as session:
+        assert {spec.id for spec in session.query(Spec)} == {existing, "good-1", "good-2"}
+
+
+def test_flush_returns_under_steady_writes(queued_db):
+    """flush waits for rows queued before it, not for the queue to run dry"""
+    queued_db.write_queue.flush_interval = 0.05
+    spec_id = queued_db.save_spec("Before flush", {})
+    stop = threading.Event()
+
+    def producer():
+        while not stop.is_set():
+            queued_db.save_spec("Steady", {})
+            time.sleep(0.0005)
+
+    thread = threading.Thread(target=producer)
+    thread.start()
+    try:
+        time.sleep(0.1)
+        start = time.monotonic()
+        queued_db.write_queue.flush()
+        elapsed = time.monotonic() - start
+    finally:
+        stop.set()
+        thread.join()
+
+    assert elapsed < 2
+    assert queued_db.get_spec_sync(spec_id) == {}